@@ -1,6 +1,6 @@
 # bin/ingest_budget_lines.py
 from __future__ import annotations
-import os, json
+import os
 from pathlib import Path
 from typing import List, Dict, Any, Tuple, Optional
 
@@ -9,7 +9,10 @@ import psycopg2.extras
 from dotenv import load_dotenv
 
 # 4096 임베딩 + 2000 축소
-from lm_rag.embeddings_upstage import embed_texts, reduce_embeddings
+from lm_docparse import artifact
+from lm_rag.embeddings_upstage import embed_texts, reduce_embeddings, to_pgvector
+from lm_rag.migrate import embedding_targets, fill_missing
+from lm_rag.pca import active_reducer
 
 load_dotenv()
 
@@ -24,7 +27,7 @@ def _load_rows(p: Path) -> List[Dict[str, Any]]:
     """
     입력 JSON이 배열이거나, lines/chunks/items/rows/data 중 하나에 배열로 들어오는 경우 모두 수용
     """
-    data = json.loads(p.read_text(encoding="utf-8"))
+    data = artifact.load(p)
     if isinstance(data, list):
         return data
     for key in ("lines", "chunks", "items", "rows", "data"):
@@ -97,6 +100,7 @@ def main():
     ap.add_argument("--budget-id", required=True, help="budget_doc.id (UUID)")
     ap.add_argument("--api-key", default=None)
     ap.add_argument("--base-url", default=None)
+    ap.add_argument("--org-id", default=os.getenv("LM_ORG_ID"), help="PCA 축소 아티팩트 선택용 (RAG_REDUCER=pca)")
     args = ap.parse_args()
 
     rows = _load_rows(Path(args.in_path))
@@ -113,71 +117,92 @@ def main():
         return
 
     # 1) 임베딩 생성 (4096 → 2000)
-    embs_4096 = embed_texts(texts, api_key=args.api_key, base_url=args.base_url)
-    print(f"[DEBUG] embs_len={len(embs_4096)}")
-    if not embs_4096:
+    #    float32 버퍼 + 인덱스 매핑(emb_idx[k] = rows 위치)
+    embs_4096, emb_idx = embed_texts(texts, api_key=args.api_key, base_url=args.base_url, as_array=True)
+    print(f"[DEBUG] embs_len={len(emb_idx)}")
+    if not len(emb_idx):
         print("[ERROR] Embedding API returned empty. Verify --api-key/--base-url (or UPSTAGE_* env).")
         return
-    dim_in = len(embs_4096[0])
-    embs_2000 = reduce_embeddings(embs_4096, dim_out=2000, assume_dim_in=dim_in)
+    embs_2000 = reduce_embeddings(embs_4096, dim_out=2000)
+    # (선택) 학습형 축소본 (infra/db/pg_schema_reduced.sql 적용 필요)
+    # 검색과 같은 고정 버전 (rag_reducer_active) — 최신 fit 버전을 바로 쓰지 않음
+    with _pg() as conn:
+        reducer = active_reducer(args.org_id, conn=conn)
+    embs_r = reducer.transform(embs_4096) if reducer else None
 
     # 2) records 구성 (lines/chunks 자동 감지)
     is_lines = any(set(rows[0].keys()) & {"line_title", "line_code", "category_path"}) if rows else False
-    sql = """
+    extra_cols = ", embedding_r, reducer_tag" if reducer else ""
+    extra_vals = ", %(embedding_r)s, %(reducer_tag)s" if reducer else ""
+    sql = f"""
     INSERT INTO budget_line
-      (budget_id, line_no, code, category, subcat, item, amount, currency, notes, embedding, embedding_i2000)
+      (budget_id, line_no, code, category, subcat, item, amount, currency, notes, embed_text, embedding, embedding_i2000{extra_cols})
     VALUES (%(budget_id)s, %(line_no)s, %(code)s, %(category)s, %(subcat)s, %(item)s,
-            %(amount)s, %(currency)s, %(notes)s, %(embedding)s, %(embedding_i2000)s)
+            %(amount)s, %(currency)s, %(notes)s, %(embed_text)s, %(embedding)s, %(embedding_i2000)s{extra_vals})
     """
 
-    records: List[Dict[str, Any]] = []
-    for idx, (r, e4096, e2000) in enumerate(zip(rows, embs_4096, embs_2000), start=1):
-        if is_lines:
-            category, subcat = _split_category(r.get("category_path"))
-            amount = r.get("remaining_amount")
-            if amount in (None, ""):
-                amount = r.get("amount")
-            try:
-                amount = None if amount in (None, "") else float(amount)
-            except Exception:
-                amount = None
-
-            rec = {
-                "budget_id": args.budget_id,
-                "line_no": idx,
-                "code": r.get("line_code"),
-                "category": category,
-                "subcat": subcat,
-                "item": r.get("line_title"),
-                "amount": amount,
-                "currency": "KRW",
-                "notes": r.get("notes"),
-                "embedding": e4096,
-                "embedding_i2000": e2000,
-            }
-        else:
-            # chunks → 최소 매핑
-            rec = {
-                "budget_id": args.budget_id,
-                "line_no": idx,
-                "code": _val(r, "code", "line_code", "id") or None,
-                "category": None,
-                "subcat": None,
-                "item": _val(r, "title", "line_title", "item", "name") or None,
-                "amount": None,
-                "currency": "KRW",
-                "notes": _val(r, "path", "section_path", "category_path") or None,
-                "embedding": e4096,
-                "embedding_i2000": e2000,
-            }
-        records.append(rec)
-
-    # 3) 대량 삽입
+    def _records():
+        # 한 페이지(page_size)씩 소비되며 벡터 리터럴을 즉석 생성 → 전체 float 리스트를 쌓지 않음
+        for k, j in enumerate(emb_idx):
+            r = rows[j]
+            idx = int(j) + 1
+            e4096 = to_pgvector(embs_4096[k])
+            e2000 = to_pgvector(embs_2000[k])
+            extra = {"embedding_r": to_pgvector(embs_r[k]), "reducer_tag": reducer.tag} if reducer else {}
+            if is_lines:
+                category, subcat = _split_category(r.get("category_path"))
+                amount = r.get("remaining_amount")
+                if amount in (None, ""):
+                    amount = r.get("amount")
+                try:
+                    amount = None if amount in (None, "") else float(amount)
+                except Exception:
+                    amount = None
+
+                yield {
+                    "budget_id": args.budget_id,
+                    "line_no": idx,
+                    "code": r.get("line_code"),
+                    "category": category,
+                    "subcat": subcat,
+                    "item": r.get("line_title"),
+                    "amount": amount,
+                    "currency": "KRW",
+                    "notes": r.get("notes"),
+                    "embed_text": texts[j].strip(),
+                    "embedding": e4096,
+                    "embedding_i2000": e2000,
+                    **extra,
+                }
+            else:
+                # chunks → 최소 매핑
+                yield {
+                    "budget_id": args.budget_id,
+                    "line_no": idx,
+                    "code": _val(r, "code", "line_code", "id") or None,
+                    "category": None,
+                    "subcat": None,
+                    "item": _val(r, "title", "line_title", "item", "name") or None,
+                    "amount": None,
+                    "currency": "KRW",
+                    "notes": _val(r, "path", "section_path", "category_path") or None,
+                    "embed_text": texts[j].strip(),
+                    "embedding": e4096,
+                    "embedding_i2000": e2000,
+                    **extra,
+                }
+
+    # 3) 대량 삽입 + 활성/마이그레이션 중인 임베딩 컬럼 dual-write (같은 트랜잭션)
     with _pg() as conn:
         with conn.cursor() as cur:
-            psycopg2.extras.execute_batch(cur, sql, records, page_size=500)
-
-    print(f"[OK] inserted {len(records)} budget lines into budget_line (budget_id={args.budget_id})")
+            psycopg2.extras.execute_batch(cur, sql, _records(), page_size=200)
+        targets = embedding_targets(conn, "budget_line")
+        filled = fill_missing(conn, "budget_line", targets, "budget_id=%s", (args.budget_id,),
+                              api_key=args.api_key, base_url=args.base_url) if targets else {}
+
+    print(f"[OK] inserted {len(emb_idx)} budget lines into budget_line (budget_id={args.budget_id})")
+    for col, n in filled.items():
+        print(f"[OK] {col}: filled {n} rows (active/migration target)")
 
 
 if __name__ == "__main__":
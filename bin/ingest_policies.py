@@ -2,17 +2,22 @@
 from __future__ import annotations
 
 import os
-import json
 import hashlib
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
 import psycopg2
 import psycopg2.extras
 from dotenv import load_dotenv
 
 # 패키지 임포트 (lm-rag)
-from lm_rag.embeddings_upstage import embed_texts, reduce_embeddings
+from lm_rag.embeddings_upstage import embed_texts, reduce_embeddings, to_pgvector
+from lm_rag.migrate import embedding_targets, fill_missing
+from lm_rag.pca import active_reducer
+from lm_docparse import artifact
+from lm_docparse.dedup import DEDUP_MIN_CHARS, DEDUP_THRESHOLD, MinHashLSH, find_near_duplicates, minhash
+from lm_docparse.pack import estimate_tokens, pack_chunks
+from lm_store.pg import chunk_content_sha
 
 load_dotenv()
 
@@ -25,7 +30,7 @@ def _pg():
 
 
 def load_policy_chunks(path: Path) -> List[Dict[str, Any]]:
-    data = json.loads(path.read_text(encoding="utf-8"))
+    data = artifact.load(path)
     return data if isinstance(data, list) else data.get("chunks", [])
 
 
@@ -41,6 +46,80 @@ def upsert_policy(conn, org_id, source_name, version, file_sha) -> str:
         return cur.fetchone()[0]
 
 
+def previous_policy_id(conn, org_id, source_name, policy_id) -> Optional[str]:
+    """같은 source_name의 직전 정책 (없으면 None)."""
+    with conn.cursor() as cur:
+        cur.execute(
+            """
+            SELECT id FROM policy
+             WHERE org_id=%s AND source_name=%s AND id<>%s
+             ORDER BY created_at DESC LIMIT 1
+            """,
+            (org_id, source_name, policy_id),
+        )
+        row = cur.fetchone()
+    return row[0] if row else None
+
+
+def load_base_chunks(conn, policy_id, reducer_tag) -> Dict[str, List[int]]:
+    """
+    policy의 기존 rule_chunk → {content_sha: [id, ...]}.
+    content_sha가 없는 예전 행은 text/path로 즉석 계산. 임베딩이 비었거나
+    (축소본 사용 시) reducer_tag가 다른 행은 재사용 대상에서 뺀다.
+    """
+    cols = "id, text, path, content_sha, embedding IS NOT NULL AND embedding_i2000 IS NOT NULL"
+    cols += ", reducer_tag" if reducer_tag else ", NULL"
+    with conn.cursor() as cur:
+        cur.execute(f"SELECT {cols} FROM rule_chunk WHERE policy_id=%s ORDER BY ord, id", (policy_id,))
+        rows = cur.fetchall()
+    base: Dict[str, List[int]] = {}
+    for rid, text, path, sha, has_emb, tag in rows:
+        if not has_emb or (reducer_tag and tag != reducer_tag):
+            base.setdefault("", []).append(rid)          # 재사용 불가 → 삭제 후보
+            continue
+        base.setdefault(sha or chunk_content_sha(text, path), []).append(rid)
+    return base
+
+
+def load_org_minhash(conn, org_id, reducer_tag, threshold, source_name=None, exclude_policies=()) -> MinHashLSH:
+    """
+    org의 (임베딩이 있는) rule_chunk 서명 LSH 인덱스.
+    같은 문서(source_name)의 모든 버전과 exclude_policies(재사용 기준 정책)의 행은 뺀다 —
+    수정된 조항(금액만 바뀐 경우 등)이 자기 옛 행과 근사 중복으로 잡혀 옛 임베딩이 붙거나
+    (skip이면) 조항이 사라지는 것을 막음. 상용구 탐지는 다른 문서의 청크만 대상.
+    minhash가 비어 있는 예전 행은 text로 계산하고 같은 트랜잭션에서 채워 둔다.
+    """
+    index = MinHashLSH(threshold)
+    cond, params = "", [org_id]
+    if source_name or exclude_policies:
+        cond += (" AND policy_id NOT IN (SELECT id FROM policy WHERE org_id=%s"
+                 " AND (source_name=%s OR id::text = ANY(%s)))")
+        params += [org_id, source_name, [str(p) for p in exclude_policies if p]]
+    if reducer_tag:
+        cond += " AND reducer_tag=%s"
+        params.append(reducer_tag)
+    with conn.cursor() as cur:
+        cur.execute(
+            "SELECT id, minhash, CASE WHEN minhash IS NULL THEN text END FROM rule_chunk "
+            f"WHERE org_id=%s AND embedding IS NOT NULL AND embedding_i2000 IS NOT NULL{cond}",
+            params,
+        )
+        rows = cur.fetchall()
+    fill = []
+    for rid, sig, text in rows:
+        if sig is None:
+            sig = minhash(text) if len((text or "").strip()) >= DEDUP_MIN_CHARS else None
+            if sig:
+                fill.append((psycopg2.Binary(sig), rid))
+        else:
+            sig = bytes(sig)
+        index.insert(rid, sig)
+    if fill:
+        with conn.cursor() as cur:
+            psycopg2.extras.execute_batch(cur, "UPDATE rule_chunk SET minhash=%s WHERE id=%s", fill, page_size=500)
+    return index
+
+
 def main():
     import argparse
 
@@ -48,59 +127,216 @@ def main():
     ap.add_argument("--in", dest="in_path", required=True, help="out/policies/...chunks.json")
     ap.add_argument("--api-key", default=None)
     ap.add_argument("--base-url", default=None)
+    ap.add_argument("--pack-tokens", type=int, default=0,
+                    help="같은 heading 경로의 연속 청크를 N토큰까지 합쳐 임베딩 (0=끔)")
+    ap.add_argument("--overlap-tokens", type=int, default=0)
+    ap.add_argument("--prev-policy-id", default=None,
+                    help="재사용 기준 정책 (기본: 같은 파일명의 직전 정책)")
+    ap.add_argument("--full", action="store_true",
+                    help="재사용 없이 전 청크 재임베딩 (같은 정책 재적재면 기존 행은 교체)")
+    ap.add_argument("--retire-previous", action="store_true",
+                    help="직전 버전 행을 복사하지 않고 새 버전으로 옮기고, 빠진 청크는 삭제")
+    ap.add_argument("--near-dup", choices=("link", "skip", "off"), default=os.getenv("DEDUP_MODE", "link"),
+                    help="org의 다른 문서 청크와 근사 중복(MinHash)이면 임베딩 대신 link/skip (기본 link, "
+                         "같은 문서의 이전 버전은 비교 대상 아님, 기존 행을 옮기는 재적재에선 skip → link)")
+    ap.add_argument("--dup-threshold", type=float, default=DEDUP_THRESHOLD, help="Jaccard 임계값")
     args = ap.parse_args()
 
     chunks = load_policy_chunks(Path(args.in_path))
+    if args.pack_tokens > 0:
+        n_before = len(chunks)
+        chunks = list(pack_chunks(chunks, args.pack_tokens, args.overlap_tokens))
+        print(f"→ packed {n_before} → {len(chunks)} chunks (max_tokens={args.pack_tokens})")
 
     # 파일 단위 식별자 (원본 파일명/sha)
     source_name = Path(args.in_path).name
     file_sha = hashlib.sha256(Path(args.in_path).read_bytes()).hexdigest()
     version = (chunks[0].get("version") if chunks else None) or "v1"
 
-    # 텍스트/메타 준비
-    texts: List[str] = []
-    pairs: List[tuple[int, Dict[str, Any], str]] = []
+    # 텍스트/메타 준비 (청크 내용 해시 = 공백 정규화 text + path)
+    pairs: List[tuple[int, Dict[str, Any], str, str]] = []
     for i, c in enumerate(chunks, 1):
         s = (c.get("text") or "").strip()
         if not s:
             continue
-        pairs.append((i, c, s))  # ord=i 보존
-        texts.append(s)
-
-    # 임베딩 생성 (원본 4096 가정, 모델에 따라 달라도 reduce_embeddings가 방어)
-    embs_4096 = embed_texts(texts, api_key=args.api_key, base_url=args.base_url)
-    dim_in = len(embs_4096[0]) if embs_4096 else 0
-    embs_i2000 = reduce_embeddings(embs_4096, dim_out=2000, assume_dim_in=dim_in)
+        pairs.append((i, c, s, chunk_content_sha(s, c.get("section"))))  # ord=i 보존
 
     with _pg() as conn:
+        # 축소본은 DB에 고정된 버전으로만 (새로 fit한 버전은 fit_reducer --activate 전까지 쓰지 않음)
+        reducer = active_reducer(ORG_ID, conn=conn)
         policy_id = upsert_policy(conn, ORG_ID, source_name, version, file_sha)
 
-        sql = """
+        # 재사용 기준: 같은 정책을 다시 적재하면 그 정책의 기존 행, 아니면 직전 버전
+        with conn.cursor() as cur:
+            cur.execute("SELECT count(*) FROM rule_chunk WHERE policy_id=%s", (policy_id,))
+            same = cur.fetchone()[0] > 0
+        base_id = policy_id if same else (args.prev_policy_id or previous_policy_id(conn, ORG_ID, source_name, policy_id))
+        in_place = same or args.retire_previous     # 행을 옮김(UPDATE) vs 복사(INSERT … SELECT)
+        base = {} if base_id is None else load_base_chunks(conn, base_id, reducer.tag if reducer else None)
+        if args.full:
+            # 재사용 없이 전부 재임베딩 — 기존 행은 전부 stale (같은 정책/--retire-previous면 아래에서 삭제)
+            base = {"": [rid for ids in base.values() for rid in ids]}
+        if base_id and not same:
+            with conn.cursor() as cur:
+                cur.execute("UPDATE policy SET supersedes_id=%s WHERE id=%s AND supersedes_id IS NULL",
+                            (base_id, policy_id))
+
+        # 해시가 같은 기존 행 배정 (같은 내용 청크가 여럿이면 남은 행 순서대로, 모자라면 첫 행 복사)
+        reuse: List[tuple[int, int, bool]] = []    # (pairs 위치, 기존 row id, 옮김 여부)
+        fresh: List[int] = []
+        first_row: Dict[str, int] = {}
+        for j, (_, _, _, sha) in enumerate(pairs):
+            ids = base.get(sha)
+            if ids:
+                rid = ids.pop(0)
+                first_row.setdefault(sha, rid)
+                reuse.append((j, rid, in_place))
+            elif sha in first_row:
+                reuse.append((j, first_row[sha], False))
+            else:
+                fresh.append(j)
+        stale = [rid for ids in base.values() for rid in ids]
+
+        # 근사 중복(상용구): org에 이미 저장된 청크 / 같은 배치의 앞 청크와 Jaccard ≥ threshold면 임베딩 생략
+        #   link: 원본 청크의 임베딩을 그대로 붙여 저장(텍스트는 새 것), skip: 저장하지 않음
+        texts = [pairs[j][2] for j in fresh]
+        sigs: List[Optional[bytes]] = [None] * len(fresh)
+        dups: Dict[int, tuple] = {}        # fresh 위치 → ("store", row id) | ("batch", fresh 위치)
+        near_dup = args.near_dup
+        if near_dup == "skip" and in_place:
+            # 기존 행을 옮기거나 지우는 재적재에서 skip은 조항 유실 → link로
+            print("→ in-place re-ingest: --near-dup skip → link")
+            near_dup = "link"
+        if near_dup != "off" and texts:
+            index = load_org_minhash(conn, ORG_ID, reducer.tag if reducer else None, args.dup_threshold,
+                                     source_name=source_name, exclude_policies=(policy_id, base_id))
+            hits, sigs = find_near_duplicates(texts, index, threshold=args.dup_threshold)
+            dups = {i: (h[0], h[1]) for i, h in enumerate(hits) if h}
+        todo = [i for i in range(len(fresh)) if i not in dups]
+
+        # 새/변경 청크만 임베딩 (원본 4096 가정, 모델에 따라 달라도 reduce_embeddings가 방어)
+        # as_array: float32 버퍼 + 입력 인덱스 매핑 → 스킵된 텍스트가 있어도 청크와 어긋나지 않음
+        if todo:
+            embs_4096, emb_idx = embed_texts([texts[i] for i in todo],
+                                             api_key=args.api_key, base_url=args.base_url, as_array=True)
+            embs_i2000 = reduce_embeddings(embs_4096, dim_out=2000)
+            # (선택) RAG_REDUCER=pca + 아티팩트 존재 시 학습형 축소본도 함께 적재 (infra/db/pg_schema_reduced.sql)
+            embs_r = reducer.transform(embs_4096) if reducer else None
+        else:
+            emb_idx = []
+        row_of = {todo[int(t)]: k for k, t in enumerate(emb_idx)}   # fresh 위치 → 임베딩 버퍼 행
+        n_embedded = len(row_of)
+        store_links: List[tuple[int, int]] = []
+        if near_dup == "link":
+            for i, (src, key) in dups.items():
+                if src == "batch":
+                    if key in row_of:
+                        row_of[i] = row_of[key]            # 같은 배치의 대표 청크 벡터를 함께 씀
+                else:
+                    store_links.append((i, key))
+
+        extra_cols = ", embedding_r, reducer_tag" if reducer else ""
+        extra_vals = ",%s,%s" if reducer else ""
+        sql = f"""
         INSERT INTO rule_chunk
-          (policy_id, org_id, ord, code, title, path, text, context_text, tables_json, embedding, embedding_i2000)
-        VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s)
+          (policy_id, org_id, ord, code, title, path, text, context_text, tables_json, content_sha, minhash,
+           embedding, embedding_i2000{extra_cols})
+        VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s{extra_vals})
         """
-        with conn.cursor() as cur:
-            for (ord_no, c, s), e4096, e2000 in zip(pairs, embs_4096, embs_i2000):
-                cur.execute(
-                    sql,
-                    (
-                        policy_id,
-                        ORG_ID,
-                        ord_no,
-                        c.get("code"),
-                        c.get("doc_title") or c.get("title") or c.get("section"),
-                        c.get("section"),
-                        s,
-                        None,
-                        None,
-                        e4096,  # 4096 원본
-                        e2000,  # 2000 축소본 (HNSW 인덱싱용)
-                    ),
+
+        def _meta(j):
+            ord_no, c, _, _ = pairs[j]
+            return ord_no, c.get("code"), c.get("doc_title") or c.get("title") or c.get("section")
+
+        def _sig(i):
+            return psycopg2.Binary(sigs[i]) if sigs[i] else None
+
+        def _records():
+            # 벡터 리터럴은 배치 페이지 단위로 그때그때 생성
+            for i, k in sorted(row_of.items()):
+                j = fresh[i]
+                ord_no, code, title = _meta(j)
+                _, c, s, sha = pairs[j]
+                rec = (
+                    policy_id,
+                    ORG_ID,
+                    ord_no,
+                    code,
+                    title,
+                    c.get("section"),
+                    s,
+                    None,
+                    None,
+                    sha,
+                    _sig(i),
+                    to_pgvector(embs_4096[k]),   # 4096 원본
+                    to_pgvector(embs_i2000[k]),  # 2000 축소본 (HNSW 인덱싱용)
                 )
+                if reducer:
+                    rec += (to_pgvector(embs_r[k]), reducer.tag)
+                yield rec
 
-    print(f"[OK] inserted {len(embs_4096)} rule chunks (policy_id={policy_id})")
+        # 재사용/링크: 벡터는 DB 안에서만 복사/유지 (파이썬으로 가져오지 않음)
+        # 활성/마이그레이션 중인 임베딩 컬럼도 같이 복사 (원본에서 비어 있던 건 아래 fill_missing이 채움)
+        targets = embedding_targets(conn, "rule_chunk")
+        copy_extra = ", embedding_r, reducer_tag" if reducer else ""
+        copy_extra += "".join(f", {col}" for col, _, _ in targets)
+        copy_sql = f"""
+        INSERT INTO rule_chunk
+          (policy_id, org_id, ord, code, title, path, text, context_text, tables_json, content_sha, minhash,
+           embedding, embedding_i2000{copy_extra})
+        SELECT %s, org_id, %s, %s, %s, path, text, context_text, tables_json, %s, minhash,
+               embedding, embedding_i2000{copy_extra}
+          FROM rule_chunk WHERE id=%s
+        """
+        link_sql = f"""
+        INSERT INTO rule_chunk
+          (policy_id, org_id, ord, code, title, path, text, context_text, tables_json, content_sha, minhash,
+           embedding, embedding_i2000{copy_extra})
+        SELECT %s, %s, %s, %s, %s, %s, %s, NULL, NULL, %s, %s,
+               embedding, embedding_i2000{copy_extra}
+          FROM rule_chunk WHERE id=%s
+        """
+        move_sql = "UPDATE rule_chunk SET policy_id=%s, ord=%s, code=%s, title=%s, content_sha=%s WHERE id=%s"
+        moves = [(policy_id, *_meta(j), pairs[j][3], rid) for j, rid, mv in reuse if mv]
+        copies = [(policy_id, *_meta(j), pairs[j][3], rid) for j, rid, mv in reuse if not mv]
+        links = [
+            (policy_id, ORG_ID, *_meta(fresh[i]), pairs[fresh[i]][1].get("section"), pairs[fresh[i]][2],
+             pairs[fresh[i]][3], _sig(i), rid)
+            for i, rid in store_links
+        ]
+
+        with conn.cursor() as cur:
+            if moves:
+                psycopg2.extras.execute_batch(cur, move_sql, moves, page_size=500)
+            if copies:
+                psycopg2.extras.execute_batch(cur, copy_sql, copies, page_size=500)
+            if links:
+                psycopg2.extras.execute_batch(cur, link_sql, links, page_size=500)
+            # 같은 정책 재적재/이전 버전 은퇴 시에만 실제 삭제 (복사 모드의 직전 버전은 이력으로 남김)
+            if stale and in_place:
+                cur.execute("DELETE FROM rule_chunk WHERE id = ANY(%s)", (stale,))
+            if row_of:
+                psycopg2.extras.execute_batch(cur, sql, _records(), page_size=200)
+        # dual-write: 새/복사/링크 행의 활성·마이그레이션 대상 컬럼을 각 모델로 채움
+        filled = fill_missing(conn, "rule_chunk", targets, "policy_id=%s", (policy_id,),
+                              api_key=args.api_key, base_url=args.base_url) if targets else {}
 
+    n_linked = len(store_links) + (len(row_of) - n_embedded)
+    n_failed = len(todo) - n_embedded
+    print(f"[OK] policy_id={policy_id} base={base_id or '-'} "
+          f"reused={len(reuse)} new={n_embedded} deleted={len(stale)}"
+          + ("" if in_place or not stale else " (kept in previous version)")
+          + (f" skipped={n_failed}" if n_failed else "")
+          + (f" reducer={reducer.tag}" if reducer else ""))
+    for col, n in filled.items():
+        print(f"[OK] {col}: filled {n} rows (active/migration target)")
+    if dups:
+        tok_all = sum(estimate_tokens(t) for t in texts)
+        tok_dup = sum(estimate_tokens(texts[i]) for i in dups)
+        print(f"[OK] near-duplicates={len(dups)} ({near_dup}: linked={n_linked}"
+              f" dropped={len(dups) - n_linked}) — embedding avoided ≈{tok_dup} tokens"
+              f" ({100 * tok_dup / max(tok_all, 1):.1f}% of new/changed)")
 
 if __name__ == "__main__":
     main()
@@ -1,10 +1,12 @@
-import os, json, argparse
+import os, argparse
 from pathlib import Path
 from dotenv import load_dotenv
 
 # 환경 로드는 오직 여기서만
 load_dotenv()
 
+from lm_core_schema import serde
+from lm_docparse import artifact  # 압축/평문 JSON 자동 판별
 from lm_settlement.pipeline import settle  # 라이브러리는 환경이 준비됐다고 가정
 
 def main():
@@ -17,8 +19,8 @@ def main():
     ap.add_argument("--base-url", default=None)
     args = ap.parse_args()
 
-    receipt = json.loads(Path(args.receipt).read_text(encoding="utf-8"))
-    profile = json.loads(Path(args.profile).read_text(encoding="utf-8"))
+    receipt = artifact.load(Path(args.receipt))
+    profile = artifact.load(Path(args.profile))
 
     result = settle(
         receipt=receipt,
@@ -28,7 +30,7 @@ def main():
         api_key=args.api_key,
         base_url=args.base_url,
     )
-    print(json.dumps(result, ensure_ascii=False, indent=2))
+    print(serde.dumps_str(result, indent=True))
 
 if __name__ == "__main__":
     main()
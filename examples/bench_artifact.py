@@ -0,0 +1,110 @@
+# examples/bench_artifact.py
+"""
+산출물 코덱 벤치마크: 예전 indent=2 JSON vs lm_docparse.artifact 코덱별 저장/로드 시간과 크기
+
+- 입력: 파싱 JSON / OCR 번들 / 청크 JSON (예전 형식이든 새 형식이든 artifact.load로 읽음)
+- 코덱마다 임시 디렉터리에 저장 → 다시 로드해 원본과 같은지 확인 → best-of-N 시간
+- legacy = json.dump(indent=2, ensure_ascii=False) / json.load (이전 코드 경로 그대로)
+- --stream: to_chunks_iter(경로) 로 element 스트리밍 읽기 시간도 비교
+
+예)
+  python examples/bench_artifact.py budgets/demo.univ/artifacts/*.json
+  python examples/bench_artifact.py out/budgets/big_book.json --repeat 5 --stream
+"""
+
+from __future__ import annotations
+
+import argparse
+import glob
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, List
+
+from lm_docparse import artifact
+
+
+def best_of(fn: Callable[[], Any], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def legacy_save(path: Path, obj: Any) -> None:
+    with path.open("w", encoding="utf-8") as w:
+        json.dump(obj, w, ensure_ascii=False, indent=2)
+
+
+def legacy_load(path: Path) -> Any:
+    with path.open("r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("json", nargs="*", help="산출물 JSON (기본: budgets/**/*.json)")
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--codecs", default="zstd,gzip,json", help="비교할 코덱 (쉼표)")
+    ap.add_argument("--stream", action="store_true", help="to_chunks_iter(경로) 스트리밍 읽기도 측정")
+    args = ap.parse_args()
+
+    paths = args.json or glob.glob("budgets/**/*.json", recursive=True)
+    objs: List[Any] = [artifact.load(p) for p in paths]
+    codecs: List[str] = []
+    for c in args.codecs.split(","):
+        r = artifact.resolve_codec(c.strip())
+        if r != c.strip() and c.strip() in ("zstd", "zst"):
+            print(f"  (zstandard 없음 → {c.strip()} 생략)")
+            continue
+        if r not in codecs:
+            codecs.append(r)
+    print(f"files={len(objs)}  serde={artifact.serde.BACKEND}  "
+          f"zstandard={'yes' if artifact._zstd else 'no'}  level={artifact.ARTIFACT_LEVEL}")
+
+    with tempfile.TemporaryDirectory(prefix="lm_bench_artifact_") as tmp:
+        tmpd = Path(tmp)
+
+        def files(tag: str) -> List[Path]:
+            return [tmpd / f"{tag}_{i}.json" for i in range(len(objs))]
+
+        rows = []
+        legacy_paths = files("legacy")
+        t_save = best_of(lambda: [legacy_save(p, o) for p, o in zip(legacy_paths, objs)], args.repeat)
+        t_load = best_of(lambda: [legacy_load(p) for p in legacy_paths], args.repeat)
+        size = sum(os.path.getsize(p) for p in legacy_paths)
+        rows.append(("legacy", size, t_save, t_load, legacy_paths))
+
+        for c in codecs:
+            ps = files(c)
+            t_save = best_of(lambda: [artifact.save(p, o, c) for p, o in zip(ps, objs)], args.repeat)
+            if [artifact.load(p) for p in ps] != objs:
+                raise SystemExit(f"✖ {c}: 다시 읽은 내용이 원본과 다름")
+            t_load = best_of(lambda: [artifact.load(p) for p in ps], args.repeat)
+            size = sum(os.path.getsize(p) for p in ps)
+            rows.append((c, size, t_save, t_load, ps))
+        print("✓ round-trip identical")
+
+        base_size, base_save, base_load = rows[0][1], rows[0][2], rows[0][3]
+        print(f"{'codec':8} {'size MB':>9} {'ratio':>6} {'save ms':>9} {'load ms':>9}")
+        for name, size, ts, tl, _ in rows:
+            print(
+                f"{name:8} {size / 1e6:9.2f} {size / base_size:6.2f} "
+                f"{ts * 1000:9.1f} {tl * 1000:9.1f}"
+                + ("" if name == "legacy" else f"   save x{base_save / ts:.1f}, load x{base_load / tl:.1f}")
+            )
+
+        if args.stream:
+            from lm_docparse.chunker import to_chunks_iter
+
+            for name, _, _, _, ps in rows:
+                t = best_of(lambda: [sum(1 for _ in to_chunks_iter(p)) for p in ps], max(1, args.repeat // 2))
+                print(f"stream {name:8} to_chunks_iter: {t * 1000:9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
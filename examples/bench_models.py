@@ -0,0 +1,117 @@
+# examples/bench_models.py
+"""
+공용 레코드 벤치마크: 청크 dict vs lm_core_schema.models.Chunk (메모리 / DB 행 / JSON)
+
+- 입력: 파싱 JSON (예산서 등). chunk_records()로 Chunk 목록을 만들고, 같은 내용의 dict 목록(to_dict)과 비교
+- memory      : 청크 목록이 차지하는 바이트 (tracemalloc, 본문 문자열/표는 공유하므로 컨테이너 차이만)
+- budget rows : insert_budget_chunks 행 만들기 — 예전 dict 경로({k: v ...} meta 복사 + dumps) vs Chunk.db_row + meta_json
+- rule rows   : bulk_insert_chunks 행 만들기 — 예전 dict.get 경로 vs Chunk.db_row
+- json        : serde.dumps(청크 목록) — dict vs Chunk(__json__)
+- --page: 청크마다 page 키를 붙여(ingest 스크립트처럼) meta가 비지 않게 측정
+
+예)
+  python examples/bench_models.py budgets/demo.univ/artifacts/*.json
+  python examples/bench_models.py out/budgets/big_book.json --repeat 5 --page
+"""
+
+from __future__ import annotations
+
+import argparse
+import glob
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List
+
+from lm_core_schema import serde
+from lm_core_schema.models import Chunk
+from lm_docparse import artifact
+from lm_docparse.chunker import chunk_records
+
+_ROW_KEYS = ("order", "code", "title", "path", "text", "context_text", "tables_json")
+
+
+def best_of(fn: Callable[[], Any], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def measure(build: Callable[[], Any]) -> tuple[int, Any]:
+    tracemalloc.start()
+    obj = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size, obj
+
+
+def legacy_budget_rows(chunks: List[Dict[str, Any]]) -> List[tuple]:
+    rows = []
+    for i, c in enumerate(chunks):
+        text = (c.get("text") or "").strip()
+        if not text:
+            continue
+        rows.append((
+            "doc", None, "org", int(c.get("order") or i), c.get("code"), c.get("title"), c.get("path"), text,
+            c.get("context_text"),
+            serde.dumps_str(c.get("tables_json")) if c.get("tables_json") is not None else None,
+            serde.dumps_str({k: v for k, v in c.items() if k not in _ROW_KEYS}),
+        ))
+    return rows
+
+
+def model_budget_rows(chunks: List[Chunk]) -> List[tuple]:
+    rows = []
+    for i, c in enumerate(chunks):
+        text = (c.text or "").strip()
+        if not text:
+            continue
+        rows.append(("doc", None, "org", *c.db_row(int(c.order or i), text), c.meta_json()))
+    return rows
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("json", nargs="*", help="파싱 JSON (기본: budgets/**/*.json)")
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--page", action="store_true", help="청크마다 page 키 추가 (meta 있는 경우)")
+    args = ap.parse_args()
+
+    paths = args.json or glob.glob("budgets/**/*.json", recursive=True)
+    docs = [artifact.load(p) for p in paths]
+    models: List[Chunk] = [c for d in docs for c in chunk_records(d)]
+    if args.page:
+        for i, c in enumerate(models):
+            c["page"] = i % 50 + 1
+    # tables는 Table 레코드 그대로 공유 → 컨테이너(청크) 차이만 잰다
+    m_model, _ = measure(lambda: [Chunk.from_dict(c) for c in models])
+    m_dict, dicts = measure(lambda: [c.to_dict() for c in models])
+    print(f"backend={serde.BACKEND}  docs={len(docs)}  chunks={len(models)}")
+    print(f"memory      dict {m_dict / 1e6:8.2f} MB   Chunk {m_model / 1e6:8.2f} MB   x{m_dict / m_model:.1f}")
+
+    if serde.dumps([c.to_dict() for c in models]) != serde.dumps(models):
+        raise SystemExit("✖ Chunk JSON이 dict JSON과 다름")
+    print("✓ identical JSON")
+
+    cases = [
+        ("budget rows", lambda: legacy_budget_rows(dicts), lambda: model_budget_rows(models)),
+        (
+            "rule rows",
+            lambda: [(int(c.get("order", 0)), c.get("code"), c.get("title"), c.get("path"), c.get("text") or "",
+                      c.get("context_text"), serde.dumps_str(c.get("tables")) if "tables" in c else None)
+                     for c in dicts],
+            lambda: [c.db_row(int(c.order or 0)) for c in models],
+        ),
+        ("json", lambda: serde.dumps(dicts), lambda: serde.dumps(models)),
+    ]
+    print(f"{'step':12} {'dict ms':>9} {'Chunk ms':>9} {'speedup':>8}")
+    for name, old, new in cases:
+        t_old = best_of(old, args.repeat)
+        t_new = best_of(new, args.repeat)
+        print(f"{name:12} {t_old * 1000:9.2f} {t_new * 1000:9.2f} {t_old / t_new:7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+# examples/bench_normalize_text.py
+"""
+normalize_text 마이크로 벤치마크 + 골든 비교
+
+- 기준: 단계별 re.sub 버전(아래 _legacy_normalize_text, 변경 전 chunker.normalize_text 그대로)
+- 코퍼스: 파싱 JSON들의 element content + 깨진 줄바꿈/단위/곱셈식/엔티티를 섞은 시드 고정 합성 문자열
+- 모든 입력에서 출력이 바이트 단위로 같은지 확인한 뒤 MB/s 비교
+
+예)
+  python examples/bench_normalize_text.py
+  python examples/bench_normalize_text.py --json budgets/**/artifacts/*.json out/policies/*.json --fuzz 20000 --repeat 5
+"""
+from __future__ import annotations
+
+import argparse
+import glob
+import html
+import random
+import re
+import sys
+import time
+from typing import Any, List
+
+from lm_docparse import artifact
+from lm_docparse.chunker import MULTIPLY_SIGNS, coerce_text, hyphen_fix, normalize_text, strip_html
+
+
+def _legacy_normalize_text(text_like: Any) -> str:
+    s = coerce_text(text_like)
+    if ("<" in s and ">" in s):
+        s = strip_html(s)
+    s = html.unescape(s)
+    s = s.replace("\u00A0", " ")
+    s = s.replace("\r\n", "\n").replace("\r", "\n")
+    s = hyphen_fix(s)
+    s = re.sub(r"[ \t]+", " ", s)
+    s = re.sub(r"[ \t]+\n", "\n", s)
+    s = re.sub(r"\n{3,}", "\n\n", s)
+    s = re.sub(r"\(\s*\n\s*", "(", s)
+    s = re.sub(r"\s*\n\s*\)", ")", s)
+    s = re.sub(r"([0-9][0-9,]*)\s*\n\s*(원|엔|円)", r"\1\2", s)
+    s = re.sub(r"([0-9][0-9,]*)\s*\n\s*(개|회|건|명|일|%)", r"\1\2", s)
+    s = re.sub(rf"\s*\n\s*({MULTIPLY_SIGNS})\s*\n\s*", r" \1 ", s)
+    s = re.sub(rf"\s*\n\s*({MULTIPLY_SIGNS})\s*", r" \1 ", s)
+    s = re.sub(rf"\s*{MULTIPLY_SIGNS}\s*", " x ", s)
+    s = re.sub(r"(?<![\.!\?:;\]\)\}…])\n(?!\n)", " ", s)
+    s = re.sub(r"[ \t]+", " ", s).strip()
+    return s
+
+
+_PIECES = [
+    "예산액(", "\n원)", "1,200,000", "\n원", "70", "\n개", "2", "\n회", "10", "\n%", "5,000원", " X ", "\n",
+    " x\n", "×", "＊", "*", " ", "  ", "\t", "\r\n", "\r", "\u00a0", "&amp;", "&nbsp;", "&lt;b&gt;", "<br>",
+    "<br/>", "<p id='1'>", "</p>", "<td>", "</td>", "inter-", "-\n", "\n\n\n", "\n\n", ".", "!", "?", ":",
+    ";", "]", ")", "}", "…", "(", "제1조(목적)", "학생회비", "box", "Xerox", "3", "\n엔", "円", "\n명", "-",
+    " \n ", "\t\n", "\n\t", "a", "가", "\\", "\"",
+]
+
+
+def corpus(json_paths: List[str], n_fuzz: int, seed: int) -> List[str]:
+    out: List[str] = []
+    for p in json_paths:
+        try:
+            data = artifact.load(p)
+        except (OSError, ValueError):
+            continue
+        els = data.get("elements") if isinstance(data, dict) else None
+        for el in els or []:
+            cont = el.get("content") if isinstance(el, dict) else None
+            if isinstance(cont, dict):
+                out += [v for v in cont.values() if isinstance(v, str) and v]
+        if isinstance(data, dict) and isinstance(data.get("content"), dict):
+            out += [v for v in data["content"].values() if isinstance(v, str) and v]
+    rng = random.Random(seed)
+    for _ in range(n_fuzz):
+        out.append("".join(rng.choice(_PIECES) for _ in range(rng.randint(1, 40))))
+    return out
+
+
+def bench(fn, texts: List[str], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for t in texts:
+            fn(t)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--json", nargs="*", default=None, help="파싱 JSON (기본: budgets/**/*.json)")
+    ap.add_argument("--fuzz", type=int, default=20000, help="합성 문자열 개수")
+    ap.add_argument("--seed", type=int, default=13)
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    paths = args.json if args.json is not None else glob.glob("budgets/**/*.json", recursive=True)
+    texts = corpus(paths, args.fuzz, args.seed)
+    mb = sum(len(t.encode("utf-8")) for t in texts) / 1e6
+    print(f"corpus: {len(texts)} strings, {mb:.2f} MB ({len(paths)} json)")
+
+    bad = [t for t in texts if normalize_text(t).encode("utf-8") != _legacy_normalize_text(t).encode("utf-8")]
+    if bad:
+        print(f"✖ {len(bad)} mismatches, e.g. {bad[0]!r}")
+        print(f"   legacy: {_legacy_normalize_text(bad[0])!r}")
+        print(f"   new   : {normalize_text(bad[0])!r}")
+        sys.exit(1)
+    print("✓ byte-identical on all inputs")
+
+    t_old = bench(_legacy_normalize_text, texts, args.repeat)
+    t_new = bench(normalize_text, texts, args.repeat)
+    print(f"legacy : {mb / t_old:8.2f} MB/s  ({t_old * 1000:.1f} ms)")
+    print(f"new    : {mb / t_new:8.2f} MB/s  ({t_new * 1000:.1f} ms)  x{t_old / t_new:.2f}")
+
+
+if __name__ == "__main__":
+    main()
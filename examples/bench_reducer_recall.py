@@ -0,0 +1,124 @@
+# examples/bench_reducer_recall.py
+"""
+축소 방식별 검색 재현율 비교: JL(reduce_embeddings) vs PCA(lm_rag.pca)
+
+- 정답: 원본(4096) 코사인 top-k
+- 비교: 각 차원으로 축소한 벡터의 코사인 top-k → recall@k = |교집합| / k
+- PCA는 코퍼스로만 학습, 질의는 학습에서 제외(held-out)
+
+데이터 소스 (택1)
+  --from-db [--org-id X]         : 저장된 rule_chunk/budget_line 임베딩
+  --chunks a.json b.json ...     : 청크 JSON을 임베딩 (LM_EMBED_BACKEND=local 이면 오프라인)
+  (생략)                          : 저랭크 합성 데이터
+
+예)
+  LM_EMBED_BACKEND=local python examples/bench_reducer_recall.py --chunks out/policies/*.chunks.json
+  python examples/bench_reducer_recall.py --from-db --dims 256,384,512,768,2000 --k 10
+"""
+from __future__ import annotations
+
+import argparse
+import time
+from pathlib import Path
+from typing import List
+
+import numpy as np
+
+from lm_docparse import artifact
+from lm_rag.embeddings_upstage import embed_texts, reduce_embeddings
+from lm_rag.pca import fit_pca
+
+
+def _synthetic(n: int, dim: int = 4096, rank: int = 96, seed: int = 7) -> np.ndarray:
+    # 실제 문장 임베딩처럼 분산이 소수 방향에 몰린 데이터
+    rng = np.random.default_rng(seed)
+    basis = rng.standard_normal((rank, dim)).astype(np.float32)
+    scale = (1.0 / np.arange(1, rank + 1) ** 0.7).astype(np.float32)
+    X = (rng.standard_normal((n, rank)).astype(np.float32) * scale) @ basis
+    X += 0.05 * rng.standard_normal((n, dim)).astype(np.float32)
+    return X
+
+
+def _from_chunks(paths: List[str]) -> np.ndarray:
+    texts: List[str] = []
+    for p in paths:
+        data = artifact.load(p)
+        items = data if isinstance(data, list) else data.get("chunks", [])
+        texts += [c.get("text") or "" for c in items if isinstance(c, dict)]
+    embs, _ = embed_texts(texts, as_array=True)
+    return embs
+
+
+def _norm(X: np.ndarray) -> np.ndarray:
+    return X / (np.linalg.norm(X, axis=1, keepdims=True) + 1e-12)
+
+
+def _topk(Q: np.ndarray, C: np.ndarray, k: int) -> np.ndarray:
+    S = _norm(Q) @ _norm(C).T
+    k = min(k, C.shape[0])
+    idx = np.argpartition(-S, k - 1, axis=1)[:, :k]
+    return idx
+
+
+def _recall(truth: np.ndarray, got: np.ndarray) -> float:
+    hits = sum(len(set(t.tolist()) & set(g.tolist())) for t, g in zip(truth, got))
+    return hits / float(truth.size)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--from-db", action="store_true")
+    ap.add_argument("--org-id", default=None)
+    ap.add_argument("--chunks", nargs="*", default=None)
+    ap.add_argument("--n", type=int, default=5000, help="합성 데이터 행 수")
+    ap.add_argument("--dims", default="256,384,512,768,2000")
+    ap.add_argument("--k", type=int, default=10)
+    ap.add_argument("--queries", type=float, default=0.1, help="질의로 뺄 비율")
+    args = ap.parse_args()
+
+    if args.from_db:
+        import sys
+        sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "bin"))
+        from fit_reducer import load_vectors  # bin/fit_reducer.py
+
+        X = load_vectors(args.org_id)
+        src = "db"
+    elif args.chunks:
+        X = _from_chunks(args.chunks)
+        src = "chunks"
+    else:
+        X = _synthetic(args.n)
+        src = "synthetic"
+
+    if X.shape[0] < 20:
+        print(f"[ERROR] too few vectors ({X.shape[0]})")
+        return
+
+    rng = np.random.default_rng(0)
+    perm = rng.permutation(X.shape[0])
+    n_q = max(1, int(X.shape[0] * args.queries))
+    Q, C = X[perm[:n_q]], X[perm[n_q:]]
+    truth = _topk(Q, C, args.k)
+    print(f"source={src} corpus={C.shape} queries={Q.shape[0]} k={args.k}")
+    print(f"{'dim':>6} {'JL recall':>10} {'PCA recall':>11} {'PCA var':>8} {'fit s':>7}")
+
+    for d in [int(x) for x in args.dims.split(",") if x.strip()]:
+        if d > X.shape[1]:
+            continue
+        jl_c = reduce_embeddings(C, dim_out=d)
+        jl_q = reduce_embeddings(Q, dim_out=d)
+        r_jl = _recall(truth, _topk(jl_q, jl_c, args.k))
+
+        if d < min(C.shape):
+            t0 = time.perf_counter()
+            red = fit_pca(C, d, version=0)  # 벤치마크용: 저장/버전 조회 안 함
+            fit_s = time.perf_counter() - t0
+            r_pca = _recall(truth, _topk(red.transform(Q), red.transform(C), args.k))
+            var = float(red.explained.sum())
+            print(f"{d:>6} {r_jl:>10.3f} {r_pca:>11.3f} {var:>8.3f} {fit_s:>7.2f}")
+        else:
+            print(f"{d:>6} {r_jl:>10.3f} {'-':>11} {'-':>8} {'-':>7}")
+
+
+if __name__ == "__main__":
+    main()
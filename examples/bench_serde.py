@@ -0,0 +1,125 @@
+# examples/bench_serde.py
+"""
+JSON 직렬화 벤치마크: 호출 지점별 예전 json.dumps vs lm_core_schema.serde
+
+- 입력: 파싱 JSON (예산서 등). 청크는 to_chunks()로 만들어 씀
+- 호출 지점 (예전 코드 그대로 → serde)
+  settle prompt   : lm_settlement.pipeline.settle() 의 json.dumps(indent=2) × 4 (영수증/규정/예산/프로필)
+  sha256_json     : lm_store.pg.sha256_json (sort_keys) — canonical_bytes는 바이트 동일 여부도 확인
+  rule_chunk rows : lm_store.pg.bulk_insert_chunks 의 tables jsonb
+  budget rows     : lm_store.pg.insert_budget_chunks 의 tables_json + meta jsonb
+  chunks jsonl    : lm_docparse.rechunk --jsonl 의 청크 한 줄
+  manifest line   : lm_docparse.batch 완료 기록 한 줄
+- 각 지점마다 결과가 같은 JSON 값인지 확인한 뒤 best-of-N 시간 비교
+
+예)
+  python examples/bench_serde.py budgets/demo.univ/artifacts/*.json
+  python examples/bench_serde.py out/budgets/big_book.json --repeat 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import glob
+import json
+import time
+from typing import Any, Callable, Dict, List
+
+from lm_core_schema import serde
+from lm_docparse import artifact
+from lm_docparse.chunker import to_chunks
+
+_ROW_KEYS = ("order", "code", "title", "path", "text", "context_text", "tables_json")
+
+
+def best_of(fn: Callable[[], Any], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("json", nargs="*", help="파싱 JSON (기본: budgets/**/*.json)")
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    paths = args.json or glob.glob("budgets/**/*.json", recursive=True)
+    docs = [artifact.load(p) for p in paths]
+    # 예전 경로와 같은 조건: Chunk/Table 레코드가 아니라 평범한 dict (표준 json이 직렬화할 수 있게)
+    chunks: List[Dict[str, Any]] = serde.loads(serde.dumps([c for d in docs for c in to_chunks(d)]))
+    budget_rows = [{**c, "tables_json": c.get("tables"), "page": i % 50 + 1} for i, c in enumerate(chunks)]
+    receipt = {
+        "merchant": "쿠프마케팅", "date": "2024-09-12", "amount_total": 13000, "vat": 1181,
+        "items": [{"name": "1인 관람권", "qty": 1, "price": 13000}], "memo": "학생회 행사 경품",
+        "raw_text": "쿠프마케팅 1인 관람권 13,000원 " * 20,
+    }
+    hits = [{"score": 0.83 - 0.01 * i, **c} for i, c in enumerate(chunks[:3])]
+    profile = {"expense_details_by_field": {"mapping": {"date": "date", "amount": "amount_total"},
+                                            "code_extract_rules": []},
+               "ledger_details": {"mapping": {"account_code": "account_code", "detail": "detail"}}}
+    print(f"backend={serde.BACKEND}  docs={len(docs)}  chunks={len(chunks)}")
+
+    def meta(c: Dict[str, Any]) -> Dict[str, Any]:
+        return {k: v for k, v in c.items() if k not in _ROW_KEYS}
+
+    cases = [
+        (
+            "settle prompt",
+            lambda: [json.dumps(x, ensure_ascii=False, indent=2) for x in (receipt, hits, hits, profile)],
+            lambda: [serde.dumps_str(x, indent=True) for x in (receipt, hits, hits, profile)],
+        ),
+        (
+            "sha256_json",
+            lambda: [json.dumps(d, ensure_ascii=False, sort_keys=True).encode("utf-8") for d in docs],
+            lambda: [serde.canonical_bytes(d) for d in docs],
+        ),
+        (
+            "rule_chunk rows",
+            lambda: [json.dumps(c.get("tables"), ensure_ascii=False) for c in chunks],
+            lambda: [serde.dumps_str(c.get("tables")) for c in chunks],
+        ),
+        (
+            "budget rows",
+            lambda: [(json.dumps(c["tables_json"]), json.dumps(meta(c))) for c in budget_rows],
+            lambda: [(serde.dumps_str(c["tables_json"]), serde.dumps_str(meta(c))) for c in budget_rows],
+        ),
+        (
+            "chunks jsonl",
+            lambda: [json.dumps(c, ensure_ascii=False) for c in chunks],
+            lambda: [serde.dumps_str(c) for c in chunks],
+        ),
+        (
+            "manifest line",
+            lambda: [json.dumps({"key": i, "file": p, "status": "ok", "ms": 1.5}, ensure_ascii=False)
+                     for i, p in enumerate(paths * 200)],
+            lambda: [serde.dumps_str({"key": i, "file": p, "status": "ok", "ms": 1.5})
+                     for i, p in enumerate(paths * 200)],
+        ),
+    ]
+
+    print(f"{'call site':16} {'json ms':>9} {'serde ms':>9} {'speedup':>8}")
+    for name, old, new in cases:
+        a, b = old(), new()
+        if name == "sha256_json":
+            if a != b:
+                raise SystemExit("✖ canonical_bytes가 예전 sha256_json 바이트와 다름")
+        elif [_decode(x) for x in a] != [_decode(x) for x in b]:
+            raise SystemExit(f"✖ {name}: 결과 JSON 값이 다름")
+        t_old = best_of(old, args.repeat)
+        t_new = best_of(new, args.repeat)
+        print(f"{name:16} {t_old * 1000:9.2f} {t_new * 1000:9.2f} {t_old / t_new:7.1f}x")
+    print("✓ identical values (sha256_json: identical bytes)")
+
+
+def _decode(x: Any) -> Any:
+    if isinstance(x, tuple):
+        return tuple(_decode(v) for v in x)
+    return json.loads(x)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+# examples/bench_tables.py
+"""
+표 추출 벤치마크: element별 BeautifulSoup(html.parser) vs 문서 1회 파싱(lxml)
+
+- 입력: 파싱 JSON (예산서 등). 여러 개면 elements를 이어붙여 한 문서처럼 측정
+- 두 방식의 결과(dict)가 모두 같은지 확인한 뒤 시간/throughput 비교
+- --chunks: to_chunks() 전체 시간도 함께 (표 추출 외 정규화 포함)
+
+예)
+  python examples/bench_tables.py budgets/demo.univ/artifacts/*.json
+  python examples/bench_tables.py out/budgets/big_book.json --repeat 5 --chunks
+"""
+from __future__ import annotations
+
+import argparse
+import glob
+import time
+from typing import Any, List
+
+from lm_docparse import artifact, tables as T
+from lm_docparse.chunker import _get_raw_html_from_content, to_chunks
+
+
+def load_htmls(paths: List[str]) -> tuple[List[str], List[Any]]:
+    htmls: List[str] = []
+    elements: List[Any] = []
+    for p in paths:
+        data = artifact.load(p)
+        for el in (data.get("elements") if isinstance(data, dict) else None) or []:
+            elements.append(el)
+            h = _get_raw_html_from_content(el.get("content", {}))
+            htmls.append(h if h and "<table" in h.lower() else "")
+    return htmls, elements
+
+
+def best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("json", nargs="*", help="파싱 JSON (기본: budgets/**/*.json)")
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--chunks", action="store_true", help="to_chunks() 전체 시간도 측정")
+    args = ap.parse_args()
+
+    paths = args.json or glob.glob("budgets/**/*.json", recursive=True)
+    htmls, elements = load_htmls(paths)
+    n_tbl_el = sum(1 for h in htmls if h)
+    mb = sum(len(h.encode("utf-8")) for h in htmls) / 1e6
+    print(f"backend={T.BACKEND}  elements={len(htmls)}  table elements={n_tbl_el}  table html={mb:.2f} MB")
+
+    def old():
+        return [T._bs_extract(h) if h else [] for h in htmls]
+
+    def new():
+        return T.extract_tables_by_element(htmls)
+
+    if old() != new():
+        raise SystemExit("✖ 결과 불일치")
+    print("✓ identical output")
+
+    t_old = best_of(old, args.repeat)
+    t_new = best_of(new, args.repeat)
+    print(f"bs4/element : {t_old * 1000:9.1f} ms  {mb / t_old:7.2f} MB/s")
+    print(f"lxml/doc    : {t_new * 1000:9.1f} ms  {mb / t_new:7.2f} MB/s  x{t_old / t_new:.1f}")
+
+    if args.chunks:
+        resp = {"elements": elements}
+        t_c = best_of(lambda: to_chunks(resp), args.repeat)
+        print(f"to_chunks   : {t_c * 1000:9.1f} ms ({len(elements)} elements)")
+
+
+if __name__ == "__main__":
+    main()
@@ -37,13 +37,13 @@ LedgerMate — chunks_smoke.py
 """
 
 from __future__ import annotations
-import json, sys, pathlib
+import sys, pathlib
+from lm_docparse import artifact
 from lm_docparse.chunker import to_chunks
 
 def main(path: str = "out/policies/부산.json", show: int = 5) -> None:
     p = pathlib.Path(path)
-    with p.open(encoding="utf-8") as f:
-        obj = json.load(f)
+    obj = artifact.load(p)
     chs = to_chunks(obj)
     print(f"chunks: {len(chs)}")
     print("last 5 has text?:", [bool((c.get("text","") or "").strip()) for c in chs[-5:]])
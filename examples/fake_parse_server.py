@@ -0,0 +1,173 @@
+# examples/fake_parse_server.py
+"""
+LedgerMate — fake_parse_server.py (로컬 document-parse 대역 서버)
+
+목적:
+- 실제 Upstage 호출 없이 batch / submit / collect 경로를 돌려 보기 위한 표준 라이브러리 HTTP 서버.
+- 업로드 내용과 무관하게 --sample 의 저장된 파싱 JSON을 돌려준다.
+
+엔드포인트 (PARSER_API_BASE=http://127.0.0.1:<port>/v1):
+- POST /v1/document-digitization                 → 동기 응답 (sample 그대로)
+- POST /v1/document-digitization/async           → {"request_id": "..."}
+- GET  /v1/document-digitization/requests/<id>   → 제출 후 --delay 초 동안 submitted/started, 이후 completed
+                                                   (batches: --batch-pages 쪽씩, page는 batch 안에서 1부터)
+- GET  /download/<id>/<n>                         → n번째 batch 결과 (Authorization 헤더 불필요)
+- --fail-rate: 비동기 작업 중 이 비율만큼 failed 로 끝냄 / --error-rate: 요청의 이 비율만큼 503
+
+실행:
+   python examples/fake_parse_server.py --sample budgets/demo.univ/artifacts/<id>.json --port 8765 --delay 2
+   PARSER_API_BASE=http://127.0.0.1:8765/v1 UPSTAGE_API_KEY=dummy \
+       python examples/parse_policies.py submit "data/policies-sample/*.pdf" --out-dir out/async
+   PARSER_API_BASE=http://127.0.0.1:8765/v1 UPSTAGE_API_KEY=dummy \
+       python examples/parse_policies.py collect --out-dir out/async
+"""
+
+from __future__ import annotations
+
+import argparse
+import copy
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List
+
+from lm_docparse import artifact
+
+
+def _split_pages(sample: Dict[str, Any], batch_pages: int) -> List[Dict[str, Any]]:
+    """sample을 batch_pages 쪽씩 나눈 응답 목록 (page는 batch 안에서 1부터, 실제 API의 batch 결과 흉내)."""
+    els = sample.get("elements") or []
+    n_pages = max([el.get("page") or 1 for el in els] or [1])
+    out = []
+    for start in range(1, n_pages + 1, batch_pages):
+        end = min(n_pages, start + batch_pages - 1)
+        part = {k: copy.deepcopy(v) for k, v in sample.items() if k not in ("elements", "content", "usage")}
+        part["elements"] = []
+        for el in els:
+            if start <= (el.get("page") or 1) <= end:
+                el = dict(el)
+                el["page"] = (el.get("page") or 1) - start + 1
+                part["elements"].append(el)
+        part["content"] = {"html": "", "markdown": "", "text": ""}
+        part["usage"] = {"pages": end - start + 1}
+        out.append({"start_page": start, "end_page": end, "response": part})
+    return out
+
+
+class _State:
+    def __init__(self, sample: Dict[str, Any], delay: float, batch_pages: int, fail_rate: float, error_rate: float):
+        self.sample = sample
+        self.delay = delay
+        self.batches = _split_pages(sample, batch_pages)
+        self.fail_rate = fail_rate
+        self.error_rate = error_rate
+        self.jobs: Dict[str, Dict[str, Any]] = {}
+        self.lock = threading.Lock()
+        self.hits = {"sync": 0, "submit": 0, "status": 0, "download": 0}
+
+
+def make_handler(state: _State):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, fmt, *args):  # 조용히
+            pass
+
+        def _json(self, code: int, body: Any) -> None:
+            data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _flaky(self) -> bool:
+            if state.error_rate and random.random() < state.error_rate:
+                self._json(503, {"error": "temporarily unavailable"})
+                return True
+            return False
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length") or 0))   # 업로드는 버림
+            if not self.headers.get("Authorization", "").startswith("Bearer "):
+                return self._json(401, {"error": "unauthorized"})
+            if self._flaky():
+                return
+            path = self.path.rstrip("/")
+            if path.endswith("/document-digitization"):
+                state.hits["sync"] += 1
+                return self._json(200, state.sample)
+            if path.endswith("/document-digitization/async"):
+                rid = uuid.uuid4().hex
+                with state.lock:
+                    state.hits["submit"] += 1
+                    state.jobs[rid] = {"t": time.monotonic(), "fail": random.random() < state.fail_rate}
+                return self._json(202, {"request_id": rid})
+            self._json(404, {"error": "not found"})
+
+        def do_GET(self):
+            if self._flaky():
+                return
+            parts = self.path.strip("/").split("/")
+            if len(parts) >= 2 and parts[-2] == "requests":
+                if not self.headers.get("Authorization", "").startswith("Bearer "):
+                    return self._json(401, {"error": "unauthorized"})
+                job = state.jobs.get(parts[-1])
+                state.hits["status"] += 1
+                if job is None:
+                    return self._json(404, {"error": "unknown request_id"})
+                age = time.monotonic() - job["t"]
+                if age < state.delay:
+                    return self._json(200, {"id": parts[-1], "status": "submitted" if age < state.delay / 2 else "started"})
+                if job["fail"]:
+                    return self._json(200, {"id": parts[-1], "status": "failed", "failure_message": "fake failure"})
+                host = f"http://{self.headers.get('Host')}"
+                return self._json(200, {
+                    "id": parts[-1],
+                    "status": "completed",
+                    "batches": [
+                        {"id": n, "status": "completed", "start_page": b["start_page"], "end_page": b["end_page"],
+                         "download_url": f"{host}/download/{parts[-1]}/{n}"}
+                        for n, b in enumerate(state.batches)
+                    ],
+                })
+            if len(parts) == 3 and parts[0] == "download":
+                if "Authorization" in self.headers:
+                    return self._json(400, {"error": "presigned url: no Authorization header"})
+                state.hits["download"] += 1
+                n = int(parts[2])
+                if parts[1] not in state.jobs or not 0 <= n < len(state.batches):
+                    return self._json(404, {"error": "not found"})
+                return self._json(200, state.batches[n]["response"])
+            self._json(404, {"error": "not found"})
+
+    return Handler
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="LedgerMate - 로컬 document-parse 대역 서버")
+    ap.add_argument("--sample", required=True, help="돌려줄 파싱 JSON (Upstage 응답 형식)")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--delay", type=float, default=2.0, help="비동기 작업 완료까지 걸리는 시간(초)")
+    ap.add_argument("--batch-pages", type=int, default=10, help="비동기 결과 batch당 쪽 수")
+    ap.add_argument("--fail-rate", type=float, default=0.0)
+    ap.add_argument("--error-rate", type=float, default=0.0)
+    args = ap.parse_args()
+
+    sample = artifact.load(args.sample)
+    state = _State(sample, args.delay, max(1, args.batch_pages), args.fail_rate, args.error_rate)
+    srv = ThreadingHTTPServer((args.host, args.port), make_handler(state))
+    print(f"▶ fake parse server: http://{args.host}:{args.port}/v1 "
+          f"(sample={args.sample}, delay={args.delay}s, batches={len(state.batches)})")
+    try:
+        srv.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(f"[OK] hits={state.hits}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,16 @@
 from __future__ import annotations
-import os, argparse, pathlib, json
+import os, argparse, pathlib
 from dotenv import load_dotenv
 
 from lm_store.pg import (
-    connect, ensure_budget_schema, register_artifact,
+    connect, ensure_budget_schema, register_artifact_file,
     create_budget_doc, insert_budget_chunks
 )
+from lm_core_schema import serde
+from lm_docparse import artifact
 from lm_docparse.pdfParser import call_document_parse
-from lm_docparse.chunker import to_chunks
+from lm_docparse.chunker import to_chunks_iter
+from lm_docparse.pack import pack_chunks
 '''
 LedgerMate — 예산안 PDF 수집(ingest) 스크립트
 
@@ -15,7 +18,7 @@ LedgerMate — 예산안 PDF 수집(ingest) 스크립트
 
 1) (필수) 원문 PDF를 DB의 artifact 테이블에 저장
    - kind="raw_pdf", filename, mime, SHA/크기 등 메타가 저장됨
-   - register_artifact() 사용
+   - register_artifact_file() 사용 (파일을 블록 단위로 해시/복사)
 
 2) (옵션: --parse) Upstage 문서 파서로 PDF를 파싱하여 JSON 생성 후, JSON도 artifact로 저장
    - lm_docparse.pdfParser.call_document_parse() 호출
@@ -27,7 +30,7 @@ LedgerMate — 예산안 PDF 수집(ingest) 스크립트
    - create_budget_doc() 사용, 반환값은 budget_doc_id(UUID)
 
 4) (옵션: --chunk) 파싱 JSON을 의미 단위(섹션/조항/표)로 청크화하여 budget_chunk 테이블에 일괄 저장
-   - lm_docparse.chunker.to_chunks() 로 title/path/code/text/context/tables_json/meta 생성
+   - lm_docparse.chunker.to_chunks_iter() 로 title/path/code/text/context/tables_json/meta 생성
    - insert_budget_chunks()로 DB 저장
    - policy_id를 함께 넘기면 조항-정책 연결 컬럼이 함께 채워질 수 있음(스키마/함수 구현에 따라 다름)
 
@@ -41,9 +44,9 @@ LedgerMate — 예산안 PDF 수집(ingest) 스크립트
 - (옵션) 기타 lm_store/lm_docparse 에서 참조할 환경변수
 
 [주요 의존]
-- lm_store.pg: connect, ensure_budget_schema, register_artifact, create_budget_doc, insert_budget_chunks
+- lm_store.pg: connect, ensure_budget_schema, register_artifact_file, create_budget_doc, insert_budget_chunks
 - lm_docparse.pdfParser: call_document_parse
-- lm_docparse.chunker: to_chunks
+- lm_docparse.chunker: to_chunks_iter
 
 [CLI 인자]
 - pdf (positional)            : 예산안 PDF 경로
@@ -54,7 +57,7 @@ LedgerMate — 예산안 PDF 수집(ingest) 스크립트
 - --created-by                : 작성/업로더 식별자(선택)
 - --parse                     : Upstage 파서를 호출해 JSON 생성 및 artifact 저장
 - --chunk                     : 파싱 JSON을 청크로 변환하여 budget_chunk 저장
-  └ 주의: --chunk만 주고 --parse를 빼면 parsed_obj가 없어 청크화는 스킵됨
+  └ 주의: --chunk만 주고 --parse/--reuse-parsed를 빼면 parsed JSON이 없어 청크화는 스킵됨
           (미리 생성된 parse_json 아티팩트를 읽어들이는 로직이 없다면, --parse를 함께 쓰는 것을 권장)
 
 [실행 예]
@@ -76,11 +79,11 @@ python examples/ingest_budget_pdf.py \
 - Upstage 401 Unauthorized: 결제/크레딧 이슈 또는 API 키 부재 → UPSTAGE_API_KEY/결제상태 확인
 - 파일 경로 오류: pdf 인자 경로 확인
 - DB 연결 실패: DATABASE_URL 값/네트워크/권한 확인
-- --chunk만 실행했는데 0건: parsed_obj가 None → --parse를 함께 사용하거나, 사전 파싱-적재 로직 구현 필요
+- --chunk만 실행했는데 0건: parsed JSON 파일이 없음 → --parse 또는 --reuse-parsed를 함께 사용
 
 [설계 노트]
-- register_artifact()는 바이트 전체를 읽어 DB/스토리지에 저장하므로 매우 큰 PDF에 대해서는
-  스트리밍/청크 업로드로 확장 여지가 있음.
+- register_artifact_file()은 PDF/파싱 JSON을 블록 단위로 읽어 해시하고 파일 복사로 저장
+  → 큰 문서도 바이트 전체나 디코딩된 JSON을 메모리에 올리지 않음.
 - period-from/to, policy_id, created_by는 budget_doc 메타로 저장되어 이후 검색/필터/추천 연결에 사용됨.
 - to_chunks()는 normalize_text() 등 전처리를 포함해 임베딩/검색 품질을 높이는 데 중점.
 
@@ -104,6 +107,12 @@ python examples/ingest_budget_pdf.py \
 - 추가: --reuse-parsed: --parse 없이도 기존 parsed JSON이 있으면 재사용
 """
 
+def _json_mime(path: pathlib.Path) -> str:
+    # 압축 여부는 앞 4바이트(매직)만 보고 판단
+    with path.open("rb") as f:
+        return artifact.mime_of(f.read(4))
+
+
 def main():
     load_dotenv()
     ap = argparse.ArgumentParser()
@@ -121,6 +130,9 @@ def main():
     ap.add_argument("--out-dir", default="out/receipts", help="파싱/청크 JSON 저장 디렉터리 (기본: out/receipts)")
     ap.add_argument("--reuse-parsed", action="store_true",
                     help="--parse 미지정이어도 out-dir에 기존 parsed JSON이 있으면 재사용")
+    ap.add_argument("--pack-tokens", type=int, default=0,
+                    help="같은 heading 경로의 연속 청크를 N토큰까지 합침 (0=끔, lm_docparse.pack)")
+    ap.add_argument("--overlap-tokens", type=int, default=0)
     args = ap.parse_args()
 
     pdf_path = pathlib.Path(args.pdf)
@@ -136,48 +148,44 @@ def main():
         ensure_budget_schema(conn)
 
         # 1) PDF artifact
-        pdf_bytes = pdf_path.read_bytes()
-        pdf_art = register_artifact(
+        pdf_art = register_artifact_file(
             conn,
             org_id=args.org_id, kind="raw_pdf",
-            filename=pdf_path.name, content=pdf_bytes, mime="application/pdf"
+            path=pdf_path, mime="application/pdf"
         )
         print("✔ PDF artifact:", pdf_art)
 
         # 2) (옵션) 파싱 JSON artifact + 객체  [개선: 파일도 저장]
         json_art = None
-        parsed_obj = None
+        has_parsed = False      # 청크화는 파일에서 element 단위로 읽으므로 존재 여부만 본다
 
         # (1) --parse 지정된 경우: API 호출 → parsed.json 저장 → artifact 등록
         if args.parse:
             print(f"→ parsing via Upstage: {pdf_path.name}")
-            call_document_parse(str(pdf_path), str(parsed_json_path))  # [NEW] 저장 위치 out/receipts
-            jb = parsed_json_path.read_bytes()  # [NEW]
-            json_art = register_artifact(
+            # 결과는 아래에서 파일로 다시 읽으므로 스트리밍 모드(응답을 메모리에 두지 않고 디스크로 직행)
+            call_document_parse(str(pdf_path), str(parsed_json_path), stream=True)  # [NEW] 저장 위치 out/receipts
+            # 파일에서 블록 단위로 해시/복사 — 문서를 바이트로도, 객체로도 통째로 올리지 않음
+            json_art = register_artifact_file(
                 conn,
                 org_id=args.org_id, kind="parse_json",
-                filename=parsed_json_path.name, content=jb, mime="application/json"
+                path=parsed_json_path, mime=_json_mime(parsed_json_path)
             )
             print("✔ PARSE artifact:", json_art)
-            try:
-                parsed_obj = json.loads(jb.decode("utf-8"))
-            except Exception as e:
-                print("⚠ 파싱 JSON 디코딩 실패:", e)
+            has_parsed = True
 
         # (2) --parse 없지만 --reuse-parsed면: out-dir에서 기존 parsed.json 재사용
         elif args.reuse_parsed and parsed_json_path.exists():  # [NEW]
             print(f"ℹ reuse existing parsed JSON: {parsed_json_path}")
             try:
-                jb = parsed_json_path.read_bytes()
-                parsed_obj = json.loads(jb.decode("utf-8"))
-                # 기존 파일도 artifact로 등록해 두면 추적에 유리
-                json_art = register_artifact(
+                # 기존 파일도 artifact로 등록해 두면 추적에 유리 (예전 indent=2 / 압축 산출물 모두)
+                json_art = register_artifact_file(
                     conn,
                     org_id=args.org_id, kind="parse_json",
-                    filename=parsed_json_path.name, content=jb, mime="application/json"
+                    path=parsed_json_path, mime=_json_mime(parsed_json_path)
                 )
                 print("✔ PARSE artifact (reused):", json_art)
-            except Exception as e:
+                has_parsed = True
+            except OSError as e:
                 print("⚠ 기존 parsed JSON 로드 실패:", e)
 
         # 3) budget_doc 생성
@@ -192,23 +200,38 @@ def main():
 
         # 4) (옵션) 청크 생성/저장  [개선: 파일도 저장]
         if args.chunk:
-            if parsed_obj is None:
-                print("ℹ --chunk 지정됨. parsed_obj가 없어 청크화를 스킵합니다. "
+            if not has_parsed:
+                print("ℹ --chunk 지정됨. parsed JSON이 없어 청크화를 스킵합니다. "
                       "(--parse 또는 --reuse-parsed와 함께 사용 권장)")
             else:
-                chunks = to_chunks(parsed_obj)
-                # 파일로도 보존
-                with chunks_json_path.open("w", encoding="utf-8") as f:  # [NEW]
-                    json.dump(chunks, f, ensure_ascii=False, indent=2)
-                print(f"🧩 chunks saved: {chunks_json_path} (count={len(chunks)})")  # [NEW]
-
-                count = insert_budget_chunks(
-                    conn,
-                    budget_doc_id=bid,
-                    org_id=args.org_id,
-                    policy_id=args.policy_id,
-                    chunks=chunks
-                )
+                # 청크를 하나씩 만들어 파일 기록과 DB INSERT(배치)에 동시에 흘려보냄
+                # (parsed.json을 파일에서 element 단위로 읽음 → 문서/청크 전체를 메모리에 두지 않음)
+                n_saved = 0
+
+                indent = artifact.json_indent()
+
+                def _tee(f):
+                    nonlocal n_saved
+                    chunks = to_chunks_iter(parsed_json_path)
+                    if args.pack_tokens > 0:
+                        chunks = pack_chunks(chunks, args.pack_tokens, args.overlap_tokens)
+                    for ch in chunks:
+                        f.write(",\n" if n_saved else "[\n")
+                        f.write(serde.dumps_str(ch, indent=indent is not None))
+                        n_saved += 1
+                        yield ch
+
+                # [NEW] 파일로도 보존 (ARTIFACT_CODEC에 맞춰 압축하며 흘려 씀)
+                with artifact.open_writer(chunks_json_path) as f:
+                    count = insert_budget_chunks(
+                        conn,
+                        budget_doc_id=bid,
+                        org_id=args.org_id,
+                        policy_id=args.policy_id,
+                        chunks=_tee(f)
+                    )
+                    f.write("\n]\n" if n_saved else "[]\n")
+                print(f"🧩 chunks saved: {chunks_json_path} (count={n_saved})")  # [NEW]
                 print(f"🎉 chunks inserted to DB: {count}")
 
 if __name__ == "__main__":
@@ -1,6 +1,6 @@
 from __future__ import annotations
-import os, json, psycopg2
-from pathlib import Path
+import os, psycopg2
+from lm_docparse import artifact
 from lm_rag.embeddings_upstage import embed_texts
 from dotenv import load_dotenv
 
@@ -16,7 +16,7 @@ def main():
     ap.add_argument("--in", dest="in_path", required=True, help="budgets/.../artifacts/*.json")  # ← dest 사용
     args = ap.parse_args()
 
-    data = json.loads(Path(args.in_path).read_text(encoding="utf-8"))  # ← args.in_path 로 변경
+    data = artifact.load(args.in_path)  # ← args.in_path 로 변경
     rows = data if isinstance(data, list) else data.get("lines", [])
 
     texts = [f"{r.get('line_title','')} {r.get('category_path','')} {r.get('line_code','')}".strip() for r in rows]
@@ -1,7 +1,8 @@
 from __future__ import annotations
-import os, json, psycopg2
+import os, psycopg2
 from pathlib import Path
 from typing import List, Dict, Any
+from lm_docparse import artifact
 from lm_rag.embeddings_upstage import embed_texts
 from dotenv import load_dotenv
 
@@ -11,7 +12,7 @@ def _pg():
     return psycopg2.connect(_DSN)
 
 def load_policy_chunks(path: Path) -> List[Dict[str, Any]]:
-    data = json.loads(path.read_text(encoding="utf-8"))
+    data = artifact.load(path)
     return data if isinstance(data, list) else data.get("chunks", [])
 
 def main():
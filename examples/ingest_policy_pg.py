@@ -50,6 +50,8 @@ CLI 인자:
 - --org-id            : 테넌트 ID (기본값: .env의 ORG_ID 또는 "demo.univ")
 - --version (필수)    : 정책 버전(예: "2024.09", "v1.2.0")
 - --source-pdf        : 원본 PDF 경로(선택, 있으면 PDF sha256을 정책 레코드에 저장)
+- --pack-tokens       : 같은 heading 경로의 연속 청크를 N토큰까지 합쳐 적재 (0=끔, lm_docparse.pack)
+- --overlap-tokens    : 패킹 시 앞 청크 끝 문장을 겹칠 토큰 수 (기본 0)
 
 사용 예:
   # 1) 최초 스키마 구성 시(한 번만):
@@ -80,9 +82,11 @@ CLI 인자:
 
 
 from __future__ import annotations
-import os, sys, json, hashlib, pathlib, argparse
+import os, sys, hashlib, pathlib, argparse
 from dotenv import load_dotenv
 from lm_store.pg import connect, ensure_schema, upsert_policy, bulk_insert_chunks, sha256_json
+from lm_docparse import artifact
+from lm_docparse.pack import pack_chunks
 
 def file_sha256(path: str) -> str:
     h = hashlib.sha256()
@@ -91,9 +95,10 @@ def file_sha256(path: str) -> str:
             h.update(b)
     return h.hexdigest()
 
-def main(chunks_path: str, org_id: str, version: str, source_pdf: str | None):
+def main(chunks_path: str, org_id: str, version: str, source_pdf: str | None,
+         pack_tokens: int = 0, overlap_tokens: int = 0):
     # 1) 청크 로드
-    chunks = json.load(open(chunks_path, encoding="utf-8"))
+    chunks = artifact.load(chunks_path)
 
     # 2) 원본 식별값
     if source_pdf:
@@ -103,6 +108,12 @@ def main(chunks_path: str, org_id: str, version: str, source_pdf: str | None):
         sha = sha256_json(chunks)  # pdf가 없으면 JSON 자체 해시로라도 중복 방지
         source_name = pathlib.Path(chunks_path).name
 
+    # (옵션) 토큰 예산 패킹 — 식별 해시는 원 청크 JSON 기준 그대로
+    if pack_tokens > 0:
+        n_before = len(chunks)
+        chunks = list(pack_chunks(chunks, pack_tokens, overlap_tokens))
+        print(f"→ packed {n_before} → {len(chunks)} chunks (max_tokens={pack_tokens}, overlap={overlap_tokens})")
+
     # 3) DB 연결 + (최초 1회) 스키마 보장
     conn = connect()
     # ensure_schema(conn)  # 스키마 처음 만들 때만 주석 해제
@@ -131,5 +142,7 @@ if __name__ == "__main__":
     ap.add_argument("--org-id", default=os.getenv("ORG_ID", "demo.univ"))
     ap.add_argument("--version", required=True)
     ap.add_argument("--source-pdf", default=None)
+    ap.add_argument("--pack-tokens", type=int, default=0, help="청크 패킹 토큰 예산 (0=끔)")
+    ap.add_argument("--overlap-tokens", type=int, default=0)
     args = ap.parse_args()
-    main(args.chunks, args.org_id, args.version, args.source_pdf)
+    main(args.chunks, args.org_id, args.version, args.source_pdf, args.pack_tokens, args.overlap_tokens)
@@ -18,10 +18,17 @@ LedgerMate — parse_policies.py (Typer CLI)
        [--formats html] [--b64 table] [--ocr force] [--coordinates] [--chart-recognition] \
        [--model document-parse] [--timeout 120] [-v/--quiet]
 
-2) 배치 파싱 (글롭 패턴)
+2) 배치 파싱 (글롭 패턴 / 디렉터리 / 목록 파일) — 동시 업로드 + 재시도 + 이어하기
    python examples/parse_policies.py batch "data/policies-sample/*.pdf" \
-       --out-dir out/policies \
+       --out-dir out/policies [--workers 4] [--retries 4] [--no-resume] [--report out/report.json] \
        [다른 옵션 동일]
+   - 완료 기록: <out-dir>/_manifest.jsonl (재실행 시 완료 파일 스킵)
+
+3) 비동기 작업 제출 / 수거 — 큰 문서 수십 개를 한꺼번에 띄워 두고 나중에 받기
+   python examples/parse_policies.py submit "data/policies-sample/*.pdf" --out-dir out/async [다른 옵션 동일]
+   python examples/parse_policies.py collect --out-dir out/async [--no-wait] [--timeout 3600] [--poll-max 30]
+   - 작업 기록: <out-dir>/_jobs.jsonl (request_id 보관 → 다른 프로세스/나중에 collect 가능)
+   - 로컬 테스트: examples/fake_parse_server.py 를 띄우고 PARSER_API_BASE=http://127.0.0.1:8765/v1
 
 주요 옵션 설명:
 - --out / --out-dir        : 출력 JSON 경로/디렉터리 (없으면 out/<파일명>.json 으로 자동)
@@ -36,12 +43,14 @@ LedgerMate — parse_policies.py (Typer CLI)
 
 입출력:
 - 입력: PDF(단일/여러 개)
-- 출력: JSON 파일(동일 파일명.stem + ".json")
+- 출력: JSON 파일(동일 파일명.stem + ".json"). batch/submit은 입력의 하위 폴더 구조를 out-dir 아래에 그대로 두고,
+  같은 폴더의 같은 stem(x.pdf, x.png)은 해시를 붙여 구분
 - DB 저장 없음
 
 오류/트러블슈팅:
 - 401 Unauthorized → API 키/결제 상태 확인(Upstage 콘솔)
 - 파일 매칭 0건(batch) → 글롭 패턴 확인(쉘에서 따옴표 필수일 수 있음)
+- 429 Too Many Requests 반복 → --workers 줄이기 (재시도는 지터 백오프, Retry-After 우선)
 - 출력 경로 오류 → out 디렉터리 자동 생성하지만 권한/경로 확인 필요
 - 네트워크/타임아웃 → --timeout 늘려 시도
 
@@ -50,11 +59,13 @@ LedgerMate — parse_policies.py (Typer CLI)
 """
 
 from __future__ import annotations
+import json
 import pathlib
-from glob import glob
 from typing import List
 import typer
 from dotenv import load_dotenv
+from lm_docparse.asyncjobs import AsyncParseClient, collect_jobs, jobs_summary, submit_jobs
+from lm_docparse.batch import DocParseClient, collect_inputs, parse_batch as run_batch
 from lm_docparse.pdfParser import call_document_parse
 
 app = typer.Typer(help="Upstage Parser 연습용: 단일/배치 파싱 스크립트")
@@ -100,7 +111,7 @@ def parse_one(
 
 @app.command("batch")
 def parse_batch(
-    pattern: str = typer.Argument("data/policies-sample/*.pdf"),
+    pattern: str = typer.Argument("data/policies-sample/*.pdf", help="글롭 패턴 / 디렉터리 / 목록 파일(.txt, .jsonl)"),
     out_dir: str = typer.Option("out/policies", "--out-dir"),
     ocr: str = typer.Option("force"),
     coordinates: bool = typer.Option(False),
@@ -109,32 +120,115 @@ def parse_batch(
     base64_encoding: List[str] = typer.Option(["table"], "--b64"),
     model: str = typer.Option("document-parse"),
     timeout: int = typer.Option(120),
+    workers: int = typer.Option(4, "--workers", "-j", help="동시 업로드 수"),
+    retries: int = typer.Option(4, "--retries", help="429/5xx 재시도 횟수"),
+    resume: bool = typer.Option(True, "--resume/--no-resume", help="manifest 기준 완료 파일 스킵"),
+    report: str | None = typer.Option(None, "--report", help="문서별 지연/처리량 리포트 JSON 경로"),
     verbose: bool = typer.Option(True, "--verbose/--quiet", "-v"),
 ):
-    files = sorted(glob(pattern))
-    typer.secho(f"▶ 배치 시작: {len(files)}개, pattern={pattern}", fg="cyan")
+    files = collect_inputs(pattern)
+    typer.secho(f"▶ 배치 시작: {len(files)}개, src={pattern}, workers={workers}", fg="cyan")
     if not files:
         typer.secho("❌ 매치되는 파일이 없습니다.", fg="red"); raise typer.Exit(1)
 
-    pathlib.Path(out_dir).mkdir(parents=True, exist_ok=True)
-    ok = fail = 0
-    for fp in files:
-        name = pathlib.Path(fp).stem + ".json"
-        out_path = str(pathlib.Path(out_dir) / name)
-        try:
-            typer.echo(f"  → {fp}")
-            call_document_parse(
-                fp, out_path,
-                ocr=ocr, coordinates=coordinates, chart_recognition=chart_recognition,
-                output_formats=output_formats, base64_encoding=base64_encoding,
-                model=model, timeout=timeout, verbose=verbose,
-            )
-            typer.secho(f"    ✓ Saved {out_path}", fg="green")
-            ok += 1
-        except Exception as e:
-            typer.secho(f"    ✖ 실패: {e}", fg="red")
-            fail += 1
-    typer.secho(f"종료: 성공 {ok} / 실패 {fail}", fg=("green" if fail == 0 else "yellow"))
+    def _log(r):
+        if not verbose:
+            return
+        if r.status == "ok":
+            typer.secho(f"    ✓ {r.file} → {r.out} ({r.ms:.0f} ms)", fg="green")
+        else:
+            typer.secho(f"    ✖ 실패: {r.file}: {r.error}", fg="red")
+
+    with DocParseClient(pool_size=workers, timeout=timeout, retries=retries) as client:
+        rep = run_batch(
+            files, out_dir,
+            workers=workers, client=client, resume=resume, on_done=_log,
+            ocr=ocr, coordinates=coordinates, chart_recognition=chart_recognition,
+            output_formats=output_formats, base64_encoding=base64_encoding, model=model,
+        )
+
+    s = rep.summary()
+    if report:
+        pathlib.Path(report).parent.mkdir(parents=True, exist_ok=True)
+        pathlib.Path(report).write_text(json.dumps(rep.to_dict(), ensure_ascii=False, indent=2), encoding="utf-8")
+    typer.echo(
+        f"  • {s['docs_per_s']} docs/s, {s['mb_per_s']} MB/s, wall={s['wall_s']}s, "
+        f"latency p50={s['latency_ms']['p50']}ms p90={s['latency_ms']['p90']}ms max={s['latency_ms']['max']}ms"
+    )
+    typer.secho(
+        f"종료: 성공 {s['ok']} / 실패 {s['failed']} / 스킵 {s['skipped']}",
+        fg=("green" if s["failed"] == 0 else "yellow"),
+    )
+
+@app.command("submit")
+def submit_async(
+    pattern: str = typer.Argument("data/policies-sample/*.pdf", help="글롭 패턴 / 디렉터리 / 목록 파일(.txt, .jsonl)"),
+    out_dir: str = typer.Option("out/policies", "--out-dir"),
+    ocr: str = typer.Option("force"),
+    coordinates: bool = typer.Option(False),
+    chart_recognition: bool = typer.Option(True),
+    output_formats: List[str] = typer.Option(["html"], "--formats"),
+    base64_encoding: List[str] = typer.Option(["table"], "--b64"),
+    model: str = typer.Option("document-parse"),
+    timeout: int = typer.Option(120),
+    retries: int = typer.Option(4, "--retries", help="429/5xx 재시도 횟수"),
+    verbose: bool = typer.Option(True, "--verbose/--quiet", "-v"),
+):
+    files = collect_inputs(pattern)
+    typer.secho(f"▶ 비동기 제출: {len(files)}개, src={pattern}", fg="cyan")
+    if not files:
+        typer.secho("❌ 매치되는 파일이 없습니다.", fg="red"); raise typer.Exit(1)
+
+    def _log(rec):
+        if verbose:
+            typer.echo(f"    → {rec['file']} (request_id={rec['request_id']})")
+
+    with AsyncParseClient(timeout=timeout, retries=retries) as client:
+        subs = submit_jobs(
+            files, out_dir, client=client, on_submit=_log,
+            ocr=ocr, coordinates=coordinates, chart_recognition=chart_recognition,
+            output_formats=output_formats, base64_encoding=base64_encoding, model=model,
+        )
+    typer.secho(
+        f"종료: 제출 {len(subs)} / 스킵 {len(files) - len(subs)} · 상태 {jobs_summary(out_dir)}",
+        fg="green",
+    )
+
+@app.command("collect")
+def collect_async(
+    out_dir: str = typer.Option("out/policies", "--out-dir"),
+    wait: bool = typer.Option(True, "--wait/--no-wait", help="--no-wait: 한 번만 확인하고 종료"),
+    timeout: float = typer.Option(3600.0, "--timeout", help="전체 대기 한도(초)"),
+    poll_base: float = typer.Option(1.0, "--poll-base", help="첫 폴링 간격(초), 이후 2배씩"),
+    poll_max: float = typer.Option(30.0, "--poll-max", help="폴링 간격 상한(초)"),
+    retries: int = typer.Option(4, "--retries", help="429/5xx 재시도 횟수"),
+    report: str | None = typer.Option(None, "--report", help="문서별 지연 리포트 JSON 경로"),
+    verbose: bool = typer.Option(True, "--verbose/--quiet", "-v"),
+):
+    typer.secho(f"▶ 수거 시작: {jobs_summary(out_dir)} (out-dir={out_dir})", fg="cyan")
+
+    def _log(r):
+        if not verbose:
+            return
+        if r.status == "ok":
+            typer.secho(f"    ✓ {r.file} → {r.out} (제출 후 {r.ms / 1000:.1f}s)", fg="green")
+        else:
+            typer.secho(f"    ✖ 실패: {r.file}: {r.error}", fg="red")
+
+    with AsyncParseClient(retries=retries) as client:
+        rep = collect_jobs(
+            out_dir, client=client, wait=wait, timeout=timeout,
+            poll_base=poll_base, poll_max=poll_max, on_done=_log,
+        )
+
+    s = rep.summary()
+    if report:
+        pathlib.Path(report).parent.mkdir(parents=True, exist_ok=True)
+        pathlib.Path(report).write_text(json.dumps(rep.to_dict(), ensure_ascii=False, indent=2), encoding="utf-8")
+    typer.secho(
+        f"종료: 성공 {s['ok']} / 실패 {s['failed']} / 대기 {s['skipped']} (wall={s['wall_s']}s)",
+        fg=("green" if s["failed"] == 0 and s["skipped"] == 0 else "yellow"),
+    )
 
 if __name__ == "__main__":
     app()
\ No newline at end of file
@@ -36,8 +36,8 @@ def _vec_str(v, dims: int) -> str:
 
 def main():
     # 1) 쿼리 임베딩 생성 (4096) → 2000으로 축소
-    q4096 = embed_texts([QUERY], api_key=UPSTAGE_API_KEY, base_url=UPSTAGE_BASE_URL)
-    if not q4096:
+    q4096, _ = embed_texts([QUERY], api_key=UPSTAGE_API_KEY, base_url=UPSTAGE_BASE_URL, as_array=True)
+    if not len(q4096):
         print("[ERROR] embedding failed (check UPSTAGE_API_KEY / UPSTAGE_BASE_URL)")
         sys.exit(1)
     q2000 = reduce_embeddings(q4096, dim_out=2000)[0]
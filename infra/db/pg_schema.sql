@@ -31,8 +31,13 @@ CREATE TABLE IF NOT EXISTS rule_chunk (
   tables_json   JSONB,
   embedding     vector(4096),   -- 원본 4096
   embedding_i2000 vector(2000), -- 검색용 축소본 2000
+  content_sha   TEXT,           -- sha256(공백 정규화 text + path): 버전 간 변경 없는 청크 재사용 키
+  minhash       BYTEA,          -- MinHash 서명(lm_docparse.dedup): org 내 근사 중복 청크 탐지
   created_at    TIMESTAMPTZ NOT NULL DEFAULT now()
 );
+-- 기존 DB 호환: content_sha/minhash 이전에 만든 테이블
+ALTER TABLE rule_chunk ADD COLUMN IF NOT EXISTS content_sha TEXT;
+ALTER TABLE rule_chunk ADD COLUMN IF NOT EXISTS minhash BYTEA;
 
 -- 3) 파일/원본 보관
 CREATE TABLE IF NOT EXISTS artifact (
@@ -74,9 +79,12 @@ CREATE TABLE IF NOT EXISTS budget_line (
   amount     NUMERIC(18,2),
   currency   TEXT DEFAULT 'KRW',
   notes      TEXT,
+  embed_text TEXT,            -- 적재 시 실제 임베딩 입력 (재임베딩 마이그레이션이 그대로 재사용)
   embedding  vector(4096),    -- 원본 4096
   embedding_i2000 vector(2000) -- 검색용 축소본 2000
 );
+-- 기존 DB 호환: embed_text 이전에 만든 테이블 (NULL이면 migrate가 컬럼에서 근사 재구성)
+ALTER TABLE budget_line ADD COLUMN IF NOT EXISTS embed_text TEXT;
 
 -- 6) 템플릿들
 CREATE TABLE IF NOT EXISTS form_template (
@@ -104,6 +112,7 @@ CREATE INDEX IF NOT EXISTS idx_policy_org         ON policy(org_id);
 CREATE INDEX IF NOT EXISTS idx_chunk_policy       ON rule_chunk(policy_id);
 CREATE INDEX IF NOT EXISTS idx_chunk_org          ON rule_chunk(org_id);
 CREATE INDEX IF NOT EXISTS idx_chunk_text_trgm    ON rule_chunk USING gin (text gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_chunk_policy_sha   ON rule_chunk(policy_id, content_sha);
 
 CREATE INDEX IF NOT EXISTS idx_artifact_org       ON artifact(org_id);
 CREATE INDEX IF NOT EXISTS idx_budget_org         ON budget_doc(org_id);
@@ -0,0 +1,30 @@
+-- 학습형 축소(PCA) 임베딩 컬럼 (선택)
+-- - lm_rag/pca.py 아티팩트로 축소한 벡터를 embedding_r 에, 사용한 아티팩트 태그를 reducer_tag 에 저장
+-- - 차원(512)은 RAG_REDUCED_DIM 과 반드시 일치해야 함 (다른 차원을 쓰려면 아래 숫자를 바꿔 적용)
+-- - 서로 다른 reducer_tag 의 벡터는 비교 불가 → 검색 시 reducer_tag 로 필터
+
+ALTER TABLE rule_chunk  ADD COLUMN IF NOT EXISTS embedding_r vector(512);
+ALTER TABLE rule_chunk  ADD COLUMN IF NOT EXISTS reducer_tag TEXT;
+ALTER TABLE budget_line ADD COLUMN IF NOT EXISTS embedding_r vector(512);
+ALTER TABLE budget_line ADD COLUMN IF NOT EXISTS reducer_tag TEXT;
+
+CREATE INDEX IF NOT EXISTS idx_rule_chunk_r_hnsw
+  ON rule_chunk USING hnsw (embedding_r vector_cosine_ops);
+
+CREATE INDEX IF NOT EXISTS idx_budget_line_r_hnsw
+  ON budget_line USING hnsw (embedding_r vector_cosine_ops);
+
+CREATE INDEX IF NOT EXISTS idx_rule_chunk_reducer  ON rule_chunk(reducer_tag);
+CREATE INDEX IF NOT EXISTS idx_budget_line_reducer ON budget_line(reducer_tag);
+
+-- 적재/검색이 쓰는 아티팩트 버전 고정 (lm_rag.pca.active_reducer)
+-- - 새 버전은 bin/fit_reducer.py --activate 로 기존 행 재투영 후 같은 트랜잭션에서 전환
+CREATE TABLE IF NOT EXISTS rag_reducer_active (
+  org_key     TEXT NOT NULL,                  -- org_id 또는 '_all'(공용 아티팩트)
+  model       TEXT NOT NULL,
+  dim         INT  NOT NULL,
+  version     INT  NOT NULL,
+  tag         TEXT NOT NULL,
+  updated_at  TIMESTAMPTZ NOT NULL DEFAULT now(),
+  PRIMARY KEY (org_key, model, dim)
+);
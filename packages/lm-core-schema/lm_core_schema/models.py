@@ -0,0 +1,374 @@
+# packages/lm-core-schema/lm_core_schema/models.py
+from __future__ import annotations
+
+from collections.abc import Mapping, MutableMapping
+from operator import attrgetter
+from typing import Any, Callable, ClassVar, Dict, FrozenSet, Iterator, List, Optional, Tuple
+
+from . import serde
+
+# ===== 패키지 공용 레코드 =====
+# 청크/표/영수증/검색 결과/정산 행이 패키지 사이를 dict로 오갔다. 키마다 dict 슬롯을 차지하고
+# 적재 직전마다 dict(...) / {k: v for k ...} 로 다시 복사됐다. 여기 클래스는
+#  - __slots__ 고정 필드 + 스키마 밖 키는 extra (있을 때만 dict)
+#  - MutableMapping: 기존 코드의 c.get("text"), c["order"], "tables" in c, {**c} 가 그대로 동작
+#  - JSON: serde가 __json__()으로 직렬화 → 예전 dict와 같은 키/순서 (산출물·JSONL·프롬프트 형식 불변)
+#  - DB: 행 튜플을 슬롯에서 바로 만듦 (중간 dict 없음), meta jsonb = extra만
+# _OPTIONAL 필드는 값이 None이면 키에서 빠진다 (예전 청크 dict에 tables가 있을 때만 붙던 것과 같게).
+# 필드 삭제(del/pop)는 값을 None으로 되돌리는 것이고, pop/setdefault는 None인 필드를 없는 키로 본다.
+# 레코드는 패키지 내부 표현. 공개 반환값(to_chunks(), settle())은 to_plain()으로 순수 dict로 바꿔 내보낸다
+# (레코드가 필요한 적재 경로는 chunk_records()/to_chunks_iter()).
+
+_MISSING: Any = object()
+
+
+class Record(MutableMapping):
+    __slots__ = ("extra",)
+
+    _FIELDS: ClassVar[Tuple[str, ...]] = ()
+    _OPTIONAL: ClassVar[FrozenSet[str]] = frozenset()
+    _ALIASES: ClassVar[Dict[str, str]] = {}          # from_dict에서 받는 예전 키 → 필드
+    _FIELD_SET: ClassVar[FrozenSet[str]] = frozenset()
+    _VALUES: ClassVar[Callable[[Any], Tuple[Any, ...]]] = staticmethod(lambda r: ())
+
+    extra: Optional[Dict[str, Any]]
+
+    def __init_subclass__(cls, **kw: Any) -> None:
+        super().__init_subclass__(**kw)
+        cls._FIELD_SET = frozenset(cls._FIELDS)
+        if len(cls._FIELDS) > 1:
+            cls._VALUES = staticmethod(attrgetter(*cls._FIELDS))   # 필드 값 튜플을 C에서 한 번에
+        elif cls._FIELDS:
+            get = attrgetter(cls._FIELDS[0])
+            cls._VALUES = staticmethod(lambda r: (get(r),))
+
+    # ----- 생성 -----
+    @classmethod
+    def from_dict(cls, d: Mapping[str, Any]):
+        """dict(예전 형식) → 레코드. 필드가 아닌 키는 extra로."""
+        kw: Dict[str, Any] = {}
+        extra: Dict[str, Any] = {}
+        fields, aliases = cls._FIELD_SET, cls._ALIASES
+        for k, v in d.items():
+            k = aliases.get(k, k)
+            (kw if k in fields else extra)[k] = v
+        return cls(**kw, extra=extra or None)
+
+    @classmethod
+    def coerce(cls, d: Mapping[str, Any]):
+        """이미 레코드면 그대로(복사 없음), dict면 from_dict."""
+        return d if isinstance(d, cls) else cls.from_dict(d)
+
+    # ----- Mapping -----
+    def __getitem__(self, k: str) -> Any:
+        if k in self._FIELD_SET:
+            v = getattr(self, k)
+            if v is None and k in self._OPTIONAL:
+                raise KeyError(k)
+            return v
+        if self.extra is None:
+            raise KeyError(k)
+        return self.extra[k]
+
+    def get(self, k: str, default: Any = None) -> Any:
+        if k in self._FIELD_SET:
+            v = getattr(self, k)
+            return default if v is None and k in self._OPTIONAL else v
+        return default if self.extra is None else self.extra.get(k, default)
+
+    def __contains__(self, k: object) -> bool:
+        if k in self._FIELD_SET:
+            return k not in self._OPTIONAL or getattr(self, k) is not None    # type: ignore[arg-type]
+        return self.extra is not None and k in self.extra
+
+    def __setitem__(self, k: str, v: Any) -> None:
+        if k in self._FIELD_SET:
+            setattr(self, k, v)
+        elif self.extra is None:
+            self.extra = {k: v}
+        else:
+            self.extra[k] = v
+
+    def __delitem__(self, k: str) -> None:
+        if k in self._FIELD_SET:
+            if getattr(self, k) is None:
+                raise KeyError(k)
+            setattr(self, k, None)
+        elif self.extra is not None and k in self.extra:
+            del self.extra[k]
+        else:
+            raise KeyError(k)
+
+    def pop(self, k: str, default: Any = _MISSING) -> Any:
+        if k in self._FIELD_SET:
+            v = getattr(self, k)
+            if v is not None:
+                setattr(self, k, None)
+                return v
+        elif self.extra is not None and k in self.extra:
+            return self.extra.pop(k)
+        if default is _MISSING:
+            raise KeyError(k)
+        return default
+
+    def setdefault(self, k: str, default: Any = None) -> Any:
+        if k in self._FIELD_SET:
+            v = getattr(self, k)
+            if v is None:
+                setattr(self, k, default)
+                return default
+            return v
+        if self.extra is None:
+            self.extra = {}
+        return self.extra.setdefault(k, default)
+
+    def clear(self) -> None:
+        # 기본 clear()는 popitem 반복 → None인 필수 필드가 계속 나와 멈추지 않으므로 직접 비움
+        for f in self._FIELDS:
+            setattr(self, f, None)
+        self.extra = None
+
+    def __iter__(self) -> Iterator[str]:
+        opt = self._OPTIONAL
+        for f in self._FIELDS:
+            if f not in opt or getattr(self, f) is not None:
+                yield f
+        if self.extra:
+            yield from self.extra
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    # ----- 직렬화 -----
+    def to_dict(self) -> Dict[str, Any]:
+        """예전 dict 형식 (키 순서 = 필드 순서 + extra)."""
+        d = dict(zip(self._FIELDS, self._VALUES(self)))
+        for f in self._OPTIONAL:
+            if d[f] is None:
+                del d[f]
+        if self.extra:
+            d.update(self.extra)
+        return d
+
+    __json__ = to_dict
+
+    def meta_json(self) -> str:
+        """extra만 jsonb 문자열로 (없으면 '{}')."""
+        return serde.dumps_str(self.extra) if self.extra else "{}"
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+
+def to_plain(obj: Any) -> Any:
+    """
+    레코드가 섞인 값 → 순수 dict/list (중첩 레코드까지). 공개 반환값 경계에서 사용 —
+    호출자가 표준 json.dumps / copy / isinstance(x, dict) 를 그대로 쓸 수 있게.
+    """
+    if isinstance(obj, Record):
+        return {k: to_plain(v) for k, v in obj.to_dict().items()}
+    if isinstance(obj, dict):
+        return {k: to_plain(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [to_plain(v) for v in obj]
+    return obj
+
+
+# ----- 파싱/청크 -----
+class Table(Record):
+    """extract_tables_from_html()의 표 하나."""
+
+    __slots__ = ("id", "caption", "rows", "header_rows", "row_count", "col_count", "spans", "source")
+    _FIELDS = __slots__
+
+    def __init__(
+        self,
+        id: Optional[str] = None,
+        caption: Optional[str] = None,
+        rows: Optional[List[List[str]]] = None,
+        header_rows: int = 0,
+        row_count: Optional[int] = None,
+        col_count: Optional[int] = None,
+        spans: Optional[List[Dict[str, int]]] = None,
+        source: str = "html",
+        extra: Optional[Dict[str, Any]] = None,
+    ):
+        rows = rows if rows is not None else []
+        self.id = id
+        self.caption = caption
+        self.rows = rows
+        self.header_rows = header_rows
+        self.row_count = len(rows) if row_count is None else row_count
+        self.col_count = max((len(r) for r in rows), default=0) if col_count is None else col_count
+        self.spans = spans
+        self.source = source
+        self.extra = extra
+
+
+class Chunk(Record):
+    """to_chunks()/pack_chunks() 청크. rule_chunk / budget_chunk 한 행."""
+
+    __slots__ = ("order", "code", "title", "text", "path", "context_text", "tables")
+    _FIELDS = __slots__
+    _OPTIONAL = frozenset({"tables"})
+    _ALIASES = {"tables_json": "tables"}
+
+    def __init__(
+        self,
+        order: Any = 0,
+        code: Any = None,
+        title: Optional[str] = None,
+        text: str = "",
+        path: Optional[str] = None,
+        context_text: Optional[str] = None,
+        tables: Optional[List[Any]] = None,
+        extra: Optional[Dict[str, Any]] = None,
+    ):
+        self.order = order
+        self.code = code
+        self.title = title
+        self.text = text
+        self.path = path
+        self.context_text = context_text
+        self.tables = tables
+        self.extra = extra
+
+    def tables_json(self) -> Optional[str]:
+        return serde.dumps_str(self.tables) if self.tables is not None else None
+
+    def db_row(self, ord: int, text: Optional[str] = None) -> Tuple[Any, ...]:
+        """(ord, code, title, path, text, context_text, tables_json) — rule_chunk/budget_chunk 공통 열 순서."""
+        return (
+            ord,
+            self.code,
+            self.title,
+            self.path,
+            (self.text or "") if text is None else text,
+            self.context_text,
+            self.tables_json(),
+        )
+
+
+# ----- 영수증/정산 -----
+class Receipt(Record):
+    """정규화된 영수증 (run_settlement._normalize_receipt → settle())."""
+
+    __slots__ = ("merchant", "date", "amount_total", "vat", "payment_method", "memo", "items", "raw_text")
+    _FIELDS = __slots__
+
+    def __init__(
+        self,
+        merchant: Optional[str] = None,
+        date: Optional[str] = None,
+        amount_total: Optional[float] = None,
+        vat: Optional[float] = None,
+        payment_method: Optional[str] = None,
+        memo: Optional[str] = None,
+        items: Optional[List[Dict[str, Any]]] = None,
+        raw_text: Optional[str] = None,
+        extra: Optional[Dict[str, Any]] = None,
+    ):
+        self.merchant = merchant
+        self.date = date
+        self.amount_total = amount_total
+        self.vat = vat
+        self.payment_method = payment_method
+        self.memo = memo
+        self.items = items if items is not None else []
+        self.raw_text = raw_text
+        self.extra = extra
+
+    def search_text(self) -> str:
+        """RAG 질의: 상호 + 메모 + 품목명 + 원문 (비면 '일반 지출')."""
+        names = " ".join(i.get("name", "") for i in self.items or [] if i.get("name"))
+        parts = (self.merchant or "", self.memo or "", names, self.raw_text or "")
+        return " ".join(p for p in parts if p).strip() or "일반 지출"
+
+
+class SettlementRow(Record):
+    """정산 결과 한 행 (prompts.SYSTEM의 settlement_row 스키마)."""
+
+    __slots__ = ("date", "account_code", "account_name", "detail", "amount", "vat", "payment_method", "note")
+    _FIELDS = __slots__
+
+    def __init__(
+        self,
+        date: Optional[str] = None,
+        account_code: Optional[str] = None,
+        account_name: Optional[str] = None,
+        detail: Optional[str] = None,
+        amount: Optional[float] = None,
+        vat: Optional[float] = None,
+        payment_method: Optional[str] = None,
+        note: Optional[str] = None,
+        extra: Optional[Dict[str, Any]] = None,
+    ):
+        self.date = date
+        self.account_code = account_code
+        self.account_name = account_name
+        self.detail = detail
+        self.amount = amount
+        self.vat = vat
+        self.payment_method = payment_method
+        self.note = note
+        self.extra = extra
+
+
+# ----- 검색 -----
+class RetrievalHit(Record):
+    """RAG 검색 결과 한 건 (score = 1 - 코사인 거리). 종류별 필드는 PolicyHit/BudgetHit."""
+
+    __slots__ = ("score",)
+    _FIELDS = __slots__
+
+    def __init__(self, score: Optional[float] = None, extra: Optional[Dict[str, Any]] = None):
+        self.score = score
+        self.extra = extra
+
+
+class PolicyHit(RetrievalHit):
+    """RAG.search_rules() 결과 (프롬프트의 policy_refs)."""
+
+    __slots__ = ("doc", "version", "section", "page", "snippet")
+    _FIELDS = ("doc", "version", "section", "page", "snippet", "score")
+
+    def __init__(
+        self,
+        doc: Optional[str] = None,
+        version: Optional[str] = None,
+        section: Optional[str] = None,
+        page: Optional[int] = None,
+        snippet: Optional[str] = None,
+        score: Optional[float] = None,
+        extra: Optional[Dict[str, Any]] = None,
+    ):
+        self.doc = doc
+        self.version = version
+        self.section = section
+        self.page = page
+        self.snippet = snippet
+        self.score = score
+        self.extra = extra
+
+
+class BudgetHit(RetrievalHit):
+    """RAG.search_budget_lines() 결과 (프롬프트의 budget_refs)."""
+
+    __slots__ = ("line_title", "line_code", "category_path", "remaining_amount")
+    _FIELDS = ("line_title", "line_code", "category_path", "remaining_amount", "score")
+
+    def __init__(
+        self,
+        line_title: Optional[str] = None,
+        line_code: Optional[str] = None,
+        category_path: Optional[str] = None,
+        remaining_amount: Optional[float] = None,
+        score: Optional[float] = None,
+        extra: Optional[Dict[str, Any]] = None,
+    ):
+        self.line_title = line_title
+        self.line_code = line_code
+        self.category_path = category_path
+        self.remaining_amount = remaining_amount
+        self.score = score
+        self.extra = extra
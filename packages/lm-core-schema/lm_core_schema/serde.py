@@ -0,0 +1,94 @@
+# packages/lm-core-schema/lm_core_schema/serde.py
+from __future__ import annotations
+
+import hashlib
+import json
+from typing import Any, Callable, Optional
+
+# ===== 공용 JSON 직렬화 =====
+# 패키지마다 json.dumps(..., ensure_ascii=False[, indent=2]) 를 직접 불러 왔다.
+# 자주 도는 경로(정산 프롬프트 조립, 청크 행 jsonb, JSONL/산출물 쓰기)는 여기 함수를 쓴다.
+#  - dumps / dumps_str: orjson이 있으면 orjson, 없으면 표준 json (compact, ensure_ascii=False)
+#      · indent=True → 2칸 들여쓰기 (json.dumps(indent=2)와 같은 모양)
+#      · orjson과의 차이: NaN/Infinity → null, datetime/UUID/numpy 는 직렬화됨(표준 json은 TypeError)
+#      · orjson이 못 다루는 값(64비트 넘는 정수, 잘못된 surrogate 등)은 표준 json으로 다시 시도
+#  - loads: bytes/str 모두
+#  - __json__()이 있는 객체(lm_core_schema.models 레코드)는 그 결과(dict)로 직렬화 — 모든 함수 공통
+#  - canonical_bytes: 해시용 정규 바이트 = json.dumps(obj, ensure_ascii=False, sort_keys=True).encode()
+#      이미 저장된 해시(policy.sha256 ← sha256_json, 파싱 캐시 키)와 같아야 하므로 일부러 표준 json(C 인코더)만 사용.
+#      orjson은 구분자(", " / ": ")와 float 지수 표기가 달라 같은 바이트를 만들 수 없다.
+try:
+    import orjson as _orjson
+except ImportError:  # pragma: no cover
+    _orjson = None
+
+BACKEND = "orjson" if _orjson is not None else "json"
+
+
+def _hook(default: Optional[Callable[[Any], Any]]) -> Callable[[Any], Any]:
+    def f(o: Any) -> Any:
+        j = getattr(type(o), "__json__", None)
+        if j is not None:
+            return j(o)
+        if default is not None:
+            return default(o)
+        raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+    return f
+
+
+_DEFAULT = _hook(None)
+_CANON = json.JSONEncoder(ensure_ascii=False, sort_keys=True, default=_DEFAULT)    # 매 호출 인코더 생성 비용 제거
+
+if _orjson is not None:
+    _OPT = _orjson.OPT_NON_STR_KEYS | _orjson.OPT_SERIALIZE_NUMPY
+    _OPT_INDENT = _OPT | _orjson.OPT_INDENT_2
+
+
+def dumps(
+    obj: Any,
+    *,
+    indent: bool = False,
+    sort_keys: bool = False,
+    default: Optional[Callable[[Any], Any]] = None,
+) -> bytes:
+    """obj → UTF-8 JSON bytes."""
+    default = _DEFAULT if default is None else _hook(default)
+    if _orjson is not None:
+        opt = _OPT_INDENT if indent else _OPT
+        if sort_keys:
+            opt |= _orjson.OPT_SORT_KEYS
+        try:
+            return _orjson.dumps(obj, default=default, option=opt)
+        except TypeError:
+            pass
+    if indent:
+        s = json.dumps(obj, ensure_ascii=False, indent=2, sort_keys=sort_keys, default=default)
+    else:
+        s = json.dumps(obj, ensure_ascii=False, separators=(",", ":"), sort_keys=sort_keys, default=default)
+    return s.encode("utf-8")
+
+
+def dumps_str(
+    obj: Any,
+    *,
+    indent: bool = False,
+    sort_keys: bool = False,
+    default: Optional[Callable[[Any], Any]] = None,
+) -> str:
+    """obj → JSON str (프롬프트/jsonb 파라미터/JSONL 줄)."""
+    return dumps(obj, indent=indent, sort_keys=sort_keys, default=default).decode("utf-8")
+
+
+def loads(data: bytes | bytearray | memoryview | str) -> Any:
+    if _orjson is not None:
+        return _orjson.loads(data)
+    return json.loads(data)
+
+
+def canonical_bytes(obj: Any) -> bytes:
+    """해시용 정규 바이트 (예전 json.dumps(obj, ensure_ascii=False, sort_keys=True)와 바이트 단위로 같음)."""
+    return _CANON.encode(obj).encode("utf-8")
+
+
+def canonical_sha256(obj: Any) -> str:
+    return hashlib.sha256(canonical_bytes(obj)).hexdigest()
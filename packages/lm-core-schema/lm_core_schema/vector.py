@@ -0,0 +1,14 @@
+# packages/lm-core-schema/lm_core_schema/vector.py
+from __future__ import annotations
+
+from typing import Any
+
+# ===== pgvector 리터럴 =====
+# 적재(lm_rag, bin/*)와 저장소(lm_store.pg)가 같은 함수를 쓴다 — lm_store가 lm_rag(openai 등)에 의존하지 않게 여기 둠.
+
+
+def to_pgvector(vec: Any, fmt: str = ".7g") -> str:
+    """pgvector 텍스트 리터럴 '[x1,x2,...]'. ndarray 행/리스트 모두 허용(행 단위로 그때그때 생성)."""
+    if hasattr(vec, "tolist"):
+        vec = vec.tolist()
+    return "[" + ",".join(format(x, fmt) for x in vec) + "]"
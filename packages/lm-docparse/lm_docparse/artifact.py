@@ -0,0 +1,210 @@
+# packages/lm-docparse/lm_docparse/artifact.py
+from __future__ import annotations
+
+import argparse
+import gzip
+import io
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+from typing import IO, Any, Callable, List, Optional
+
+from lm_core_schema import serde
+
+# ===== 산출물(artifact) 코덱 =====
+# 파싱 결과/OCR 번들/청크/정산 결과를 지금까지 indent=2 JSON으로 쓰고 json.load로 읽었다.
+# 큰 파싱 결과는 공백만 수십 %이고 쓰기·읽기 모두 느리다. 여기서는
+#  - 쓰기: 공백 없는 JSON(lm_core_schema.serde — orjson 있으면 orjson), 선택 시 압축 (zstandard 있으면 zstd, 없으면 gzip)
+#  - 읽기: 첫 바이트(매직)로 zstd / gzip / 평문 JSON을 구분 → 예전 indent=2 파일도 그대로 읽힘
+# 파일 이름(*.json, *.raw.json ...)은 바꾸지 않는다(글롭/경로 규칙 유지). 그래서 기본은 압축 없는 compact JSON —
+# *.json 파일을 json.load/jq/편집기로 여는 외부 도구가 깨지지 않음. 압축은 ARTIFACT_CODEC=auto|zstd|gzip 으로.
+#   python -m lm_docparse.artifact cat out/policies/x.json
+#   python -m lm_docparse.artifact convert out/policies --codec pretty     # 예전 형식으로 되돌리기
+# ARTIFACT_CODEC: json(기본, 압축 없는 compact) | auto(zstd 또는 gzip) | zstd | gzip | pretty(indent=2, 예전 형식)
+ARTIFACT_CODEC = os.getenv("ARTIFACT_CODEC", "json").strip().lower()
+ARTIFACT_LEVEL = int(os.getenv("ARTIFACT_LEVEL", "3"))
+
+CODECS = ("zstd", "gzip", "json", "pretty")
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+_GZIP_MAGIC = b"\x1f\x8b"
+
+try:
+    import zstandard as _zstd
+except ImportError:
+    _zstd = None
+
+
+def resolve_codec(codec: Optional[str] = None) -> str:
+    """codec(또는 ARTIFACT_CODEC) → 실제로 쓸 코덱. zstandard가 없으면 zstd 요청도 gzip으로."""
+    c = (codec or ARTIFACT_CODEC or "json").lower()
+    if c in ("auto", "zstd", "zst"):
+        return "zstd" if _zstd is not None else "gzip"
+    if c in ("gzip", "gz"):
+        return "gzip"
+    if c in ("json", "compact"):
+        return "json"
+    if c in ("pretty", "legacy"):
+        return "pretty"
+    raise ValueError(f"unknown artifact codec: {codec!r} (choose from {', '.join(CODECS)})")
+
+
+def sniff(data: bytes) -> str:
+    """바이트 앞부분 → 'zstd' | 'gzip' | 'json'."""
+    if data[:4] == _ZSTD_MAGIC:
+        return "zstd"
+    if data[:2] == _GZIP_MAGIC:
+        return "gzip"
+    return "json"
+
+
+def mime_of(data: bytes) -> str:
+    return {"zstd": "application/zstd", "gzip": "application/gzip"}.get(sniff(data), "application/json")
+
+
+# ----- 인코드 / 디코드 -----
+def dumps(obj: Any, codec: Optional[str] = None, *, default: Optional[Callable[[Any], Any]] = None) -> bytes:
+    c = resolve_codec(codec)
+    if c == "pretty":
+        return serde.dumps(obj, indent=True, default=default)
+    raw = serde.dumps(obj, default=default)
+    if c == "zstd":
+        return _zstd.ZstdCompressor(level=ARTIFACT_LEVEL).compress(raw)
+    if c == "gzip":
+        return gzip.compress(raw, compresslevel=ARTIFACT_LEVEL, mtime=0)   # mtime 고정 → 같은 내용이면 같은 바이트
+    return raw
+
+
+def decompress(data: bytes) -> bytes:
+    """압축돼 있으면 풀어서 JSON 바이트로 (평문이면 그대로)."""
+    kind = sniff(data)
+    if kind == "zstd":
+        if _zstd is None:
+            raise RuntimeError("zstd artifact인데 zstandard가 없습니다: pip install 'lm-docparse[zstd]'")
+        return _zstd.ZstdDecompressor().decompressobj().decompress(data)
+    if kind == "gzip":
+        return gzip.decompress(data)
+    return data
+
+
+def loads(data: bytes | str) -> Any:
+    if isinstance(data, str):
+        return serde.loads(data)
+    return serde.loads(decompress(data))
+
+
+# ----- 파일 -----
+def save(
+    path: str | Path,
+    obj: Any,
+    codec: Optional[str] = None,
+    *,
+    default: Optional[Callable[[Any], Any]] = None,
+) -> int:
+    """path에 obj 저장 (임시 파일 후 교체). 반환: 쓴 바이트 수."""
+    out = Path(path)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    data = dumps(obj, codec, default=default)
+    with tempfile.NamedTemporaryFile("wb", dir=out.parent, suffix=".tmp", delete=False) as w:
+        w.write(data)
+    os.replace(w.name, out)
+    return len(data)
+
+
+def load(path: str | Path) -> Any:
+    """zstd / gzip / 평문(예전 indent=2 포함) JSON 파일 읽기."""
+    with open(path, "rb") as f:
+        return loads(f.read())
+
+
+def open_binary(path: str | Path) -> IO[bytes]:
+    """압축을 푼 JSON 바이트 스트림 (증분 파서용). 평문이면 파일 그대로."""
+    f = open(path, "rb")
+    kind = sniff(f.read(4))
+    f.seek(0)
+    if kind == "gzip":
+        return gzip.GzipFile(fileobj=f, mode="rb")
+    if kind == "zstd":
+        if _zstd is None:
+            f.close()
+            raise RuntimeError("zstd artifact인데 zstandard가 없습니다: pip install 'lm-docparse[zstd]'")
+        return _zstd.ZstdDecompressor().stream_reader(f, closefd=True)
+    return f
+
+
+def open_text(path: str | Path) -> IO[str]:
+    return io.TextIOWrapper(open_binary(path), encoding="utf-8")
+
+
+def open_writer(path: str | Path, codec: Optional[str] = None) -> IO[str]:
+    """
+    조각씩 써 나가는 텍스트 스트림 (청크를 하나씩 흘려 쓰는 경우). 코덱에 맞게 압축하며 씀.
+    pretty/json은 평문 — 들여쓰기 여부는 쓰는 쪽이 정함(json_indent()).
+    """
+    c = resolve_codec(codec)
+    out = Path(path)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    if c == "gzip":
+        raw: IO[bytes] = gzip.GzipFile(filename="", fileobj=open(out, "wb"), mode="wb",
+                                       compresslevel=ARTIFACT_LEVEL, mtime=0)
+        return _ClosingText(raw)
+    if c == "zstd":
+        return _ClosingText(_zstd.ZstdCompressor(level=ARTIFACT_LEVEL).stream_writer(open(out, "wb"), closefd=True))
+    return open(out, "w", encoding="utf-8")
+
+
+class _ClosingText(io.TextIOWrapper):
+    # GzipFile(fileobj=...)는 닫아도 fileobj를 닫지 않음 → 바깥 파일까지 닫아 줌
+    def __init__(self, raw: IO[bytes]):
+        super().__init__(raw, encoding="utf-8")
+
+    def close(self) -> None:
+        inner = getattr(self.buffer, "fileobj", None)
+        super().close()
+        if inner is not None:
+            inner.close()
+
+
+def json_indent(codec: Optional[str] = None) -> Optional[int]:
+    """조각 단위 json.dumps에 쓸 indent (pretty면 2, 나머지는 compact)."""
+    return 2 if resolve_codec(codec) == "pretty" else None
+
+
+# ----- CLI -----
+def _collect(srcs: List[str]) -> List[Path]:
+    out: List[Path] = []
+    for s in srcs:
+        p = Path(s)
+        out.extend(sorted(p.rglob("*.json")) if p.is_dir() else [p])
+    return out
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description="LedgerMate - 산출물 JSON 코덱 (보기/변환)")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    c = sub.add_parser("cat", help="산출물을 indent=2 JSON으로 출력")
+    c.add_argument("path")
+    v = sub.add_parser("convert", help="산출물 파일/디렉터리를 다른 코덱으로 다시 저장 (같은 경로)")
+    v.add_argument("paths", nargs="+")
+    v.add_argument("--codec", default=None, help=f"{'|'.join(CODECS)} (기본: ARTIFACT_CODEC)")
+    args = ap.parse_args(argv)
+
+    if args.cmd == "cat":
+        sys.stdout.write(json.dumps(load(args.path), ensure_ascii=False, indent=2) + "\n")
+        return
+    codec = resolve_codec(args.codec)
+    before = after = 0
+    for p in _collect(args.paths):
+        try:
+            obj = load(p)
+        except (OSError, ValueError) as e:
+            print(f"  ✖ {p}: {e}", file=sys.stderr)
+            continue
+        before += p.stat().st_size
+        after += save(p, obj, codec)
+    print(f"[OK] codec={codec} {before / 1e6:.2f} MB → {after / 1e6:.2f} MB")
+
+
+if __name__ == "__main__":
+    main()
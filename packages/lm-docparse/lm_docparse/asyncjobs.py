@@ -0,0 +1,300 @@
+# packages/lm-docparse/lm_docparse/asyncjobs.py
+from __future__ import annotations
+
+import hashlib
+import random
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from lm_core_schema import serde
+
+from .batch import BatchReport, DocParseClient, DocResult, ParseError, _file_key, _write_json_atomic, output_paths
+from .pdfParser import _form_data
+
+# ===== 비동기 document-parse (작업 제출 → 폴링 → 수거) =====
+# 동기 엔드포인트는 큰 문서에서 timeout=120에 걸리고 그동안 워커 하나가 묶인다.
+# 비동기 API는
+#   POST {BASE}/document-digitization/async        → {"request_id": "..."}
+#   GET  {BASE}/document-digitization/requests/{id} → {"status": submitted|started|completed|failed,
+#                                                       "batches": [{"start_page","end_page","download_url",..}]}
+# 완료되면 페이지 구간(batch)별 결과 JSON을 download_url에서 받아 shard.merge_results로 합친다.
+# - 제출한 작업은 <out-dir>/_jobs.jsonl 에 한 줄씩 기록 → 프로세스가 죽어도 collect로 이어서 수거
+# - 한 스레드에서 수십 개 작업을 동시에 띄워 두고 돌아가며 폴링 (작업마다 지수 백오프 + 지터)
+# - PARSER_API_BASE 를 바꾸면 로컬 대역 서버(examples/fake_parse_server.py)로 그대로 테스트 가능
+JOBS_NAME = "_jobs.jsonl"
+DONE_STATUS = frozenset({"completed"})
+FAIL_STATUS = frozenset({"failed"})
+MAX_JOB_ERRORS = 3      # 수거 중 같은 작업에서 예외(깨진 응답/병합/쓰기 오류)가 이만큼 나면 실패 처리
+
+
+class AsyncParseClient(DocParseClient):
+    """DocParseClient(세션/재시도 공유) + 비동기 작업 API."""
+
+    def __init__(self, *args: Any, **kw: Any):
+        super().__init__(*args, **kw)
+        base = self.url.rstrip("/")
+        self.async_url = f"{base}/async"
+        self.status_url = f"{base}/requests"
+
+    def submit(
+        self,
+        input_file: str,
+        *,
+        ocr: str = "force",
+        coordinates: bool = True,
+        chart_recognition: bool = True,
+        output_formats: list[str] = ["html"],
+        base64_encoding: list[str] = ["table"],
+        model: str = "document-parse",
+    ) -> str:
+        """업로드만 하고 request_id 반환 (파싱 완료를 기다리지 않음)."""
+        data = _form_data(
+            ocr=ocr,
+            coordinates=coordinates,
+            chart_recognition=chart_recognition,
+            output_formats=output_formats,
+            base64_encoding=base64_encoding,
+            model=model,
+        )
+        body = self._send("POST", self.async_url, input_file=input_file, data=data).json()
+        rid = body.get("request_id") or body.get("id")
+        if not rid:
+            raise ParseError(f"[Upstage] async 응답에 request_id 없음: {str(body)[:300]}")
+        return str(rid)
+
+    def status(self, request_id: str) -> Dict[str, Any]:
+        return self._send("GET", f"{self.status_url}/{request_id}").json()
+
+    def fetch(self, status: Dict[str, Any]) -> Dict[str, Any]:
+        """완료된 작업의 batch 결과들을 받아 단일 응답으로 합침."""
+        from .shard import merge_results
+
+        parts = []
+        for b in sorted(status.get("batches") or [], key=lambda b: int(b.get("start_page") or 0)):
+            url = b.get("download_url")
+            if not url:
+                raise ParseError(f"batch {b.get('id')} download_url 없음 (status={b.get('status')})")
+            # download_url은 서명된 URL — 세션의 Authorization 헤더를 빼고 요청
+            part = self._send("GET", url, headers={"Authorization": None}).json()
+            start = int(b.get("start_page") or 1)
+            pages = [el.get("page") for el in part.get("elements") or [] if isinstance(el.get("page"), int)]
+            # batch 결과의 page가 이미 문서 기준이면 그대로, 1부터 다시 세면 start_page만큼 밀어줌
+            parts.append((1 if (not pages or min(pages) >= start) else start, part))
+        if not parts:
+            raise ParseError(f"완료 작업에 batch 없음: {status.get('id')}")
+        return parts[0][1] if len(parts) == 1 and parts[0][0] == 1 else merge_results(parts)
+
+    def wait(
+        self,
+        request_id: str,
+        *,
+        timeout: float = 1800.0,
+        poll_base: float = 1.0,
+        poll_max: float = 30.0,
+    ) -> Dict[str, Any]:
+        """하나의 작업을 끝날 때까지 폴링 → 합친 응답. 실패/시간 초과면 ParseError."""
+        t_end = time.monotonic() + timeout
+        attempt = 0
+        while True:
+            st = self.status(request_id)
+            s = str(st.get("status") or "").lower()
+            if s in DONE_STATUS:
+                return self.fetch(st)
+            if s in FAIL_STATUS:
+                raise ParseError(f"async job {request_id} failed: {st.get('failure_message') or st}")
+            if time.monotonic() >= t_end:
+                raise ParseError(f"async job {request_id} timed out (status={s})")
+            time.sleep(_poll_delay(attempt, poll_base, poll_max))
+            attempt += 1
+
+
+def _poll_delay(attempt: int, base: float, cap: float) -> float:
+    # 지수 백오프 + 지터 (0.5~1.0배) — 동시에 제출한 작업들의 폴링이 한 시점에 몰리지 않게
+    return min(cap, base * (2 ** attempt)) * random.uniform(0.5, 1.0)
+
+
+# ----- 작업 기록 (_jobs.jsonl) -----
+def load_jobs(path: Path) -> Dict[str, Dict[str, Any]]:
+    """파일 key → 마지막 기록. 깨진 줄(중단 시 마지막 줄)은 무시."""
+    jobs: Dict[str, Dict[str, Any]] = {}
+    if not path.exists():
+        return jobs
+    for line in path.read_text(encoding="utf-8").splitlines():
+        try:
+            rec = serde.loads(line)
+        except ValueError:
+            continue
+        if rec.get("key"):
+            jobs[rec["key"]] = rec
+    return jobs
+
+
+class _JobLog:
+    def __init__(self, path: Path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def append(self, rec: Dict[str, Any]) -> None:
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self.path.open("a", encoding="utf-8") as f:
+                f.write(serde.dumps_str({**rec, "ts": time.time()}) + "\n")
+
+
+def submit_jobs(
+    inputs: Iterable[str | Path],
+    out_dir: str | Path,
+    *,
+    client: AsyncParseClient | None = None,
+    jobs_path: str | Path | None = None,
+    on_submit: Optional[Callable[[Dict[str, Any]], None]] = None,
+    **parse_opts: Any,
+) -> List[Dict[str, Any]]:
+    """
+    inputs를 비동기 작업으로 제출하고 _jobs.jsonl에 기록. 반환: 이번에 제출한 작업 기록.
+    이미 제출(대기 중)이거나 완료된 파일(출력 존재)은 건너뜀 — 같은 명령을 다시 실행해도 안전.
+    """
+    out_dir = Path(out_dir)
+    jpath = Path(jobs_path) if jobs_path else out_dir / JOBS_NAME
+    jobs = load_jobs(jpath)
+    log = _JobLog(jpath)
+    own = client is None
+    client = client or AsyncParseClient()
+    submitted: List[Dict[str, Any]] = []
+    # 출력 경로: 입력 상대 경로 유지(batch.output_paths) + 이전 실행의 다른 파일 작업과 겹치면 해시 접미사
+    files = [Path(x) for x in inputs]
+    taken = {r["out"]: Path(r["file"]).resolve() for r in jobs.values()
+             if r.get("out") and r.get("file") and r.get("status") in ("pending", "ok")}
+    try:
+        for fp, out in zip(files, output_paths(files, out_dir)):
+            key = _file_key(fp)
+            prev = jobs.get(key)
+            if prev and (prev.get("status") == "pending" or
+                         (prev.get("status") == "ok" and Path(prev.get("out") or "").exists())):
+                continue
+            owner = taken.get(str(out))
+            if owner is not None and owner != fp.resolve():
+                h = hashlib.sha1(str(fp.resolve()).encode("utf-8")).hexdigest()[:8]
+                out = out.with_name(f"{out.stem}-{h}{out.suffix}")
+            taken[str(out)] = fp.resolve()
+            rec = {"key": key, "file": str(fp), "out": str(out),
+                   "request_id": client.submit(str(fp), **parse_opts), "status": "pending",
+                   "bytes": fp.stat().st_size, "submitted_at": time.time()}
+            log.append(rec)
+            submitted.append(rec)
+            if on_submit:
+                on_submit(rec)
+    finally:
+        if own:
+            client.close()
+    return submitted
+
+
+def collect_jobs(
+    out_dir: str | Path,
+    *,
+    client: AsyncParseClient | None = None,
+    jobs_path: str | Path | None = None,
+    wait: bool = True,
+    timeout: float = 3600.0,
+    poll_base: float = 1.0,
+    poll_max: float = 30.0,
+    blob_store: Any = "default",
+    on_done: Optional[Callable[[DocResult], None]] = None,
+) -> BatchReport:
+    """
+    _jobs.jsonl의 대기 작업을 돌아가며 폴링해 완료된 것부터 저장(제출 때 정한 out 경로).
+    - 한 스레드가 모든 작업을 맡음: 작업마다 다음 폴링 시각을 따로 두고 가장 이른 것부터 확인
+    - wait=False: 한 바퀴만 확인하고 반환 (남은 작업은 다음 collect에서)
+    - 결과는 동기 경로와 같게 base64 이미지를 blob으로 분리해 저장 (blobs.offload_base64)
+    - 작업 하나의 예외(JSON 아닌 응답, 병합 오류, 쓰기 오류 등)는 그 작업만 다시 폴링,
+      MAX_JOB_ERRORS번 연속이면 실패로 기록 — 나머지 작업 수거는 계속
+    """
+    from .blobs import offload_base64
+
+    out_dir = Path(out_dir)
+    jpath = Path(jobs_path) if jobs_path else out_dir / JOBS_NAME
+    log = _JobLog(jpath)
+    pending = {r["key"]: r for r in load_jobs(jpath).values() if r.get("status") == "pending"}
+    report = BatchReport(total=len(pending))
+    own = client is None
+    client = client or AsyncParseClient()
+
+    t_start = time.monotonic()
+    deadline = t_start + timeout
+    sched = {k: (t_start, 0) for k in pending}          # key → (다음 폴링 시각, 시도 수)
+    errors: Dict[str, int] = {}                          # key → 연속 예외 수
+
+    def _finish(rec: Dict[str, Any], res: DocResult) -> None:
+        log.append({"key": rec["key"], "file": rec["file"], "request_id": rec["request_id"],
+                    "out": res.out, "status": res.status, "error": res.error})
+        report.docs.append(res)
+        if res.status == "ok":
+            report.ok += 1
+        else:
+            report.failed += 1
+        if on_done:
+            on_done(res)
+
+    def _poll(rec: Dict[str, Any]) -> bool:
+        """한 번 확인. 끝났으면(성공/실패) True."""
+        try:
+            st = client.status(rec["request_id"])
+            s = str(st.get("status") or "").lower()
+            if s in DONE_STATUS:
+                result, _ = offload_base64(client.fetch(st), blob_store, inplace=True)
+                _write_json_atomic(Path(rec["out"]), result)
+                ms = (time.time() - float(rec.get("submitted_at") or time.time())) * 1000
+                _finish(rec, DocResult(rec["file"], rec["out"], "ok", ms, int(rec.get("bytes") or 0)))
+                return True
+            if s in FAIL_STATUS:
+                _finish(rec, DocResult(rec["file"], None, "fail", error=str(st.get("failure_message") or st)[:500]))
+                return True
+        except ParseError as e:
+            # _send 재시도가 끝난 5xx/429/네트워크 오류는 다음 폴링에서 다시, 그 밖의 4xx는 실패 확정
+            if e.status is not None and e.status < 500 and e.status != 429:
+                _finish(rec, DocResult(rec["file"], None, "fail", error=str(e)[:500]))
+                return True
+        except Exception as e:
+            n = errors[rec["key"]] = errors.get(rec["key"], 0) + 1
+            if n >= MAX_JOB_ERRORS:
+                _finish(rec, DocResult(rec["file"], None, "fail", error=f"{type(e).__name__}: {e}"[:500]))
+                return True
+            return False
+        errors.pop(rec["key"], None)
+        return False
+
+    try:
+        if not wait:
+            for key in list(sched):
+                if _poll(pending[key]):
+                    del sched[key]
+        while wait and sched:
+            key, (due, attempt) = min(sched.items(), key=lambda kv: kv[1][0])
+            now = time.monotonic()
+            if due > now:
+                if due > deadline:
+                    break
+                time.sleep(due - now)
+            if _poll(pending[key]):
+                del sched[key]
+            else:
+                sched[key] = (time.monotonic() + _poll_delay(attempt, poll_base, poll_max), attempt + 1)
+    finally:
+        if own:
+            client.close()
+    report.skipped = len(sched)                           # 아직 대기 중 — 다음 collect에서 이어서
+    report.wall_s = time.monotonic() - t_start
+    return report
+
+
+def jobs_summary(out_dir: str | Path, jobs_path: str | Path | None = None) -> Dict[str, int]:
+    """_jobs.jsonl 상태별 개수 (pending/ok/fail)."""
+    jpath = Path(jobs_path) if jobs_path else Path(out_dir) / JOBS_NAME
+    out: Dict[str, int] = {}
+    for r in load_jobs(jpath).values():
+        out[r.get("status") or "?"] = out.get(r.get("status") or "?", 0) + 1
+    return out
+
@@ -0,0 +1,369 @@
+# packages/lm-docparse/lm_docparse/batch.py
+from __future__ import annotations
+
+import hashlib
+import os
+import random
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from lm_core_schema import serde
+
+from . import artifact, pdfParser
+from .pdfParser import _form_data
+
+# ===== 동시 배치 파서 =====
+# - 커넥션 풀을 공유하는 Session 하나로 N개 문서를 병렬 업로드
+# - 429/5xx/네트워크 오류는 지터 포함 지수 백오프로 재시도 (Retry-After 우선)
+# - 완료 목록(manifest.jsonl)을 남겨 재실행 시 이미 끝난 파일은 건너뜀
+DOC_EXTS = (".pdf", ".png", ".jpg", ".jpeg", ".tif", ".tiff", ".bmp", ".heic", ".docx", ".pptx", ".xlsx", ".hwp")
+RETRY_STATUS = frozenset({429, 500, 502, 503, 504})
+MANIFEST_NAME = "_manifest.jsonl"
+
+
+class ParseError(RuntimeError):
+    def __init__(self, msg: str, status: int | None = None):
+        super().__init__(msg)
+        self.status = status
+
+
+class DocParseClient:
+    """
+    document-digitization 클라이언트 (스레드 간 공유용).
+    - pool_size: 동시 요청 수 이상으로 잡아야 커넥션 재사용이 됨
+    """
+
+    def __init__(
+        self,
+        api_key: str | None = None,
+        url: str | None = None,
+        pool_size: int = 8,
+        timeout: int = 120,
+        retries: int = 4,
+        backoff_base: float = 1.0,
+        backoff_max: float = 30.0,
+    ):
+        self.api_key = api_key or pdfParser.API_KEY
+        if not self.api_key:
+            raise RuntimeError("Set UPSTAGE_API_KEY (or PARSER_API_KEY) in .env")
+        self.url = url or pdfParser.URL
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._session = requests.Session()
+        self._session.headers.update({"Authorization": f"Bearer {self.api_key}"})
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+
+    def _sleep_for(self, attempt: int, resp: requests.Response | None) -> float:
+        if resp is not None:
+            ra = resp.headers.get("Retry-After")
+            if ra and ra.strip().isdigit():
+                return min(float(ra), self.backoff_max)
+        # full jitter: U(0, min(max, base·2^attempt))
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def parse(
+        self,
+        input_file: str,
+        *,
+        ocr: str = "force",
+        coordinates: bool = True,
+        chart_recognition: bool = True,
+        output_formats: list[str] = ["html"],
+        base64_encoding: list[str] = ["table"],
+        model: str = "document-parse",
+    ) -> Dict[str, Any]:
+        data = _form_data(
+            ocr=ocr,
+            coordinates=coordinates,
+            chart_recognition=chart_recognition,
+            output_formats=output_formats,
+            base64_encoding=base64_encoding,
+            model=model,
+        )
+        return self._send("POST", self.url, input_file=input_file, data=data).json()
+
+    def _send(self, method: str, url: str, *, input_file: str | None = None, **kw: Any) -> requests.Response:
+        """재시도 포함 요청. input_file이 있으면 시도마다 다시 열어 document로 업로드."""
+        last: Exception | None = None
+        for attempt in range(self.retries + 1):
+            resp = None
+            try:
+                if input_file is not None:
+                    with open(input_file, "rb") as f:
+                        resp = self._session.request(
+                            method, url, files={"document": (os.path.basename(input_file), f)},
+                            timeout=self.timeout, **kw,
+                        )
+                else:
+                    resp = self._session.request(method, url, timeout=self.timeout, **kw)
+                if resp.status_code in RETRY_STATUS:
+                    last = ParseError(f"[Upstage] HTTP {resp.status_code}: {resp.text[:300]}", resp.status_code)
+                elif resp.status_code >= 400:
+                    # 4xx(429 제외)는 재시도해도 같음
+                    raise ParseError(f"[Upstage] HTTP {resp.status_code}: {resp.text[:500]}", resp.status_code)
+                else:
+                    return resp
+            except (requests.ConnectionError, requests.Timeout) as e:
+                last = e
+            if attempt < self.retries:
+                time.sleep(self._sleep_for(attempt, resp))
+        raise ParseError(f"retries exhausted: {last}", getattr(last, "status", None))
+
+    def close(self) -> None:
+        try:
+            self._session.close()
+        except Exception:
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+# ----- 입력/manifest -----
+def collect_inputs(src: str | Path) -> List[Path]:
+    """
+    디렉터리(하위 포함 문서 확장자) / 목록 파일(.txt: 줄당 경로, .jsonl: {"file": ...}) / 글롭 패턴.
+    """
+    p = Path(src)
+    if p.is_dir():
+        return sorted(q for q in p.rglob("*") if q.is_file() and q.suffix.lower() in DOC_EXTS)
+    if p.is_file() and p.suffix.lower() in (".txt", ".lst", ".jsonl"):
+        out: List[Path] = []
+        for line in p.read_text(encoding="utf-8").splitlines():
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            if line.startswith("{"):
+                line = serde.loads(line).get("file") or ""
+            if line:
+                q = Path(line)
+                out.append(q if q.is_absolute() else (p.parent / q))
+        return out
+    if p.is_file():
+        return [p]
+    from glob import glob
+
+    return [Path(x) for x in sorted(glob(str(src)))]
+
+
+def output_paths(files: List[Path], out_dir: str | Path, suffix: str = ".json") -> List[Path]:
+    """
+    입력 → 출력 경로. 입력들의 공통 상위 디렉터리 기준 상대 경로를 out_dir 아래에 그대로 둔다
+    (a/x.pdf, b/x.pdf → out/a/x.json, out/b/x.json). 그래도 겹치는 입력(같은 폴더의 x.pdf, x.png)은
+    상대 경로 해시를 붙여 구분 (out/x-1a2b3c4d.json).
+    """
+    if not files:
+        return []
+    out_dir = Path(out_dir)
+    res = [Path(f).resolve() for f in files]
+    try:
+        root: Optional[Path] = Path(os.path.commonpath([str(r.parent) for r in res]))
+    except ValueError:                       # 드라이브가 다른 경우 등
+        root = None
+    rels = [r.relative_to(root) if root else Path(r.name) for r in res]
+    outs = [out_dir / rel.with_suffix(suffix) for rel in rels]
+    owners: Dict[Path, set] = {}
+    for o, r in zip(outs, res):
+        owners.setdefault(o, set()).add(r)
+    for i, o in enumerate(outs):
+        if len(owners[o]) > 1:
+            h = hashlib.sha1(rels[i].as_posix().encode("utf-8")).hexdigest()[:8]
+            outs[i] = o.with_name(f"{o.stem}-{h}{suffix}")
+    return outs
+
+
+def _file_key(p: Path) -> str:
+    st = p.stat()
+    return f"{p.resolve()}|{st.st_size}|{st.st_mtime_ns}"
+
+
+def load_manifest(path: Path) -> Dict[str, Dict[str, Any]]:
+    """완료 기록(key → 마지막 레코드). 깨진 줄(중단 시 마지막 줄)은 무시."""
+    done: Dict[str, Dict[str, Any]] = {}
+    if not path.exists():
+        return done
+    for line in path.read_text(encoding="utf-8").splitlines():
+        try:
+            rec = serde.loads(line)
+        except ValueError:
+            continue
+        if rec.get("status") == "ok":
+            done[rec["key"]] = rec
+        else:
+            done.pop(rec.get("key"), None)
+    return done
+
+
+def _key_opts(parse_opts: Dict[str, Any]) -> Dict[str, Any]:
+    # DocParseClient.parse 기본값과 동일하게 채워 캐시 키 계산
+    return {
+        "model": parse_opts.get("model", "document-parse"),
+        "ocr": parse_opts.get("ocr", "force"),
+        "output_formats": parse_opts.get("output_formats", ["html"]),
+        "coordinates": parse_opts.get("coordinates", True),
+        "base64_encoding": parse_opts.get("base64_encoding", ["table"]),
+        "chart_recognition": parse_opts.get("chart_recognition", True),
+    }
+
+
+def _write_json_atomic(out_path: Path, obj: Any) -> None:
+    artifact.save(out_path, obj)
+
+
+# ----- 리포트 -----
+@dataclass
+class DocResult:
+    file: str
+    out: str | None
+    status: str            # ok | fail | skipped
+    ms: float = 0.0
+    bytes: int = 0
+    error: str | None = None
+
+
+@dataclass
+class BatchReport:
+    total: int = 0
+    ok: int = 0
+    failed: int = 0
+    skipped: int = 0
+    wall_s: float = 0.0
+    docs: List[DocResult] = field(default_factory=list)
+
+    def _lat(self) -> List[float]:
+        return sorted(d.ms for d in self.docs if d.status == "ok")
+
+    def summary(self) -> Dict[str, Any]:
+        lat = self._lat()
+
+        def pct(q: float) -> float:
+            if not lat:
+                return 0.0
+            return lat[min(len(lat) - 1, int(round(q * (len(lat) - 1))))]
+
+        mb = sum(d.bytes for d in self.docs if d.status == "ok") / 1e6
+        return {
+            "total": self.total,
+            "ok": self.ok,
+            "failed": self.failed,
+            "skipped": self.skipped,
+            "wall_s": round(self.wall_s, 3),
+            "docs_per_s": round(self.ok / self.wall_s, 3) if self.wall_s else 0.0,
+            "mb_per_s": round(mb / self.wall_s, 3) if self.wall_s else 0.0,
+            "latency_ms": {
+                "p50": round(pct(0.50), 1),
+                "p90": round(pct(0.90), 1),
+                "p99": round(pct(0.99), 1),
+                "max": round(lat[-1], 1) if lat else 0.0,
+            },
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"summary": self.summary(), "docs": [asdict(d) for d in self.docs]}
+
+
+def parse_batch(
+    inputs: Iterable[str | Path],
+    out_dir: str | Path,
+    *,
+    workers: int = 4,
+    client: DocParseClient | None = None,
+    manifest: str | Path | None = None,
+    resume: bool = True,
+    on_done: Optional[Callable[[DocResult], None]] = None,
+    cache: Any = "default",
+    blob_store: Any = "default",
+    **parse_opts: Any,
+) -> BatchReport:
+    """
+    inputs를 workers개 스레드로 병렬 파싱 → out_dir/<입력 상대 경로>.json (output_paths).
+    - manifest(기본 out_dir/_manifest.jsonl)에 결과를 한 줄씩 append
+    - resume=True: manifest상 ok이고 출력 파일이 남아 있으면 스킵 (파일 경로/크기/mtime이 같을 때)
+    - cache: 파싱 결과 캐시(lm_docparse.cache) — 경로가 달라도 내용/옵션이 같으면 업로드 없이 재사용
+    - blob_store: base64 이미지를 내용 주소 파일로 분리 (lm_docparse.blobs, None이면 인라인 유지)
+    """
+    from .blobs import default_store, offload_base64
+    from .cache import cache_key, default_cache, file_sha256
+
+    if cache == "default":
+        cache = default_cache()
+    if blob_store == "default":
+        blob_store = default_store()
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    mpath = Path(manifest) if manifest else out_dir / MANIFEST_NAME
+    done = load_manifest(mpath) if resume else {}
+
+    files = [Path(x) for x in inputs]
+    report = BatchReport(total=len(files))
+    todo: List[tuple[Path, str, Path]] = []
+    for fp, out_path in zip(files, output_paths(files, out_dir)):
+        key = _file_key(fp)
+        rec = done.get(key)
+        if rec and Path(rec.get("out") or "").exists():
+            report.skipped += 1
+            report.docs.append(DocResult(str(fp), rec.get("out"), "skipped"))
+            continue
+        todo.append((fp, key, out_path))
+
+    own_client = client is None
+    client = client or DocParseClient(pool_size=max(1, workers))
+    lock = threading.Lock()
+
+    def _one(fp: Path, key: str, out_path: Path) -> DocResult:
+        t0 = time.perf_counter()
+        try:
+            ckey = None
+            hit = None
+            if cache is not None:
+                ckey = cache_key(file_sha256(fp), **_key_opts(parse_opts))
+                hit = cache.get_path(ckey)
+            if hit is not None:
+                out_path.parent.mkdir(parents=True, exist_ok=True)
+                shutil.copyfile(hit, out_path)
+            else:
+                result, _ = offload_base64(client.parse(str(fp), **parse_opts), blob_store, inplace=True)
+                _write_json_atomic(out_path, result)
+                if ckey:
+                    cache.put_file(ckey, out_path)
+            res = DocResult(str(fp), str(out_path), "ok", (time.perf_counter() - t0) * 1000, fp.stat().st_size)
+        except Exception as e:
+            res = DocResult(str(fp), None, "fail", (time.perf_counter() - t0) * 1000, 0, str(e)[:500])
+        with lock:
+            with mpath.open("a", encoding="utf-8") as m:
+                m.write(serde.dumps_str({"key": key, **asdict(res), "ts": time.time()}) + "\n")
+        return res
+
+    t_start = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as ex:
+            futs = [ex.submit(_one, *t) for t in todo]
+            for fut in as_completed(futs):
+                res = fut.result()
+                report.docs.append(res)
+                if res.status == "ok":
+                    report.ok += 1
+                else:
+                    report.failed += 1
+                if on_done:
+                    on_done(res)
+    finally:
+        if own_client:
+            client.close()
+    report.wall_s = time.perf_counter() - t_start
+    return report
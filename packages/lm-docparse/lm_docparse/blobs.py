@@ -0,0 +1,180 @@
+# packages/lm-docparse/lm_docparse/blobs.py
+from __future__ import annotations
+
+import base64
+import binascii
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+# ===== base64 이미지 분리 저장 =====
+# base64_encoding=["table"] 응답은 표 element마다 이미지(base64)를 품고 있어
+# 저장 JSON / Mongo document_raw / to_chunks() 메모리를 키운다(청커는 이미지를 안 씀).
+# 저장 시점에 디코딩한 바이트를 내용 주소(sha256) 파일로 떼어내고 element에는 참조만 남긴다.
+#   {"base64_encoding": "<...>"}  →  {"base64_ref": {"sha256": "...", "mime": "image/jpeg", "bytes": 12345}}
+# 이미지가 필요한 곳은 load_base64()/load_blob()으로 그때 읽는다.
+# 백엔드
+#  - LocalBlobStore   : 로컬 디렉터리 (기본, PARSE_BLOB_DIR)
+#  - ArtifactBlobStore: lm_store artifact 테이블 (kind='parse_blob')
+# PARSE_OFFLOAD_BASE64=off 면 원 응답 그대로 저장
+# Mongo document_raw(lm_store.mongo.save_raw_policy)는 blob_store를 명시할 때만 분리 (로컬 캐시에 묶이지 않게)
+BLOB_DIR = Path(
+    os.getenv("PARSE_BLOB_DIR") or Path.home() / ".cache" / "ledgermate" / "blobs"
+).expanduser()
+OFFLOAD_BASE64 = os.getenv("PARSE_OFFLOAD_BASE64", "on").strip().lower() not in ("off", "0", "false", "no", "none")
+
+B64_KEY = "base64_encoding"
+REF_KEY = "base64_ref"
+
+_MAGIC = (
+    (b"\xff\xd8\xff", "image/jpeg", ".jpg"),
+    (b"\x89PNG\r\n\x1a\n", "image/png", ".png"),
+    (b"GIF8", "image/gif", ".gif"),
+    (b"II*\x00", "image/tiff", ".tif"),
+    (b"MM\x00*", "image/tiff", ".tif"),
+)
+
+
+def _sniff(b: bytes) -> Tuple[str, str]:
+    for magic, mime, ext in _MAGIC:
+        if b.startswith(magic):
+            return mime, ext
+    return "application/octet-stream", ".bin"
+
+
+class LocalBlobStore:
+    """<dir>/<sha[:2]>/<sha><ext> — 같은 이미지는 한 번만 저장."""
+
+    def __init__(self, root: str | Path | None = None):
+        self.root = Path(root or BLOB_DIR)
+
+    def path(self, sha: str, ext: str = "") -> Path:
+        d = self.root / sha[:2]
+        if ext:
+            return d / f"{sha}{ext}"
+        hits = sorted(d.glob(f"{sha}.*")) if d.exists() else []
+        return hits[0] if hits else d / sha
+
+    def put(self, data: bytes, sha: str, ext: str) -> None:
+        dst = self.path(sha, ext)
+        if dst.exists():
+            return
+        dst.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile("wb", dir=dst.parent, suffix=".tmp", delete=False) as w:
+            w.write(data)
+        os.replace(w.name, dst)
+
+    def get(self, sha: str) -> Optional[bytes]:
+        p = self.path(sha)
+        try:
+            return p.read_bytes()
+        except OSError:
+            return None
+
+
+class ArtifactBlobStore:
+    """
+    lm_store artifact 테이블 백엔드 (kind='parse_blob', filename='blob_<sha><ext>').
+    register_artifact가 (org_id, sha256, kind) 기준으로 중복 저장을 막는다.
+    """
+
+    KIND = "parse_blob"
+
+    def __init__(self, conn, org_id: str):
+        self.conn = conn
+        self.org_id = org_id
+
+    def put(self, data: bytes, sha: str, ext: str) -> None:
+        from lm_store.pg import register_artifact
+
+        register_artifact(
+            self.conn,
+            org_id=self.org_id,
+            kind=self.KIND,
+            filename=f"blob_{sha}{ext}",
+            content=data,
+            mime=_sniff(data)[0],
+        )
+
+    def get(self, sha: str) -> Optional[bytes]:
+        from lm_store.pg import STORAGE_DIR
+
+        with self.conn.cursor() as cur:
+            cur.execute(
+                "SELECT storage_path FROM artifact WHERE org_id=%s AND kind=%s AND sha256=%s "
+                "ORDER BY created_at DESC LIMIT 1",
+                (self.org_id, self.KIND, sha),
+            )
+            row = cur.fetchone()
+        if not row:
+            return None
+        sp = row["storage_path"] if isinstance(row, dict) else row[0]
+        try:
+            return (STORAGE_DIR / sp).read_bytes() if sp else None
+        except OSError:
+            return None
+
+
+def default_store():
+    """PARSE_OFFLOAD_BASE64 설정에 따른 기본 저장소 (off면 None)."""
+    return LocalBlobStore() if OFFLOAD_BASE64 else None
+
+
+# ----- 분리 / 복원 -----
+def offload_base64(resp: Any, store: Any = "default", *, inplace: bool = False) -> Tuple[Any, int]:
+    """
+    응답의 element별 base64 페이로드를 store에 저장하고 참조로 치환. 반환: (응답, 분리한 개수)
+    - inplace=False: 바뀌는 element만 얕은 복사 (원본 dict는 그대로)
+    - 디코딩이 안 되는 값은 건드리지 않음
+    """
+    if store == "default":
+        store = default_store()
+    if store is None or not isinstance(resp, dict) or not isinstance(resp.get("elements"), list):
+        return resp, 0
+
+    n = 0
+    elements = resp["elements"] if inplace else list(resp["elements"])
+    for i, el in enumerate(elements):
+        if not isinstance(el, dict):
+            continue
+        b64 = el.get(B64_KEY)
+        if not isinstance(b64, str) or not b64:
+            continue
+        try:
+            data = base64.b64decode(b64, validate=True)
+        except (binascii.Error, ValueError):
+            continue
+        sha = hashlib.sha256(data).hexdigest()
+        mime, ext = _sniff(data)
+        store.put(data, sha, ext)
+        new_el = el if inplace else dict(el)
+        del new_el[B64_KEY]
+        new_el[REF_KEY] = {"sha256": sha, "mime": mime, "bytes": len(data)}
+        elements[i] = new_el
+        n += 1
+
+    if inplace:
+        return resp, n
+    return ({**resp, "elements": elements} if n else resp), n
+
+
+def load_blob(el: Dict[str, Any], store: Any = None) -> Optional[bytes]:
+    """element의 이미지 바이트. 인라인 base64/참조 모두 지원 (store 기본: LocalBlobStore)."""
+    b64 = el.get(B64_KEY)
+    if isinstance(b64, str) and b64:
+        return base64.b64decode(b64)
+    ref = el.get(REF_KEY)
+    if not isinstance(ref, dict) or not ref.get("sha256"):
+        return None
+    return (store or LocalBlobStore()).get(ref["sha256"])
+
+
+def load_base64(el: Dict[str, Any], store: Any = None) -> Optional[str]:
+    """원 응답과 같은 base64 문자열로 복원 (없으면 None)."""
+    b64 = el.get(B64_KEY)
+    if isinstance(b64, str) and b64:
+        return b64
+    data = load_blob(el, store)
+    return base64.b64encode(data).decode("ascii") if data is not None else None
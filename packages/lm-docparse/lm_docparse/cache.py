@@ -0,0 +1,170 @@
+# packages/lm-docparse/lm_docparse/cache.py
+from __future__ import annotations
+
+import hashlib
+import os
+import shutil
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from lm_core_schema import serde
+
+from . import artifact
+
+# ===== 파싱 결과 캐시 =====
+# 키 = sha256(PDF 바이트) + 결과에 영향을 주는 파싱 옵션
+#  → 같은 파일/옵션이면 document-digitization 재호출 없이 저장된 JSON 반환
+# 백엔드
+#  - LocalParseCache   : 로컬 디렉터리 (기본, PARSE_CACHE_DIR)
+#  - ArtifactParseCache: lm_store artifact 테이블 (kind='parse_json')
+# PARSE_CACHE=off 면 비활성
+PARSE_CACHE_DIR = Path(
+    os.getenv("PARSE_CACHE_DIR") or Path.home() / ".cache" / "ledgermate" / "parse"
+).expanduser()
+PARSE_CACHE = os.getenv("PARSE_CACHE", "dir").strip().lower()   # dir | off
+
+
+def file_sha256(path: str | Path, bufsize: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(bufsize), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def cache_key(
+    doc_sha256: str,
+    *,
+    model: str,
+    ocr: str,
+    output_formats: list[str],
+    coordinates: bool,
+    base64_encoding: list[str],
+    chart_recognition: bool = True,
+    variant: str | None = None,
+) -> str:
+    """옵션 순서/중복에 무관하도록 정렬해 직렬화한 뒤 해시. variant: 결과 형태가 다른 처리 경로(예: text_layer)."""
+    opts = {
+        "doc": doc_sha256,
+        "model": model,
+        "ocr": ocr,
+        "output_formats": sorted(set(output_formats or [])),
+        "coordinates": bool(coordinates),
+        "base64_encoding": sorted(set(base64_encoding or [])),
+        "chart_recognition": bool(chart_recognition),
+    }
+    if variant:
+        opts["variant"] = variant   # 기존 키(variant 없음)는 그대로 유지
+    b = serde.canonical_bytes(opts)   # 예전 키와 같은 바이트 → 기존 캐시 그대로 히트
+    return hashlib.sha256(b).hexdigest()
+
+
+class LocalParseCache:
+    """<dir>/<key[:2]>/<key>.json — 출력 파일과 같은 포맷으로 저장해 히트 시 그대로 복사."""
+
+    def __init__(self, root: str | Path | None = None):
+        self.root = Path(root or PARSE_CACHE_DIR)
+
+    def path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.json"
+
+    def get_path(self, key: str) -> Optional[Path]:
+        p = self.path(key)
+        return p if p.exists() else None
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        p = self.get_path(key)
+        if p is None:
+            return None
+        try:
+            return artifact.load(p)
+        except (OSError, ValueError):
+            return None
+
+    def put_file(self, key: str, src: str | Path) -> None:
+        """이미 저장된 결과 JSON 파일을 캐시에 복사 (직렬화 재수행 X)."""
+        dst = self.path(key)
+        try:
+            dst.parent.mkdir(parents=True, exist_ok=True)
+            tmp = dst.with_name(f"{dst.name}.{os.getpid()}.tmp")
+            shutil.copyfile(src, tmp)
+            os.replace(tmp, dst)
+        except OSError:
+            pass  # 캐시 실패는 파싱 결과에 영향 없음
+
+    def put(self, key: str, result: Dict[str, Any]) -> None:
+        dst = self.path(key)
+        try:
+            artifact.save(dst, result)
+        except OSError:
+            pass
+
+
+class ArtifactParseCache:
+    """
+    lm_store artifact 테이블 백엔드 (kind='parse_json', filename='parse_<key>.json').
+    - 조직별로 분리 (org_id)
+    - 실제 JSON은 lm_store.STORAGE_DIR 아래 파일
+    """
+
+    KIND = "parse_json"
+
+    def __init__(self, conn, org_id: str):
+        self.conn = conn
+        self.org_id = org_id
+
+    def _fname(self, key: str) -> str:
+        return f"parse_{key}.json"
+
+    def get_path(self, key: str) -> Optional[Path]:
+        from lm_store.pg import STORAGE_DIR
+
+        with self.conn.cursor() as cur:
+            cur.execute(
+                "SELECT storage_path FROM artifact WHERE org_id=%s AND kind=%s AND filename=%s "
+                "ORDER BY created_at DESC LIMIT 1",
+                (self.org_id, self.KIND, self._fname(key)),
+            )
+            row = cur.fetchone()
+        if not row:
+            return None
+        sp = row["storage_path"] if isinstance(row, dict) else row[0]
+        p = STORAGE_DIR / sp
+        return p if sp and p.exists() else None
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        p = self.get_path(key)
+        return artifact.load(p) if p else None
+
+    def put_file(self, key: str, src: str | Path) -> None:
+        from lm_store.pg import register_artifact
+
+        content = Path(src).read_bytes()
+        register_artifact(
+            self.conn,
+            org_id=self.org_id,
+            kind=self.KIND,
+            filename=self._fname(key),
+            content=content,
+            mime=artifact.mime_of(content),
+        )
+
+    def put(self, key: str, result: Dict[str, Any]) -> None:
+        from lm_store.pg import register_artifact
+
+        content = artifact.dumps(result)
+        register_artifact(
+            self.conn,
+            org_id=self.org_id,
+            kind=self.KIND,
+            filename=self._fname(key),
+            content=content,
+            mime=artifact.mime_of(content),
+        )
+
+
+def default_cache():
+    """PARSE_CACHE 설정에 따른 기본 캐시 (off면 None)."""
+    if PARSE_CACHE in ("off", "0", "false", "no", "none"):
+        return None
+    return LocalParseCache()
@@ -1,8 +1,10 @@
 # packages/lm-docparse/lm_docparse/chunker.py
 from __future__ import annotations
-from typing import Any, Dict, List
-import re, json, html, string
-from typing import Any
+from collections.abc import Mapping
+from typing import Any, Dict, Iterable, Iterator, List, Set
+import os, re, json, html, string
+
+from lm_core_schema.models import Chunk, to_plain
 
 MULTIPLY_SIGNS = r"[xX×＊*]"
 # ── helpers ─────────────────────────────────────────────────────────────
@@ -54,43 +56,69 @@ def coerce_text(value: Any) -> str:
     return str(value)
 
 
+# normalize_text 전용 사전 컴파일 패턴 (단계별 의미는 아래 함수 주석 참고)
+_NBSP_CR = str.maketrans({"\u00A0": " ", "\r": "\n"})   # \r\n 은 먼저 \n 으로 합친 뒤 적용
+_HYPHEN_NL_RE = re.compile(r"-\s*\n\s*")
+_HSPACE_RE = re.compile(r"[ \t]{2,}|\t")                 # 단일 공백은 건드리지 않음
+_MULTI_NL_RE = re.compile(r"\n{3,}")
+_OPEN_PAREN_NL_RE = re.compile(r"\(\s*\n\s*")
+_CLOSE_PAREN_NL_RE = re.compile(r"\s*\n\s*\)")
+_NUM_UNIT_NL_RE = re.compile(r"([0-9][0-9,]*)\s*\n\s*(원|엔|円|개|회|건|명|일|%)")
+_MULTIPLY_RE = re.compile(rf"\s*{MULTIPLY_SIGNS}\s*")
+_MULTIPLY_CHARS = "xX×＊*"
+_SOFT_NL_RE = re.compile(r"(?<![\.!\?:;\]\)\}…])\n(?!\n)")
+_SPACES_RE = re.compile(r" {2,}")
+
+
 def normalize_text(text_like: Any) -> str:
     s = coerce_text(text_like)
     if ("<" in s and ">" in s):            # HTML 추정
-        s = strip_html(s)
-    s = html.unescape(s)
+        s = s.replace("<br>", "\n").replace("<br/>", "\n").replace("<br />", "\n")
+        s = _TAG_RE.sub(" ", s)
+    if "&" in s:
+        s = html.unescape(s)
 
     # 1) 공백/개행 기초 정리
-    s = s.replace("\u00A0", " ")           # NBSP → space
-    s = s.replace("\r\n", "\n").replace("\r", "\n")
-    s = hyphen_fix(s)                      # 단어 하이픈 줄바꿈 복원 (이미 있던 함수)
-    s = re.sub(r"[ \t]+", " ", s)
-    s = re.sub(r"[ \t]+\n", "\n", s)
-    s = re.sub(r"\n{3,}", "\n\n", s)       # 3줄 이상 → 2줄
-
-    # 2) 괄호/단위가 개행으로 깨진 케이스 복원
-    #   예: "예산액(\n원)" → "예산액(원)"
-    s = re.sub(r"\(\s*\n\s*", "(", s)
-    s = re.sub(r"\s*\n\s*\)", ")", s)
-
-    #   예: "1,200,000\n원" / "70\n개" / "2\n회" / "10\n%" → 한 줄로
-    s = re.sub(r"([0-9][0-9,]*)\s*\n\s*(원|엔|円)", r"\1\2", s)
-    s = re.sub(r"([0-9][0-9,]*)\s*\n\s*(개|회|건|명|일|%)", r"\1\2", s)
-
-    #   곱하기 표현이 줄바꿈으로 끊긴 경우: "5,000원 X \n 70개 X \n 2회"
-    s = re.sub(rf"\s*\n\s*({MULTIPLY_SIGNS})\s*\n\s*", r" \1 ", s)  # 사이에 낀 개행 제거
-    s = re.sub(rf"\s*\n\s*({MULTIPLY_SIGNS})\s*", r" \1 ", s)       # 앞뒤 공백 정리
-
-    # 3) 곱하기 기호 통일(검색/파싱 안정화)
-    s = re.sub(rf"\s*{MULTIPLY_SIGNS}\s*", " x ", s)
+    #    NBSP → space, \r\n / \r → \n (문자 단위는 번역표 한 번; 비ASCII 문자열의 translate는
+    #    느리므로 대상 문자가 있을 때만)
+    if "\r" in s:
+        s = s.replace("\r\n", "\n").translate(_NBSP_CR)
+    elif "\u00A0" in s:
+        s = s.translate(_NBSP_CR)
+    has_nl = "\n" in s                    # 이후 단계는 개행을 새로 만들지 않음 → 없으면 개행 관련 패스 생략
+    if has_nl:
+        s = _HYPHEN_NL_RE.sub("", s)       # 단어 하이픈 줄바꿈 복원 (hyphen_fix)
+    if "\t" in s or "  " in s:
+        s = _HSPACE_RE.sub(" ", s)         # [ \t]+ → " "
+    if has_nl:
+        s = s.replace(" \n", "\n")         # [ \t]+\n → \n (위 단계 후 공백 run은 1칸)
+        if "\n\n\n" in s:
+            s = _MULTI_NL_RE.sub("\n\n", s) # 3줄 이상 → 2줄
+
+        # 2) 괄호/단위가 개행으로 깨진 케이스 복원
+        #   예: "예산액(\n원)" → "예산액(원)"
+        if "(" in s:
+            s = _OPEN_PAREN_NL_RE.sub("(", s)
+        if ")" in s:
+            s = _CLOSE_PAREN_NL_RE.sub(")", s)
+        #   예: "1,200,000\n원" / "70\n개" / "2\n회" / "10\n%" → 한 줄로
+        s = _NUM_UNIT_NL_RE.sub(r"\1\2", s)
+
+    # 3) 곱하기 기호 통일(검색/파싱 안정화) — 앞뒤 공백·개행 run까지 흡수하므로
+    #    "5,000원 X \n 70개 X \n 2회"처럼 개행으로 끊긴 곱셈식도 이 한 번으로 정리됨
+    if any(c in s for c in _MULTIPLY_CHARS):
+        s = _MULTIPLY_RE.sub(" x ", s)
 
     # 4) 문장 중간의 애매한 1줄 개행 → 공백으로 합치기
     #   - 끝 문자가 문장부호가 아니고(.,!?…): 다음 줄이 이어지는 텍스트로 보아 붙임
     #   - 단, 빈 줄(단락 구분)은 유지
-    s = re.sub(r"(?<![\.!\?:;\]\)\}…])\n(?!\n)", " ", s)
+    if has_nl:
+        s = _SOFT_NL_RE.sub(" ", s)
 
-    # 5) 다시 여분 공백 최소화
-    s = re.sub(r"[ \t]+", " ", s).strip()
+    # 5) 다시 여분 공백 최소화 (탭은 1)에서 이미 공백으로 바뀜)
+    if "  " in s:
+        s = _SPACES_RE.sub(" ", s)
+    s = s.strip()
     return s
 
 
@@ -107,12 +135,166 @@ def is_noise_chunk(title, text) -> bool:
 
 # ── main ────────────────────────────────────────────────────────────────
 
-def to_chunks(resp_json: Any, include_tables: bool = True) -> List[Dict]:
+def _table_text(raw_html: str, text: str, ts: Any = None):
+    """element html의 표 → (평탄화 텍스트가 덧붙은 text, tables | None). ts: 미리 추출한 표 목록"""
+    tables = None
+    try:
+        from .tables import extract_tables_from_html, table_to_text
+        if ts is None:
+            ts = extract_tables_from_html(raw_html)
+        if ts:
+            tables = ts
+            flat = "\n\n".join(table_to_text(t["rows"]) for t in ts if t.get("rows")).strip()
+            if flat:
+                text = (text + ("\n\n" if text else "") + flat).strip()
+    except Exception:
+        # 표 추출 실패 시 조용히 건너뛴다(호환성)
+        pass
+    return text, tables
+
+
+def _tables_by_element(elements: List[Any]) -> List[Any] | None:
+    """문서의 표 html을 한 번에 파싱(tables.extract_tables_by_element). 실패 시 None → element별 추출."""
+    htmls = []
+    for el in elements:
+        h = _get_raw_html_from_content(el.get("content", {})) if isinstance(el, dict) else ""
+        htmls.append(h if h and "<table" in h.lower() else "")
+    if not any(htmls):
+        return None
+    try:
+        from .tables import extract_tables_by_element
+        return extract_tables_by_element(htmls)
+    except Exception:
+        return None
+
+
+def _element_chunks(elements: Iterable[Any], include_tables: bool = True,
+                    tables_by_el: List[Any] | None = None,
+                    skip: Set[int] | None = None) -> Iterator[Chunk]:
+    """elements를 문서 순서대로 한 개씩 청크로 (heading 스택만 유지). skip: 건너뛸 element 위치"""
+    stack_titles: List[str] = []
+    for i, el in enumerate(elements):
+        if skip and i in skip:      # 쪽 머리말/꼬리말 — heading 스택에도 반영하지 않음
+            continue
+        cat  = el.get("category") or ""
+        cont = el.get("content", {})
+        title = None
+        code  = el.get("id")  # 명시적 조항번호가 없으니 id를 보조키로
+        text  = normalize_text(cont)
+
+        raw_html = _get_raw_html_from_content(cont)
+        tables = None
+        if include_tables and raw_html and "<table" in raw_html.lower():
+            text, tables = _table_text(raw_html, text, tables_by_el[i] if tables_by_el is not None else None)
+
+        # heading 레벨 추론 (heading1/2/3…)
+        lvl = None
+        m = re.match(r"heading(\d+)", str(cat))
+        if m:
+            lvl = max(1, min(int(m.group(1)), 6))
+            # 제목은 heading 텍스트 전부
+            title = text.split("\n", 1)[0] if text else None
+
+        # path(부모 타이틀) 구성
+        if lvl:
+            if len(stack_titles) < lvl:
+                stack_titles += [""] * (lvl - len(stack_titles))
+            stack_titles[lvl-1] = (title or "").strip()
+            # 하위 레벨 비우기
+            for j in range(lvl, len(stack_titles)):
+                stack_titles[j] = ""
+        path_titles = [t for t in stack_titles if t]
+
+        if is_noise_chunk(title, text):
+            continue
+
+        context = " > ".join(path_titles) if path_titles else (title or "")
+        context_text = (context + " :: " + text[:400]) if context else text[:400]
+
+        yield Chunk(
+            order=el.get("id", i),
+            code=code,
+            title=title,
+            text=text,
+            path=(" > ".join(path_titles) if path_titles else None),
+            context_text=context_text,
+            tables=tables or None,
+        )
+
+
+def _furniture(elements: Iterable[Any], strip: bool | None) -> Set[int] | None:
+    """쪽 머리말/꼬리말/쪽번호 element 위치 (furniture.find_page_furniture). strip 기본: CHUNK_STRIP_FURNITURE"""
+    from .furniture import STRIP_FURNITURE, find_page_furniture
+
+    if not (STRIP_FURNITURE if strip is None else strip):
+        return None
+    return find_page_furniture(elements) or None
+
+
+def to_chunks_iter(src: Any, include_tables: bool = True,
+                   strip_furniture: bool | None = None) -> Iterator[Chunk]:
+    """
+    to_chunks()의 스트리밍 버전: 청크를 문서(elements) 순서대로 하나씩 yield.
+    - src: 응답 dict / LazyJSONFile / 저장된 응답 JSON 경로
+      경로·미로드 LazyJSONFile이면 elements를 파일에서 하나씩 읽음(stream.iter_json_items)
+      → 문서 전체도, 청크 전체도 메모리에 올리지 않는다
+    - to_chunks()와 달리 order로 재정렬하지 않음 (Upstage elements는 이미 id 순)
+    - elements에서 청크가 하나도 안 나오면 to_chunks()의 폴백 경로를 그대로 따른다
+    - Chunk 레코드를 yield (적재 경로용, 순수 dict가 필요하면 to_chunks())
+    - 머리말/꼬리말 판정은 문서 전체를 봐야 하므로 경로 입력이면 파일을 두 번 훑는다
+      (첫 번째는 위/아래 띠 element의 키만 모음)
     """
-    Upstage 응답 → 균일한 청크 스키마:
-    [{order, code, title, text, path, context_text}]
+    from .stream import LazyJSONFile, iter_json_items
+
+    path = None
+    if isinstance(src, (str, os.PathLike)):
+        path = src
+    elif isinstance(src, LazyJSONFile) and not src.loaded:
+        path = src.path
+
+    if path is not None:
+        elements: Iterable[Any] = iter_json_items(path, "elements")
+        skip = _furniture(iter_json_items(path, "elements"), strip_furniture)
+    elif isinstance(src, Mapping) and isinstance(src.get("elements"), list):
+        elements = src["elements"]
+        skip = _furniture(elements, strip_furniture)
+    else:
+        elements = ()
+        skip = None
+
+    produced = False
+    for chunk in _element_chunks(elements, include_tables, skip=skip):
+        produced = True
+        yield chunk
+    if produced:
+        return
+
+    if path is not None:
+        from .artifact import load
+
+        src = load(path)
+    yield from chunk_records(src, include_tables=include_tables, strip_furniture=strip_furniture)
+
+
+def to_chunks(resp_json: Any, include_tables: bool = True,
+              strip_furniture: bool | None = None) -> List[Dict[str, Any]]:
     """
-    out: List[Dict] = []
+    Upstage 응답 → 균일한 청크 스키마 (순수 dict, 표도 dict):
+    [{order, code, title, text, path, context_text[, tables]}]
+    strip_furniture: 쪽마다 반복되는 머리말/꼬리말/쪽번호 element 제외 (기본: CHUNK_STRIP_FURNITURE=on)
+    적재/직렬화 경로는 레코드를 그대로 쓰는 chunk_records()가 빠름.
+    """
+    return to_plain(chunk_records(resp_json, include_tables=include_tables, strip_furniture=strip_furniture))
+
+
+def chunk_records(resp_json: Any, include_tables: bool = True,
+                  strip_furniture: bool | None = None) -> List[Chunk]:
+    """to_chunks()와 같은 청크를 lm_core_schema.models.Chunk 레코드로 (dict처럼 읽힘, 표는 Table)."""
+    out: List[Chunk] = []
+
+    # 스트리밍 파싱 결과(LazyJSONFile 등 Mapping)도 그대로 받음
+    if isinstance(resp_json, Mapping) and not isinstance(resp_json, dict):
+        resp_json = dict(resp_json)
 
     # 0) elements가 있으면 그걸 우선 사용 (heading 레벨로 path 구성)
     elements = None
@@ -120,71 +302,12 @@ def to_chunks(resp_json: Any, include_tables: bool = True) -> List[Dict]:
         elements = resp_json["elements"]
 
     if elements:
-        stack_titles: List[str] = []
-        for i, el in enumerate(elements):
-            cat  = el.get("category") or ""
-            cont = el.get("content", {})
-            title = None
-            code  = el.get("id")  # 명시적 조항번호가 없으니 id를 보조키로
-            text  = normalize_text(cont)
-
-            raw_html = _get_raw_html_from_content(cont)
-            tables = None
-            if include_tables and raw_html and "<table" in raw_html.lower():
-                try:
-                    from .tables import extract_tables_from_html, table_to_text
-                    ts = extract_tables_from_html(raw_html)
-                    if ts:
-                        tables = ts
-                        flat = "\n\n".join(table_to_text(t["rows"]) for t in ts if t.get("rows")).strip()
-                        if flat:
-                            text = (text + ("\n\n" if text else "") + flat).strip()
-                except Exception:
-                    # 표 추출 실패 시 조용히 건너뛴다(호환성)
-                    pass
-
-            # heading 레벨 추론 (heading1/2/3…)
-            lvl = None
-            m = re.match(r"heading(\d+)", str(cat))
-            if m:
-                lvl = max(1, min(int(m.group(1)), 6))
-                # 제목은 heading 텍스트 전부
-                title = text.split("\n", 1)[0] if text else None
-
-            # path(부모 타이틀) 구성
-            if lvl:
-                if len(stack_titles) < lvl:
-                    stack_titles += [""] * (lvl - len(stack_titles))
-                stack_titles[lvl-1] = (title or "").strip()
-                # 하위 레벨 비우기
-                for j in range(lvl, len(stack_titles)):
-                    stack_titles[j] = ""
-            path_titles = [t for t in stack_titles if t]
-
-            if is_noise_chunk(title, text):
-                continue
-
-            context = " > ".join(path_titles) if path_titles else (title or "")
-            context_text = (context + " :: " + text[:400]) if context else text[:400]
-
-
-            chunk = dict(
-                order=el.get("id", i),
-                code=code,
-                title=title,
-                text=text,
-                path=(" > ".join(path_titles) if path_titles else None),
-                context_text=context_text
-            )
-            if tables:
-                chunk["tables"] = tables
-                
-            out.append(chunk)
-
-
+        tables_by_el = _tables_by_element(elements) if include_tables else None
+        skip = _furniture(elements, strip_furniture)
+        out = list(_element_chunks(elements, include_tables, tables_by_el, skip))
         # 내용이 하나도 안 남았으면 폴백으로 내려감
         if out:
-            out.sort(key=lambda x: x["order"])
+            out.sort(key=lambda x: x.order)
             return out
 
     # 1) 폴백: content.html 전체를 통짜로
@@ -193,20 +316,8 @@ def to_chunks(resp_json: Any, include_tables: bool = True) -> List[Dict]:
         raw_html = _get_raw_html_from_content(resp_json["content"])
         tables = None
         if include_tables and raw_html and "<table" in raw_html.lower():
-            try:
-                from .tables import extract_tables_from_html, table_to_text
-                ts = extract_tables_from_html(raw_html)
-                if ts:
-                    tables = ts
-                    flat = "\n\n".join(table_to_text(t["rows"]) for t in ts if t.get("rows")).strip()
-                    if flat:
-                        whole = (whole + ("\n\n" if whole else "") + flat).strip()
-            except Exception:
-                pass
-        chunk = dict(order=0, code=None, title=None, text=whole, path=None, context_text=whole[:400])
-        if tables:
-            chunk["tables"] = tables
-        return [chunk]
+            whole, tables = _table_text(raw_html, whole)
+        return [Chunk(order=0, text=whole, context_text=whole[:400], tables=tables or None)]
 
     # 2) 또 다른 폴백: 기존 탐색(keys)
     items = None
@@ -218,8 +329,7 @@ def to_chunks(resp_json: Any, include_tables: bool = True) -> List[Dict]:
                 items = resp_json[k]; break
     if items is None:
         whole = normalize_text(resp_json)
-        return [dict(order=0, code=None, title=None, text=whole,
-                    path=None, context_text=whole[:400])]
+        return [Chunk(order=0, text=whole, context_text=whole[:400])]
 
     # (거의 오지 않지만) items 기반 생성
     stack_titles: List[str] = []
@@ -244,12 +354,12 @@ def to_chunks(resp_json: Any, include_tables: bool = True) -> List[Dict]:
         context = " > ".join(path_titles) if path_titles else (title or "")
         context_text = (context + " :: " + text[:400]) if context else text[:400]
 
-        out.append(dict(
+        out.append(Chunk(
             order=it.get("order") or it.get("index") or i,
             code=code, title=title, text=text,
             path=(" > ".join(path_titles) if path_titles else None),
             context_text=context_text
         ))
 
-    out.sort(key=lambda x: x["order"])
+    out.sort(key=lambda x: x.order)
     return out
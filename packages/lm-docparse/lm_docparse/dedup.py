@@ -0,0 +1,196 @@
+# packages/lm-docparse/lm_docparse/dedup.py
+from __future__ import annotations
+
+import math
+import os
+import random
+import re
+import sys
+import zlib
+from array import array
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
+
+# ===== MinHash LSH 근사 중복 탐지 =====
+# 규정/예산서에는 서명란, 표준 조항, 표 꼬리말 같은 상용구가 조직·버전마다 반복되고
+# 복사본마다 다시 임베딩/인덱싱된다. 여기서는
+#  - 청크 텍스트(공백 정규화) → 문자 k-gram 집합 → MinHash 서명(num_perm개 uint32)
+#  - 서명을 b개 밴드 × r행으로 나눈 LSH 버킷으로 후보를 찾고, 서명 일치율(≈ Jaccard)로 확정
+# 을 해서 "이미 저장된 청크와 Jaccard ≥ threshold" 인 청크를 표시한다.
+# 서명은 512바이트(bytes) — rule_chunk.minhash 에 저장해 두면 다음 적재 때 인덱스를 다시 계산하지 않는다.
+# numpy가 있으면 순열 계산을 벡터화(없으면 순수 파이썬, 같은 값).
+try:
+    import numpy as _np
+except ImportError:  # pragma: no cover
+    _np = None
+
+DEDUP_THRESHOLD = float(os.getenv("DEDUP_THRESHOLD", "0.9"))
+DEDUP_NUM_PERM = int(os.getenv("DEDUP_NUM_PERM", "128"))
+DEDUP_SHINGLE = int(os.getenv("DEDUP_SHINGLE", "5"))
+DEDUP_MIN_CHARS = int(os.getenv("DEDUP_MIN_CHARS", "40"))   # 이보다 짧은 텍스트는 대상 아님(오탐 방지)
+
+_PRIME = (1 << 31) - 1
+_SEED = 1          # 순열 계수 고정 — 바꾸면 저장된 서명과 비교 불가
+_WS_RE = re.compile(r"\s+")
+
+_perm_cache: Dict[int, Tuple[List[int], List[int]]] = {}
+
+
+def _perms(num_perm: int) -> Tuple[List[int], List[int]]:
+    p = _perm_cache.get(num_perm)
+    if p is None:
+        rng = random.Random(_SEED)
+        a = [rng.randrange(1, _PRIME) for _ in range(num_perm)]
+        b = [rng.randrange(0, _PRIME) for _ in range(num_perm)]
+        p = _perm_cache[num_perm] = (a, b)
+    return p
+
+
+def shingles(text: str, k: int = DEDUP_SHINGLE) -> set[int]:
+    """공백 정규화(소문자) 텍스트의 문자 k-gram → crc32 집합."""
+    s = _WS_RE.sub(" ", text or "").strip().lower()
+    if len(s) <= k:
+        return {zlib.crc32(s.encode("utf-8"))} if s else set()
+    return {zlib.crc32(s[i:i + k].encode("utf-8")) for i in range(len(s) - k + 1)}
+
+
+def minhash(text: str, num_perm: int = DEDUP_NUM_PERM, k: int = DEDUP_SHINGLE) -> Optional[bytes]:
+    """MinHash 서명 (num_perm × uint32 little-endian bytes). 빈 텍스트면 None."""
+    sh = shingles(text, k)
+    if not sh:
+        return None
+    a, b = _perms(num_perm)
+    if _np is not None:
+        x = _np.fromiter(sh, dtype=_np.uint64, count=len(sh)) % _PRIME
+        av = _np.asarray(a, dtype=_np.uint64)[:, None]
+        bv = _np.asarray(b, dtype=_np.uint64)[:, None]
+        sig = ((av * x[None, :] + bv) % _PRIME).min(axis=1)     # a,x < 2^31 → 곱이 uint64 안
+        return sig.astype("<u4").tobytes()
+    xs = [v % _PRIME for v in sh]
+    sig = array("I", (min((ai * v + bi) % _PRIME for v in xs) for ai, bi in zip(a, b)))
+    if sys.byteorder != "little":  # pragma: no cover
+        sig.byteswap()
+    return sig.tobytes()
+
+
+def _unpack(sig: bytes) -> array:
+    out = array("I")
+    out.frombytes(sig)
+    if sys.byteorder != "little":  # pragma: no cover
+        out.byteswap()
+    return out
+
+
+def similarity(s1: bytes, s2: bytes) -> float:
+    """두 서명의 일치 비율 = Jaccard 추정치."""
+    if not s1 or not s2 or len(s1) != len(s2):
+        return 0.0
+    if _np is not None:
+        return float((_np.frombuffer(s1, dtype="<u4") == _np.frombuffer(s2, dtype="<u4")).mean())
+    a, b = _unpack(s1), _unpack(s2)
+    return sum(1 for x, y in zip(a, b) if x == y) / len(a)
+
+
+def optimal_bands(threshold: float, num_perm: int) -> Tuple[int, int]:
+    """
+    b*r ≤ num_perm 중 오탐(threshold 아래가 후보로) + 미탐(위가 누락) 면적이 최소인 (b, r).
+    후보 확률 P(s) = 1 - (1 - s^r)^b
+    """
+    def area(f, lo, hi, n=50):
+        step = (hi - lo) / n
+        return sum(f(lo + (i + 0.5) * step) for i in range(n)) * step
+
+    best, best_err = (1, num_perm), math.inf
+    for b in range(1, num_perm + 1):
+        r = num_perm // b
+        if r < 1:
+            break
+        fp = area(lambda s: 1 - (1 - s ** r) ** b, 0.0, threshold)
+        fn = area(lambda s: (1 - s ** r) ** b, threshold, 1.0)
+        err = fp + fn
+        if err < best_err:
+            best, best_err = (b, r), err
+    return best
+
+
+class MinHashLSH:
+    """
+    서명 → 밴드 버킷 인덱스. insert()로 기존 청크 서명을 넣고 match()로 근사 중복을 찾는다.
+    key는 무엇이든(해시 가능) — 보통 rule_chunk.id.
+    """
+
+    __slots__ = ("threshold", "num_perm", "bands", "rows", "_buckets", "_sigs")
+
+    def __init__(self, threshold: float = DEDUP_THRESHOLD, num_perm: int = DEDUP_NUM_PERM):
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands, self.rows = optimal_bands(threshold, num_perm)
+        self._buckets: List[Dict[bytes, List[Hashable]]] = [{} for _ in range(self.bands)]
+        self._sigs: Dict[Hashable, bytes] = {}
+
+    def __len__(self) -> int:
+        return len(self._sigs)
+
+    def _band_keys(self, sig: bytes) -> Iterable[Tuple[int, bytes]]:
+        w = self.rows * 4
+        for i in range(self.bands):
+            yield i, sig[i * w:(i + 1) * w]
+
+    def insert(self, key: Hashable, sig: Optional[bytes]) -> None:
+        if not sig or len(sig) != self.num_perm * 4 or key in self._sigs:
+            return
+        self._sigs[key] = sig
+        for i, bk in self._band_keys(sig):
+            self._buckets[i].setdefault(bk, []).append(key)
+
+    def candidates(self, sig: bytes) -> set:
+        out: set = set()
+        for i, bk in self._band_keys(sig):
+            hit = self._buckets[i].get(bk)
+            if hit:
+                out.update(hit)
+        return out
+
+    def match(self, sig: Optional[bytes]) -> Optional[Tuple[Hashable, float]]:
+        """threshold 이상인 후보 중 가장 비슷한 (key, 추정 Jaccard), 없으면 None."""
+        if not sig or len(sig) != self.num_perm * 4:
+            return None
+        best: Optional[Tuple[Hashable, float]] = None
+        for key in self.candidates(sig):
+            s = similarity(sig, self._sigs[key])
+            if s >= self.threshold and (best is None or s > best[1]):
+                best = (key, s)
+        return best
+
+
+def find_near_duplicates(
+    texts: Sequence[str],
+    index: Optional[MinHashLSH] = None,
+    *,
+    threshold: float = DEDUP_THRESHOLD,
+    num_perm: int = DEDUP_NUM_PERM,
+    min_chars: int = DEDUP_MIN_CHARS,
+    within: bool = True,
+) -> Tuple[List[Optional[Tuple[str, Any, float]]], List[Optional[bytes]]]:
+    """
+    texts 각각의 근사 중복 (출처, key, 유사도) 또는 None, 그리고 계산한 서명 목록을 반환.
+    - 출처 "store": index(이미 저장된 청크들의 MinHashLSH)의 key
+    - 출처 "batch": within=True일 때 같은 texts 안의 앞선 위치 (반복 상용구는 첫 번째만 원본)
+    - min_chars 미만 텍스트는 서명도 만들지 않고 항상 None (짧은 제목끼리 오탐 방지)
+    """
+    index = index if index is not None else MinHashLSH(threshold, num_perm)
+    local = MinHashLSH(index.threshold, index.num_perm) if within else None
+    hits: List[Optional[Tuple[str, Any, float]]] = []
+    sigs: List[Optional[bytes]] = []
+    for i, t in enumerate(texts):
+        sig = minhash(t, index.num_perm) if len((t or "").strip()) >= min_chars else None
+        sigs.append(sig)
+        m = index.match(sig)
+        hit = ("store", m[0], m[1]) if m is not None else None
+        if hit is None and local is not None:
+            m = local.match(sig)
+            if m is not None:
+                hit = ("batch", m[0], m[1])
+        hits.append(hit)
+        if hit is None and local is not None:
+            local.insert(i, sig)
+    return hits, sigs
@@ -0,0 +1,114 @@
+# packages/lm-docparse/lm_docparse/furniture.py
+from __future__ import annotations
+
+import math
+import os
+import re
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+# ===== 쪽 머리말/꼬리말/쪽번호 제거 =====
+# 200쪽 매뉴얼의 "○○대학교 총학생회 재정운용세칙 | 12" 같은 반복 머리말·꼬리말·쪽번호가
+# 쪽마다 청크가 되어 청크 수/임베딩량/검색 잡음을 늘린다(is_noise_chunk는 짧은 것만 거름).
+# 문서 단위로 한 번 훑어
+#  - Upstage가 header/footer/page_number로 분류한 element는 그대로 제외
+#  - 쪽 위/아래 띠(top/bottom 비율) 안에 완전히 들어가는 element 중
+#    숫자를 가린 텍스트가 같고 세로 위치가 비슷한 것이 충분히 많은 쪽(min_pages, min_ratio)에 반복되면 제외
+# 좌표는 Upstage coordinates(쪽 기준 0~1 상대 좌표 4점, 좌상단 원점) — coordinates=True 로 파싱한 응답 필요.
+STRIP_FURNITURE = os.getenv("CHUNK_STRIP_FURNITURE", "on").strip().lower() not in ("off", "0", "false", "no", "none")
+BAND_TOP = float(os.getenv("FURNITURE_TOP", "0.1"))
+BAND_BOTTOM = float(os.getenv("FURNITURE_BOTTOM", "0.1"))
+MIN_PAGES = 3
+MIN_RATIO = 0.3          # 전체 쪽 수 대비 (홀·짝수 쪽이 다른 머리말도 잡히도록 절반 미만)
+Y_TOLERANCE = 0.03       # 같은 자리로 볼 세로 중심 차이
+
+FURNITURE_CATEGORIES = frozenset({"header", "footer", "page_number"})
+
+_DIGITS_RE = re.compile(r"\d+")
+_WS_RE = re.compile(r"\s+")
+_ROMAN_PAGE_RE = re.compile(r"^[\-–—(\[]?\s*[ivxlc]+\s*[\-–—)\]]?$", re.I)
+
+
+def bbox(el: Dict[str, Any]) -> Optional[Tuple[float, float, float, float]]:
+    """element coordinates → (x0, y0, x1, y1). 좌표가 없거나 형식이 다르면 None."""
+    pts = el.get("coordinates") if isinstance(el, dict) else None
+    if not isinstance(pts, list) or not pts:
+        return None
+    try:
+        xs = [float(p["x"]) for p in pts]
+        ys = [float(p["y"]) for p in pts]
+    except (TypeError, KeyError, ValueError):
+        return None
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+def furniture_key(text: str) -> str:
+    """숫자를 #로 가리고 공백 정리 — '- 12 -' / '- 13 -' 를 같은 키로."""
+    s = _WS_RE.sub(" ", text or "").strip().lower()
+    if _ROMAN_PAGE_RE.match(s):
+        return "#"
+    return _DIGITS_RE.sub("#", s)
+
+
+def _zone(bb: Tuple[float, float, float, float], top: float, bottom: float) -> Optional[str]:
+    if bb[3] <= top:
+        return "top"
+    if bb[1] >= 1.0 - bottom:
+        return "bottom"
+    return None
+
+
+def find_page_furniture(
+    elements: Iterable[Any],
+    *,
+    top: float = BAND_TOP,
+    bottom: float = BAND_BOTTOM,
+    min_pages: int = MIN_PAGES,
+    min_ratio: float = MIN_RATIO,
+) -> Set[int]:
+    """
+    제외할 element 위치(elements 안의 인덱스) 집합.
+    elements는 한 번만 순회 — 띠 안 element의 (위치, 쪽, 키, 세로 중심)만 모아 두므로 제너레이터도 된다.
+    """
+    from .chunker import normalize_text
+
+    out: Set[int] = set()
+    pages: Set[Any] = set()
+    groups: Dict[Tuple[str, str], List[Tuple[int, Any, float]]] = defaultdict(list)
+    for i, el in enumerate(elements):
+        if not isinstance(el, dict):
+            continue
+        page = el.get("page")
+        if page is not None:
+            pages.add(page)
+        if str(el.get("category") or "").lower() in FURNITURE_CATEGORIES:
+            out.add(i)
+            continue
+        bb = bbox(el)
+        if bb is None or page is None:
+            continue
+        zone = _zone(bb, top, bottom)
+        if zone is None:
+            continue
+        key = furniture_key(normalize_text(el.get("content", {})))
+        if key:
+            groups[(zone, key)].append((i, page, (bb[1] + bb[3]) / 2))
+
+    need = max(min_pages, math.ceil(min_ratio * len(pages)))
+    for members in groups.values():
+        if len({p for _, p, _ in members}) < need:
+            continue
+        ys = sorted(y for _, _, y in members)
+        mid = ys[len(ys) // 2]
+        near = [(i, p) for i, p, y in members if abs(y - mid) <= Y_TOLERANCE]
+        if len({p for _, p in near}) >= need:
+            out.update(i for i, _ in near)
+    return out
+
+
+def strip_page_furniture(elements: List[Any], **kw: Any) -> Tuple[List[Any], int]:
+    """elements에서 머리말/꼬리말/쪽번호를 뺀 새 리스트와 제거 개수."""
+    drop = find_page_furniture(elements, **kw)
+    if not drop:
+        return elements, 0
+    return [el for i, el in enumerate(elements) if i not in drop], len(drop)
@@ -0,0 +1,212 @@
+# packages/lm-docparse/lm_docparse/grid.py
+from __future__ import annotations
+
+import math
+import re
+from array import array
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+# ===== 표 → 조밀 격자 =====
+# extract_tables_from_html()의 rows는 rowspan/colspan 때문에 행마다 길이가 다르다
+#   ['400', '기타수익', '410', '기타수익', '411', '예금이자', '0', '']
+#   ['412', '체크할인', '0']                      ← 앞 4칸은 위 행의 rowspan
+# TableGrid는 spans를 펼쳐 n_rows × n_cols 직사각형으로 만들고 열 단위로 보관한다.
+# - 병합 셀은 덮는 모든 칸에 같은 값 (origin=False 로 표시)
+# - 헤더명 → 열 인덱스 dict (공백 제거 키) → 열 조회 O(1)
+# - 금액 열은 array('d')로 변환(숫자가 아니면 NaN), 첫 조회 시 한 번만 계산
+
+_AMOUNT_RE = re.compile(r"^[-+]?(?:\d[\d,]*(?:\.\d+)?|\.\d+)$")
+_LOOSE_RE = re.compile(r"[()\s]")
+
+
+def _hkey(s: str) -> str:
+    return re.sub(r"\s+", "", s or "")
+
+
+def parse_amount(s: Any) -> float:
+    """'1,200,000' / '1,200,000원' / '-300' → float, 숫자가 아니면 NaN."""
+    if s is None:
+        return math.nan
+    if isinstance(s, (int, float)):
+        return float(s)
+    t = str(s).strip().replace(" ", "")
+    if t.endswith("원"):
+        t = t[:-1]
+    if not t or not _AMOUNT_RE.match(t):
+        return math.nan
+    return float(t.replace(",", ""))
+
+
+class TableGrid:
+    """rowspan/colspan을 펼친 열 우선(column-major) 표."""
+
+    __slots__ = ("n_rows", "n_cols", "header_rows", "caption", "_cols", "_origin", "headers", "_hidx", "_loose", "_num")
+
+    def __init__(
+        self,
+        columns: List[List[str]],
+        *,
+        header_rows: int = 1,
+        caption: Optional[str] = None,
+        origin: Optional[List[List[bool]]] = None,
+    ):
+        self._cols = columns
+        self.n_cols = len(columns)
+        self.n_rows = len(columns[0]) if columns else 0
+        self.header_rows = max(0, min(header_rows, self.n_rows))
+        self.caption = caption
+        self._origin = origin or [[True] * self.n_rows for _ in columns]
+        self._num: Dict[int, array] = {}
+
+        # 헤더: 헤더 행들의 값을 위→아래로 ">" 연결 (같은 값 반복은 한 번만)
+        self.headers: List[str] = []
+        for col in columns:
+            parts: List[str] = []
+            for v in col[: self.header_rows]:
+                if v and (not parts or parts[-1] != v):
+                    parts.append(v)
+            self.headers.append(">".join(parts))
+        self._hidx: Dict[str, int] = {}
+        self._loose: Dict[str, int] = {}
+        for j, h in enumerate(self.headers):
+            keys = {h} | set(h.split(">"))
+            for k in keys:
+                k = _hkey(k)
+                if k:
+                    self._hidx.setdefault(k, j)
+                    self._loose.setdefault(_LOOSE_RE.sub("", k), j)
+
+    # ----- 생성 -----
+    @classmethod
+    def from_rows(
+        cls,
+        rows: Sequence[Sequence[Any]],
+        spans: Optional[Sequence[Dict[str, int]]] = None,
+        *,
+        header_rows: int = 1,
+        caption: Optional[str] = None,
+    ) -> "TableGrid":
+        """
+        rows: 셀 텍스트(행마다 길이 다를 수 있음), spans: [{"r","c","rowspan","colspan"}]
+        (r = rows 인덱스, c = 그 행에서 몇 번째 셀). HTML 표 배치 규칙대로 빈 칸을 찾아 채운다.
+        """
+        span_at: Dict[Tuple[int, int], Tuple[int, int]] = {}
+        for s in spans or []:
+            span_at[(int(s["r"]), int(s["c"]))] = (max(1, int(s.get("rowspan") or 1)), max(1, int(s.get("colspan") or 1)))
+
+        n = len(rows)
+        grid: List[List[Optional[str]]] = [[] for _ in range(n)]
+        orig: List[List[bool]] = [[] for _ in range(n)]
+
+        def put(r: int, c: int, v: str, o: bool) -> None:
+            g, og = grid[r], orig[r]
+            if len(g) <= c:
+                g.extend([None] * (c + 1 - len(g)))
+                og.extend([False] * (c + 1 - len(og)))
+            g[c] = v
+            og[c] = o
+
+        for r, row in enumerate(rows):
+            col = 0
+            for c, v in enumerate(row):
+                g = grid[r]
+                while col < len(g) and g[col] is not None:
+                    col += 1
+                rs, cs = span_at.get((r, c), (1, 1))
+                v = "" if v is None else str(v)
+                for dr in range(min(rs, n - r)):      # 표 밖으로 나가는 rowspan은 잘라냄
+                    for dc in range(cs):
+                        put(r + dr, col + dc, v, dr == 0 and dc == 0)
+                col += cs
+
+        width = max((len(g) for g in grid), default=0)
+        cols = [[(grid[r][j] if j < len(grid[r]) and grid[r][j] is not None else "") for r in range(n)] for j in range(width)]
+        origin = [[(orig[r][j] if j < len(orig[r]) else False) for r in range(n)] for j in range(width)]
+        return cls(cols, header_rows=header_rows, caption=caption, origin=origin)
+
+    @classmethod
+    def from_table(cls, t: Dict[str, Any], *, header_rows: Optional[int] = None) -> "TableGrid":
+        """extract_tables_from_html()의 표 dict → 격자. header_rows 기본: 표의 thead 행 수(없으면 1)."""
+        hr = header_rows if header_rows is not None else (t.get("header_rows") or 1)
+        return cls.from_rows(t.get("rows") or [], t.get("spans"), header_rows=hr, caption=t.get("caption"))
+
+    # ----- 조회 -----
+    def index(self, key: Any) -> Optional[int]:
+        """열 인덱스(int 그대로) 또는 헤더명 → 인덱스. 공백 무시, 없으면 괄호까지 무시하고 한 번 더."""
+        if isinstance(key, int):
+            return key if -self.n_cols <= key < self.n_cols else None
+        k = _hkey(str(key))
+        j = self._hidx.get(k)
+        if j is None:
+            j = self._loose.get(_LOOSE_RE.sub("", k))
+        return j
+
+    def column(self, key: Any) -> List[str]:
+        """헤더 포함 열 전체 (내부 리스트 그대로 — 수정 금지). 없는 열이면 []."""
+        j = self.index(key)
+        return self._cols[j] if j is not None else []
+
+    def values(self, key: Any) -> List[str]:
+        """본문(헤더 제외) 값."""
+        return self.column(key)[self.header_rows:]
+
+    def amounts(self, key: Any) -> array:
+        """본문 값을 float 배열로 (숫자가 아니면 NaN). 열마다 한 번만 변환."""
+        j = self.index(key)
+        if j is None:
+            return array("d")
+        j %= self.n_cols
+        a = self._num.get(j)
+        if a is None:
+            a = array("d", (parse_amount(v) for v in self._cols[j][self.header_rows:]))
+            self._num[j] = a
+        return a
+
+    def amount(self, r: int, key: Any, *, dedupe: bool = False) -> Optional[float]:
+        """
+        본문 r행(0-base)의 금액, 숫자가 아니면 None.
+        dedupe=True면 병합 셀의 원래 자리에서만 값을 돌려줌 (rowspan 금액이 덮인 행마다 더해지지 않게).
+        """
+        a = self.amounts(key)
+        if not (0 <= r < len(a)) or math.isnan(a[r]):
+            return None
+        if dedupe:
+            j = self.index(key) % self.n_cols
+            if not self._origin[j][self.header_rows + r]:
+                return None
+        return a[r]
+
+    def is_numeric(self, key: Any, min_ratio: float = 0.6) -> bool:
+        """비어있지 않은 본문 값 중 min_ratio 이상이 금액이면 True."""
+        vals = [v for v in self.values(key) if v]
+        if not vals:
+            return False
+        a = self.amounts(key)
+        ok = sum(1 for v, x in zip(self.values(key), a) if v and not math.isnan(x))
+        return ok / len(vals) >= min_ratio
+
+    def cell(self, r: int, key: Any) -> str:
+        j = self.index(key)
+        return self._cols[j][r] if j is not None and 0 <= r < self.n_rows else ""
+
+    def row(self, r: int) -> List[str]:
+        return [col[r] for col in self._cols]
+
+    def rows(self, *, body: bool = False, dedupe: bool = False) -> Iterator[List[str]]:
+        """행 단위로 순회. dedupe=True면 병합 셀은 원래 자리(좌상단)에만 값을 둔다."""
+        for r in range(self.header_rows if body else 0, self.n_rows):
+            if dedupe:
+                yield [col[r] if og[r] else "" for col, og in zip(self._cols, self._origin)]
+            else:
+                yield [col[r] for col in self._cols]
+
+    def to_text(self, dedupe: bool = True) -> str:
+        """table_to_text()와 같은 탭/개행 형식, 열이 정렬된 상태."""
+        return "\n".join("\t".join(r) for r in self.rows(dedupe=dedupe))
+
+    def __repr__(self) -> str:
+        return f"TableGrid({self.n_rows}x{self.n_cols}, headers={self.headers!r})"
+
+
+def grids_from_tables(tables: Sequence[Dict[str, Any]] | None) -> List[TableGrid]:
+    return [TableGrid.from_table(t) for t in tables or []]
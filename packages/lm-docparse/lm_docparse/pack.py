@@ -0,0 +1,209 @@
+# packages/lm-docparse/lm_docparse/pack.py
+from __future__ import annotations
+
+import os
+import re
+from typing import Any, Callable, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+from lm_core_schema.models import Chunk
+
+# ===== 토큰 예산 청크 패킹 =====
+# to_chunks()는 element 하나당 청크 하나 → 규정 하나가 수천 개의 짧은 문단/제목 청크가 되고
+# 청크마다 임베딩 호출·행·인덱스 항목이 생긴다. pack_chunks()는 그 출력을 받아
+#  - 같은 path(heading 경로) 안의 연속 청크를 max_tokens까지 통째로 이어붙이고
+#    (element 경계 = 조항 경계는 자르지 않음, path가 바뀌면 무조건 새 청크)
+#  - max_tokens를 넘는 단일 청크는 문장/줄 경계로 나눈다 (part=0,1,…)
+#  - overlap_tokens>0 이면 같은 path의 다음 청크 앞에 직전 청크의 끝 문장들을 겹쳐 붙인다
+# 스키마는 to_chunks()와 같음(Chunk: order/code/title/text/path/context_text/tables)
+#  + extra에 orders: 합쳐진 원 청크 order 목록, tokens: 추정 토큰 수, part: 분할 조각 번호(분할 시)
+# 토큰 수는 기본 추정기(estimate_tokens) — 정확한 값이 필요하면 tokenizer 콜러블을 넘긴다.
+PACK_MAX_TOKENS = int(os.getenv("PACK_MAX_TOKENS", "512"))
+PACK_OVERLAP_TOKENS = int(os.getenv("PACK_OVERLAP_TOKENS", "0"))
+
+# 한글 음절 1자 / 영문 단어 / 숫자 묶음 / 기타 기호 1개 = 1토큰 (실제 BPE보다 약간 크게 잡히는 보수적 추정)
+_TOKEN_RE = re.compile(r"[가-힣]|[A-Za-z]+|\d+(?:[.,]\d+)*|[^\s가-힣A-Za-z\d]")
+_SENT_RE = re.compile(r"[^\n]+?(?:[.!?。…](?=\s)|$)", re.M)   # 문장 또는 줄 (구분 공백/개행 제외)
+_JOIN = "\n\n"
+
+Tokenizer = Callable[[str], int]
+
+
+def estimate_tokens(text: str) -> int:
+    return sum(1 for _ in _TOKEN_RE.finditer(text or ""))
+
+
+def _sentences(text: str) -> List[Tuple[int, int]]:
+    """문장/줄 단위 (start, end) 구간 — 앞뒤 공백 제외."""
+    out = []
+    for m in _SENT_RE.finditer(text):
+        st, en = m.start(), m.end()
+        while st < en and text[st].isspace():
+            st += 1
+        while en > st and text[en - 1].isspace():
+            en -= 1
+        if st < en:
+            out.append((st, en))
+    return out
+
+
+def _hard_split(text: str, max_tokens: int, count: Tokenizer) -> List[str]:
+    """문장 하나가 예산을 넘을 때: 추정 토큰 경계에서 자름 (외부 tokenizer면 맞을 때까지 보폭을 줄임)."""
+    starts = [m.start() for m in _TOKEN_RE.finditer(text)]
+    step = max_tokens
+    while True:
+        cuts = starts[::step][1:]
+        out, prev = [], 0
+        for c in cuts:
+            out.append(text[prev:c].strip())
+            prev = c
+        out.append(text[prev:].strip())
+        out = [s for s in out if s]
+        if step == 1 or all(count(s) <= max_tokens for s in out):
+            return out
+        step = max(1, step // 2)
+
+
+def split_text(text: str, max_tokens: int, count: Tokenizer = estimate_tokens) -> List[str]:
+    """
+    text를 max_tokens 이하 조각으로. 문장/줄 경계에서 자르고 조각 안의 원래 구분자(개행·탭)는 유지,
+    문장 하나가 넘치면 그 문장만 토큰 경계로 자른다.
+    """
+    if count(text) <= max_tokens:
+        return [text]
+    parts: List[str] = []
+    st = en = -1            # 현재 조각의 text 구간
+    for s, e in _sentences(text):
+        piece = text[s:e]
+        if count(piece) > max_tokens:
+            if st >= 0:
+                parts.append(text[st:en])
+                st = -1
+            parts.extend(_hard_split(piece, max_tokens, count))
+            continue
+        if st >= 0 and count(text[st:e]) > max_tokens:
+            parts.append(text[st:en])
+            st = -1
+        if st < 0:
+            st = s
+        en = e
+    if st >= 0:
+        parts.append(text[st:en])
+    return parts
+
+
+def _tail(text: str, overlap_tokens: int, count: Tokenizer) -> str:
+    """text 끝에서 overlap_tokens 이내의 문장들 (마지막 문장 하나가 넘으면 빈 문자열)."""
+    spans = _sentences(text)
+    st = None
+    for s, e in reversed(spans):
+        if count(text[s:spans[-1][1]]) > overlap_tokens:
+            break
+        st = s
+    return text[st:spans[-1][1]] if st is not None else ""
+
+
+def _context_text(path: Optional[str], title: Optional[str], text: str) -> str:
+    # chunker._element_chunks와 같은 규칙: "<path 또는 title> :: <본문 앞 400자>"
+    context = path or (title or "")
+    return (context + " :: " + text[:400]) if context else text[:400]
+
+
+class _Pack:
+    __slots__ = ("members", "texts", "tokens")
+
+    def __init__(self) -> None:
+        self.members: List[Mapping[str, Any]] = []
+        self.texts: List[str] = []
+        self.tokens = 0
+
+    def add(self, ch: Mapping[str, Any], text: str, n: int, sep_n: int) -> None:
+        self.tokens += n + (sep_n if self.texts else 0)
+        self.members.append(ch)
+        self.texts.append(text)
+
+
+def _emit(pk: _Pack, overlap: str, overlap_n: int, sep_n: int, part: Optional[int] = None) -> Chunk:
+    first = pk.members[0]
+    path = first.get("path")
+    title = next((m.get("title") for m in pk.members if m.get("title")), None)
+    body = _JOIN.join(pk.texts)
+    extra = {
+        "orders": [m.get("order") for m in pk.members],
+        "tokens": pk.tokens + ((overlap_n + sep_n) if overlap else 0),
+    }
+    if part is not None:
+        extra["part"] = part
+    return Chunk(
+        order=first.get("order"),
+        code=first.get("code"),
+        title=title,
+        text=(overlap + _JOIN + body) if overlap else body,
+        path=path,
+        context_text=_context_text(path, title, body),   # 겹친 앞부분이 아니라 이 청크 본문 기준
+        tables=[t for m in pk.members for t in (m.get("tables") or [])] or None,
+        extra=extra,
+    )
+
+
+def pack_chunks(
+    chunks: Iterable[Mapping[str, Any]],
+    max_tokens: int | None = None,
+    overlap_tokens: int | None = None,
+    *,
+    tokenizer: Optional[Tokenizer] = None,
+) -> Iterator[Mapping[str, Any]]:
+    """
+    to_chunks()/to_chunks_iter() 출력 → 토큰 예산 청크 (제너레이터, 입력 순서 유지).
+    - max_tokens: 청크당 최대 토큰 (기본 PACK_MAX_TOKENS). 0 이하면 입력을 그대로 돌려줌
+    - overlap_tokens: 같은 path 안에서 앞 청크 끝 문장을 겹칠 토큰 수 (기본 PACK_OVERLAP_TOKENS)
+      겹침은 max_tokens 예산에 포함하지 않는다 (본문 패킹 결과가 overlap 설정과 무관하도록)
+    - tokenizer: str → 토큰 수. 없으면 estimate_tokens
+    """
+    max_tokens = PACK_MAX_TOKENS if max_tokens is None else max_tokens
+    overlap_tokens = PACK_OVERLAP_TOKENS if overlap_tokens is None else overlap_tokens
+    if max_tokens <= 0:
+        yield from chunks
+        return
+    count = tokenizer or estimate_tokens
+    sep_n = count(_JOIN)
+    overlap_tokens = max(0, min(overlap_tokens, max_tokens))
+
+    pk = _Pack()
+    cur_path: Any = object()
+    prev_text = ""          # 같은 path의 직전 출력 본문 (겹침 원천)
+
+    def flush() -> Iterator[Chunk]:
+        nonlocal pk, prev_text
+        if pk.members:
+            ov = _tail(prev_text, overlap_tokens, count) if (overlap_tokens and prev_text) else ""
+            yield _emit(pk, ov, count(ov) if ov else 0, sep_n)
+            prev_text = _JOIN.join(pk.texts)
+        pk = _Pack()
+
+    for ch in chunks:
+        text = (ch.get("text") or "").strip()
+        if not text:
+            continue
+        path = ch.get("path")
+        if path != cur_path:
+            yield from flush()
+            cur_path, prev_text = path, ""
+        n = count(text)
+
+        if n > max_tokens:
+            # 큰 element: 앞 묶음을 내보내고 단독으로 조각낸다
+            yield from flush()
+            for k, piece in enumerate(split_text(text, max_tokens, count)):
+                one = _Pack()
+                one.add(ch if k == 0 else {**ch, "tables": None}, piece, count(piece), sep_n)
+                ov = _tail(prev_text, overlap_tokens, count) if (overlap_tokens and prev_text) else ""
+                yield _emit(one, ov, count(ov) if ov else 0, sep_n, part=k)
+                prev_text = piece
+            continue
+
+        if pk.members and pk.tokens + sep_n + n > max_tokens:
+            yield from flush()
+        pk.add(ch, text, n, sep_n)
+
+    yield from flush()
+
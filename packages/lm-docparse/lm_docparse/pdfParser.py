@@ -3,17 +3,24 @@ from __future__ import annotations
 
 import os
 import json
+import shutil
 import time
 from pathlib import Path
+from typing import Any
 
 import requests
 from dotenv import load_dotenv
 
+from . import artifact
+
 # .env 먼저 로드 → 환경변수 읽기
 load_dotenv()
 API_KEY = os.getenv("UPSTAGE_API_KEY") or os.getenv("PARSER_API_KEY")
 BASE = (os.getenv("PARSER_API_BASE") or "https://api.upstage.ai/v1").rstrip("/")
 URL = f"{BASE}/document-digitization"
+# 스트리밍 모드 기본값 (업로드/다운로드 모두 파일↔소켓 직결, 결과는 지연 로드)
+STREAM = os.getenv("PARSE_STREAM", "").strip().lower() in ("1", "true", "yes", "on")
+_DL_CHUNK = 1 << 20
 
 
 def _b(v: bool) -> str:
@@ -21,6 +28,26 @@ def _b(v: bool) -> str:
     return "true" if v else "false"
 
 
+def _form_data(
+    *,
+    ocr: str,
+    coordinates: bool,
+    chart_recognition: bool,
+    output_formats: list[str],
+    base64_encoding: list[str],
+    model: str,
+) -> dict:
+    """document-digitization multipart 필드 (단건/배치 클라이언트 공용)"""
+    return {
+        "ocr": ocr,
+        "coordinates": _b(coordinates),
+        "chart_recognition": _b(chart_recognition),
+        "output_formats": json.dumps(output_formats, ensure_ascii=False),
+        "base64_encoding": json.dumps(base64_encoding, ensure_ascii=False),
+        "model": model,
+    }
+
+
 def call_document_parse(
     input_file: str,
     output_file: str,
@@ -33,19 +60,116 @@ def call_document_parse(
     model: str = "document-parse",
     timeout: int = 120,
     verbose: bool = False,
+    cache: Any = "default",               # "default"(PARSE_CACHE 설정) | None(끄기) | LocalParseCache/ArtifactParseCache
+    shard_pages: int | None = None,       # N페이지 초과 PDF는 N페이지씩 나눠 병렬 파싱 (None: PARSE_SHARD_PAGES, 0: 끄기)
+    stream: bool | None = None,           # True: 무버퍼 업로드 + 응답을 디스크로 받아 저장, 반환은 LazyJSONFile
+    text_layer: bool | None = None,       # True: 텍스트 레이어 있는 페이지는 로컬 추출, 이미지 페이지만 원격 (None: PARSE_TEXT_LAYER)
+    blob_store: Any = "default",          # base64 이미지 분리 저장소 (lm_docparse.blobs), None이면 인라인 유지
 ) -> dict:
+    """
+    Upstage document-digitization 호출 → output_file 저장 후 응답 반환.
+    - stream=True(또는 PARSE_STREAM=1): 메모리 피크가 문서 크기에 비례하지 않음
+        업로드: 파일을 블록 단위로 읽어 전송 (multipart 본문을 메모리에 만들지 않음)
+        다운로드: 응답 바이트를 디스크(임시파일)로 바로 기록 → base64 분리 후 artifact 코덱으로 저장
+        반환: LazyJSONFile — 첫 키 접근 시 저장 파일에서 로드
+    """
+    stream = STREAM if stream is None else stream
+    from .textlayer import TEXT_LAYER
+
+    text_layer = (TEXT_LAYER if text_layer is None else text_layer) and str(input_file).lower().endswith(".pdf")
+
+    # 1) 캐시 조회: (PDF sha256, 파싱 옵션) 키 → 히트 시 네트워크 호출 없이 반환
+    from .cache import cache_key, default_cache, file_sha256
+
+    if cache == "default":
+        cache = default_cache()
+    key = None
+    if cache is not None:
+        t0 = time.perf_counter()
+        key = cache_key(
+            file_sha256(input_file),
+            model=model,
+            ocr=ocr,
+            output_formats=output_formats,
+            coordinates=coordinates,
+            base64_encoding=base64_encoding,
+            chart_recognition=chart_recognition,
+            variant="text_layer" if text_layer else None,
+        )
+        hit = cache.get_path(key)
+        if hit is not None:
+            out_path = Path(output_file)
+            out_path.parent.mkdir(parents=True, exist_ok=True)
+            if hit.resolve() != out_path.resolve():
+                shutil.copyfile(hit, out_path)   # 저장 포맷이 같으므로 재직렬화 없이 복사
+            if stream:
+                from .stream import LazyJSONFile
+
+                return LazyJSONFile(out_path)
+            result = artifact.load(out_path)
+            if verbose:
+                print(f"✓ Cache  {out_path}  (key={key[:12]}…, {(time.perf_counter() - t0)*1000:.0f} ms)")
+            return result
+
+    # 2) 디지털 PDF: 로컬 텍스트 레이어 우선, 이미지 페이지만 원격 (모든 페이지가 로컬이면 API 키 불필요)
+    if text_layer:
+        from .textlayer import parse_with_text_layer
+
+        def _remote(sub_pdf: str, sub_out: str) -> dict:
+            return call_document_parse(
+                sub_pdf, sub_out,
+                ocr=ocr, coordinates=coordinates, chart_recognition=chart_recognition,
+                output_formats=output_formats, base64_encoding=base64_encoding, model=model,
+                timeout=timeout, verbose=verbose, cache=None, shard_pages=shard_pages,
+                stream=False, text_layer=False, blob_store=blob_store,
+            )
+
+        try:
+            result = parse_with_text_layer(
+                input_file, output_file, remote_parse=_remote, blob_store=blob_store, verbose=verbose
+            )
+        except ImportError:
+            if verbose:
+                print("⚠ pypdf 미설치 → 텍스트 레이어 경로 생략")
+        else:
+            if cache is not None and key:
+                cache.put_file(key, output_file)
+            return result
 
     if not API_KEY:
         raise RuntimeError("Set UPSTAGE_API_KEY (or PARSER_API_KEY) in .env")
 
-    data = {
-        "ocr": ocr,
-        "coordinates": _b(coordinates),
-        "chart_recognition": _b(chart_recognition),
-        "output_formats": json.dumps(output_formats, ensure_ascii=False),
-        "base64_encoding": json.dumps(base64_encoding, ensure_ascii=False),
-        "model": model,
-    }
+    # 3) 큰 PDF: 페이지 구간 분할 → 병렬 파싱 → 병합
+    from .shard import SHARD_PAGES, page_count, parse_sharded
+
+    shard_pages = SHARD_PAGES if shard_pages is None else shard_pages
+    if shard_pages and str(input_file).lower().endswith(".pdf"):
+        try:
+            n_pages = page_count(input_file)
+        except ImportError:
+            n_pages = 0
+            if verbose:
+                print("⚠ pypdf 미설치 → 분할 없이 단일 업로드")
+        if n_pages > shard_pages:
+            result = parse_sharded(
+                input_file, output_file,
+                pages_per_shard=shard_pages, verbose=verbose, timeout=timeout,
+                ocr=ocr, coordinates=coordinates, chart_recognition=chart_recognition,
+                output_formats=output_formats, base64_encoding=base64_encoding, model=model,
+                blob_store=blob_store,
+            )
+            if cache is not None and key:
+                cache.put_file(key, output_file)
+            return result
+
+    data = _form_data(
+        ocr=ocr,
+        coordinates=coordinates,
+        chart_recognition=chart_recognition,
+        output_formats=output_formats,
+        base64_encoding=base64_encoding,
+        model=model,
+    )
 
     if verbose:
         size_kb = os.path.getsize(input_file) / 1024
@@ -53,6 +177,10 @@ def call_document_parse(
         print(f"→ POST   {URL}")
         print(f"   opts  ocr={ocr} coord={coordinates} chart={chart_recognition} formats={output_formats}")
 
+    if stream:
+        return _call_streaming(input_file, output_file, data, timeout=timeout, verbose=verbose, cache=cache, key=key,
+                               blob_store=blob_store)
+
     t0 = time.perf_counter()
     with open(input_file, "rb") as f:
         resp = requests.post(
@@ -74,14 +202,79 @@ def call_document_parse(
         raise RuntimeError(f"[Upstage] HTTP {resp.status_code}: {snippet}") from e
 
     result = resp.json()
+    from .blobs import offload_base64
+
+    result, n_blobs = offload_base64(result, blob_store, inplace=True)
 
     out_path = Path(output_file)
-    out_path.parent.mkdir(parents=True, exist_ok=True)  # 폴더 자동 생성
-    with out_path.open("w", encoding="utf-8") as w:
-        json.dump(result, w, ensure_ascii=False, indent=2)
+    artifact.save(out_path, result)   # 폴더 자동 생성, ARTIFACT_CODEC (기본 compact JSON)
+    if cache is not None and key:
+        cache.put_file(key, out_path)
 
     if verbose:
         resp_kb = len(resp.content) / 1024
-        print(f"✓ Saved  {out_path}  ({resp_kb:.1f} KB, {elapsed*1000:.0f} ms)")
+        print(f"✓ Saved  {out_path}  ({resp_kb:.1f} KB, {elapsed*1000:.0f} ms)"
+              + (f", {n_blobs} base64 → blobs" if n_blobs else ""))
 
     return result
+
+
+def _call_streaming(
+    input_file: str,
+    output_file: str,
+    data: dict,
+    *,
+    timeout: int,
+    verbose: bool,
+    cache: Any,
+    key: str | None,
+    blob_store: Any = "default",
+):
+    """
+    스트리밍 업로드/다운로드. 응답 본문은 임시파일로 받은 뒤 비스트리밍 경로와 같은 저장 경로를 거침
+    (base64 → blobs 분리 + artifact.save 코덱) → 캐시/출력 파일 포맷이 경로와 무관하게 같음.
+    중단 시 임시파일만 지워지고 깨진 출력은 남지 않음.
+    """
+    from .blobs import offload_base64
+    from .stream import LazyJSONFile, MultipartStream
+
+    body = MultipartStream(data, "document", input_file)
+    out_path = Path(output_file)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = out_path.with_name(out_path.name + ".part")
+
+    t0 = time.perf_counter()
+    try:
+        with requests.post(
+            URL,
+            headers={"Authorization": f"Bearer {API_KEY}", "Content-Type": body.content_type},
+            data=body,
+            timeout=timeout,
+            stream=True,
+        ) as resp:
+            if resp.status_code >= 400:
+                snippet = resp.raw.read(500, decode_content=True).decode("utf-8", "replace")
+                if verbose:
+                    print(f"✖ HTTP {resp.status_code} ({(time.perf_counter() - t0)*1000:.0f} ms)")
+                    print(snippet)
+                raise RuntimeError(f"[Upstage] HTTP {resp.status_code}: {snippet}")
+            n_bytes = 0
+            with tmp_path.open("wb") as w:
+                for chunk in resp.iter_content(chunk_size=_DL_CHUNK):
+                    w.write(chunk)
+                    n_bytes += len(chunk)
+        result, n_blobs = offload_base64(artifact.load(tmp_path), blob_store, inplace=True)
+        artifact.save(out_path, result)
+        del result   # 반환은 LazyJSONFile → 호출자가 읽을 때까지 메모리에 들고 있지 않음
+    finally:
+        body.close()
+        if tmp_path.exists():
+            tmp_path.unlink()
+    elapsed = time.perf_counter() - t0
+
+    if cache is not None and key:
+        cache.put_file(key, out_path)
+    if verbose:
+        print(f"✓ Saved  {out_path}  ({n_bytes / 1024:.1f} KB, {elapsed*1000:.0f} ms, stream)"
+              + (f", {n_blobs} base64 → blobs" if n_blobs else ""))
+    return LazyJSONFile(out_path)
@@ -0,0 +1,249 @@
+# packages/lm-docparse/lm_docparse/rechunk.py
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from lm_core_schema import serde
+from lm_core_schema.models import Chunk
+
+from . import artifact
+from .batch import BatchReport, DocResult
+
+# ===== 저장된 파싱 JSON 일괄 재청크 (프로세스 풀) =====
+# 청크화(정규화 정규식, 표 파싱)는 순수 CPU 작업이라 스레드로는 한 코어만 쓴다.
+# 청커가 바뀔 때마다 수백 개 *.raw.json을 다시 돌리므로 파일 단위로 프로세스 풀에 나눠 준다.
+#  - 작업 단위 = 파일 1개 (워커가 직접 읽고 쓰고, 부모에는 작은 결과만 돌려줌 → 피클 비용 최소)
+#  - 큰 파일부터 제출해 마지막에 큰 파일 하나만 도는 꼬리 지연을 줄임
+#  - 출력: <out-dir>/<입력 상대 경로>/<이름>.chunks.json (또는 --jsonl 이면 .chunks.jsonl, 청크당 한 줄),
+#    임시 파일 후 교체. 같은 폴더의 x.raw.json / x.json처럼 이름이 겹치면 접미사를 떼지 않는다
+# 예)
+#   python -m lm_docparse.rechunk "out/policies/*.raw.json" --out-dir out/chunks --workers 8
+#   lm-rechunk out/budgets --jsonl --pack-tokens 512 --report out/rechunk_report.json
+CHUNK_SUFFIX = ".chunks"
+_STRIP_SUFFIXES = (".raw", ".parsed")
+
+
+def collect_json_inputs(srcs: Iterable[str | Path]) -> List[Path]:
+    """디렉터리(하위 *.json) / 글롭 / 파일 경로 → 파싱 JSON 목록 (*.chunks.json·_manifest 제외, 중복 제거)."""
+    from glob import glob
+
+    seen: Dict[Path, None] = {}
+    for src in srcs:
+        p = Path(src)
+        if p.is_dir():
+            found = sorted(p.rglob("*.json"))
+        elif p.is_file():
+            found = [p]
+        else:
+            found = [Path(x) for x in sorted(glob(str(src), recursive=True))]
+        for q in found:
+            if q.is_file() and not q.name.endswith(CHUNK_SUFFIX + ".json") and not q.name.startswith("_"):
+                seen.setdefault(q, None)
+    return list(seen)
+
+
+def out_path_for(src: Path, out_dir: Optional[Path], jsonl: bool = False, *, strip: bool = True) -> Path:
+    """x.raw.json / x.parsed.json / x.json → <out_dir 또는 원본 폴더>/x.chunks.json(l) (strip=False면 x.raw.chunks.json)"""
+    stem = src.stem
+    for suf in _STRIP_SUFFIXES if strip else ():
+        if stem.endswith(suf):
+            stem = stem[: -len(suf)]
+            break
+    return (out_dir or src.parent) / f"{stem}{CHUNK_SUFFIX}{'.jsonl' if jsonl else '.json'}"
+
+
+def out_paths_for(files: List[Path], out_dir: Optional[Path], jsonl: bool = False) -> List[Path]:
+    """
+    입력 목록 → 출력 경로 (1:1 보장).
+    - out_dir 지정 시 입력들의 공통 상위 폴더 기준 상대 경로를 그 아래에 유지 (a/x.json, b/x.json 구분)
+    - 같은 폴더의 x.raw.json / x.parsed.json / x.json처럼 접미사를 떼면 겹치는 입력은 떼지 않음
+    - 그래도 두 입력이 한 출력으로 가면 ValueError (덮어쓰기 방지)
+    """
+    res = [p.resolve() for p in files]
+    dirs = [p.parent for p in files]
+    if out_dir is not None and files:
+        try:
+            root: Optional[Path] = Path(os.path.commonpath([str(r.parent) for r in res]))
+        except ValueError:                       # 드라이브가 다른 경우 등
+            root = None
+        dirs = [out_dir / r.parent.relative_to(root) if root else out_dir for r in res]
+    outs = [out_path_for(f, d, jsonl) for f, d in zip(files, dirs)]
+
+    def _owners() -> Dict[Path, set]:
+        owners: Dict[Path, set] = {}
+        for o, r in zip(outs, res):
+            owners.setdefault(o.resolve(), set()).add(r)
+        return owners
+
+    owners = _owners()
+    outs = [out_path_for(f, d, jsonl, strip=False) if len(owners[o.resolve()]) > 1 else o
+            for f, d, o in zip(files, dirs, outs)]
+    for o, srcs in _owners().items():
+        if len(srcs) > 1:
+            raise ValueError(f"inputs map to the same output {o}: {sorted(map(str, srcs))}")
+    return outs
+
+
+def _write_atomic(out: Path, chunks: List[Chunk], jsonl: bool) -> None:
+    if not jsonl:
+        artifact.save(out, chunks)
+        return
+    # JSONL은 줄 단위로 읽는 도구(head, wc -l, 스트리밍 적재)를 위해 평문 유지
+    out.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=out.parent, suffix=".tmp", delete=False) as w:
+        for ch in chunks:
+            w.write(serde.dumps_str(ch))
+            w.write("\n")
+    os.replace(w.name, out)
+
+
+@dataclass
+class ChunkResult(DocResult):
+    elements: int = 0
+    chunks: int = 0
+
+
+def chunk_file(
+    src: str,
+    out: str,
+    *,
+    include_tables: bool = True,
+    strip_furniture: Optional[bool] = None,
+    pack_tokens: int = 0,
+    overlap_tokens: int = 0,
+    jsonl: bool = False,
+) -> ChunkResult:
+    """파일 하나: 읽기 → to_chunks() → (옵션) pack → 쓰기. 프로세스 풀 워커에서 그대로 호출된다."""
+    from .chunker import chunk_records
+
+    t0 = time.perf_counter()
+    try:
+        resp = artifact.load(src)
+        chunks = chunk_records(resp, include_tables=include_tables, strip_furniture=strip_furniture)
+        if pack_tokens > 0:
+            from .pack import pack_chunks
+
+            chunks = list(pack_chunks(chunks, pack_tokens, overlap_tokens))
+        n_el = len(resp.get("elements") or []) if isinstance(resp, dict) else 0
+        _write_atomic(Path(out), chunks, jsonl)
+        return ChunkResult(src, out, "ok", (time.perf_counter() - t0) * 1000, os.path.getsize(src),
+                           elements=n_el, chunks=len(chunks))
+    except Exception as e:
+        return ChunkResult(src, None, "fail", (time.perf_counter() - t0) * 1000, 0, f"{type(e).__name__}: {e}"[:500])
+
+
+def rechunk_batch(
+    inputs: Iterable[str | Path],
+    out_dir: str | Path | None = None,
+    *,
+    workers: int | None = None,
+    jsonl: bool = False,
+    on_done: Optional[Callable[[ChunkResult], None]] = None,
+    **chunk_opts: Any,
+) -> BatchReport:
+    """
+    inputs를 workers개 프로세스로 재청크 (workers 기본: CPU 수, 1이면 현재 프로세스에서 순차 실행).
+    chunk_opts: chunk_file()의 include_tables / strip_furniture / pack_tokens / overlap_tokens
+    """
+    files = list(dict.fromkeys(Path(x) for x in inputs))
+    od = Path(out_dir) if out_dir else None
+    tasks = [(str(p), str(o)) for p, o in zip(files, out_paths_for(files, od, jsonl))]
+    # 큰 파일 먼저 (꼬리 지연 감소)
+    tasks.sort(key=lambda t: os.path.getsize(t[0]) if os.path.exists(t[0]) else 0, reverse=True)
+    workers = max(1, workers or os.cpu_count() or 1)
+
+    report = BatchReport(total=len(tasks))
+
+    def _collect(res: ChunkResult) -> None:
+        report.docs.append(res)
+        if res.status == "ok":
+            report.ok += 1
+        else:
+            report.failed += 1
+        if on_done:
+            on_done(res)
+
+    t_start = time.perf_counter()
+    if workers == 1 or len(tasks) <= 1:
+        for src, out in tasks:
+            _collect(chunk_file(src, out, jsonl=jsonl, **chunk_opts))
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as ex:
+            futs = [ex.submit(chunk_file, src, out, jsonl=jsonl, **chunk_opts) for src, out in tasks]
+            for fut in as_completed(futs):
+                _collect(fut.result())
+    report.wall_s = time.perf_counter() - t_start
+    return report
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description="LedgerMate - 파싱 JSON 일괄 재청크 (프로세스 풀)")
+    ap.add_argument("inputs", nargs="+", help="파싱 JSON 파일/디렉터리/글롭 (예: 'out/policies/*.raw.json')")
+    ap.add_argument("--out-dir", default=None, help="출력 디렉터리 (입력 하위 폴더 구조 유지, 기본: 입력 파일 옆)")
+    ap.add_argument("-j", "--workers", type=int, default=None, help="프로세스 수 (기본: CPU 수)")
+    ap.add_argument("--jsonl", action="store_true", help="청크당 한 줄 JSONL로 저장")
+    ap.add_argument("--no-tables", action="store_true", help="표 추출 생략")
+    ap.add_argument("--keep-furniture", action="store_true", help="쪽 머리말/꼬리말 제거 안 함")
+    ap.add_argument("--pack-tokens", type=int, default=0, help="토큰 예산 패킹 (0=끔)")
+    ap.add_argument("--overlap-tokens", type=int, default=0)
+    ap.add_argument("--report", default=None, help="리포트 JSON 저장 경로")
+    ap.add_argument("-q", "--quiet", action="store_true", help="파일별 로그 생략")
+    args = ap.parse_args(argv)
+
+    files = collect_json_inputs(args.inputs)
+    if not files:
+        raise SystemExit("❌ 매치되는 파싱 JSON이 없습니다.")
+    workers = max(1, args.workers or os.cpu_count() or 1)
+    print(f"▶ rechunk: {len(files)} files, workers={workers}")
+
+    def _log(r: ChunkResult) -> None:
+        if r.status != "ok":
+            print(f"  ✖ {r.file}: {r.error}", file=sys.stderr)
+        elif not args.quiet:
+            print(f"  ✓ {r.file} → {r.out} ({r.elements} el → {r.chunks} chunks, {r.ms:.0f} ms)")
+
+    try:
+        out_paths_for(files, Path(args.out_dir) if args.out_dir else None, args.jsonl)
+    except ValueError as e:
+        raise SystemExit(f"❌ {e}")
+    rep = rechunk_batch(
+        files,
+        args.out_dir,
+        workers=workers,
+        jsonl=args.jsonl,
+        on_done=_log,
+        include_tables=not args.no_tables,
+        strip_furniture=False if args.keep_furniture else None,
+        pack_tokens=args.pack_tokens,
+        overlap_tokens=args.overlap_tokens,
+    )
+    s = rep.summary()
+    cpu_s = sum(d.ms for d in rep.docs) / 1000
+    n_chunks = sum(getattr(d, "chunks", 0) for d in rep.docs)
+    print(
+        f"[OK] {s['ok']}/{s['total']} files ({s['failed']} failed), {n_chunks} chunks in {s['wall_s']:.2f}s"
+        f" → {s['docs_per_s']:.2f} files/s, {s['mb_per_s']:.2f} MB/s"
+    )
+    print(
+        f"     per-file ms p50={s['latency_ms']['p50']} p90={s['latency_ms']['p90']} max={s['latency_ms']['max']}"
+        f" · Σfile time / wall = {cpu_s / s['wall_s'] if s['wall_s'] else 0:.2f}x (≈ 활용 코어 수)"
+    )
+    if args.report:
+        Path(args.report).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.report).write_text(json.dumps(rep.to_dict(), ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"  report → {args.report}")
+    if rep.failed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
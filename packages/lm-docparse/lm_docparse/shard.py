@@ -0,0 +1,149 @@
+# packages/lm-docparse/lm_docparse/shard.py
+from __future__ import annotations
+
+import copy
+import os
+import re
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+from . import artifact
+
+# ===== 페이지 분할 병렬 파싱 =====
+# 큰 PDF(예산서/규정집)를 페이지 구간(shard)으로 나눠 동시에 파싱한 뒤
+# elements를 하나로 합친다. id/page/content.html을 재번호 매겨 to_chunks()가
+# 단일 문서 응답과 같은 형태를 보도록 한다.
+# - pypdf 필요 (pip install "lm-docparse[pdf]"), 없으면 분할 없이 단일 업로드
+SHARD_PAGES = int(os.getenv("PARSE_SHARD_PAGES", "0"))   # 0 = 분할 안 함
+SHARD_WORKERS = int(os.getenv("PARSE_SHARD_WORKERS", "4"))
+
+# element html에서 처음 나오는 id='N' 속성 (앞에 <br> 등이 붙는 경우가 있음)
+_HTML_ID_RE = re.compile(r"""(<[A-Za-z][\w-]*\b[^>]*?\bid=)(['"])(\d+)\2""")
+
+
+def page_count(path: str | Path) -> int:
+    from pypdf import PdfReader
+
+    return len(PdfReader(str(path)).pages)
+
+
+def split_pdf(path: str | Path, pages_per_shard: int, out_dir: str | Path) -> List[Tuple[Path, int]]:
+    """[(shard_path, 첫 페이지 번호(1-base))]. 페이지 객체를 그대로 복사(재렌더링 없음)."""
+    from pypdf import PdfReader, PdfWriter
+
+    reader = PdfReader(str(path))
+    n = len(reader.pages)
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    stem = Path(path).stem
+    shards: List[Tuple[Path, int]] = []
+    for start in range(0, n, pages_per_shard):
+        w = PdfWriter()
+        for i in range(start, min(n, start + pages_per_shard)):
+            w.add_page(reader.pages[i])
+        sp = out_dir / f"{stem}.p{start + 1:04d}.pdf"
+        with sp.open("wb") as f:
+            w.write(f)
+        shards.append((sp, start + 1))
+    return shards
+
+
+def _renumber_html(h: Any, new_id: int) -> Any:
+    if not isinstance(h, str):
+        return h
+    return _HTML_ID_RE.sub(lambda m: f"{m.group(1)}{m.group(2)}{new_id}{m.group(2)}", h, count=1)
+
+
+def merge_results(parts: List[Tuple[int, Dict[str, Any]]]) -> Dict[str, Any]:
+    """
+    [(첫 페이지 번호, shard 응답)] → 단일 응답.
+    - elements: 순서대로 이어붙이고 id 0..N-1 재부여, page += (첫 페이지 - 1)
+    - element content.html 의 id='..' 도 새 id로
+    - 문서 content.{html,markdown,text}: 재번호된 element 내용을 줄바꿈으로 연결
+    - usage.pages: 합계
+    """
+    parts = sorted(parts, key=lambda x: x[0])
+    merged: Dict[str, Any] = {}
+    elements: List[Dict[str, Any]] = []
+    pages = 0
+    for first_page, resp in parts:
+        if not merged:
+            merged = {k: copy.deepcopy(v) for k, v in resp.items() if k not in ("elements", "content", "usage")}
+        off = first_page - 1
+        for el in resp.get("elements") or []:
+            el = dict(el)
+            new_id = len(elements)
+            el["id"] = new_id
+            if isinstance(el.get("page"), int):
+                el["page"] = el["page"] + off
+            cont = el.get("content")
+            if isinstance(cont, dict) and "html" in cont:
+                el["content"] = {**cont, "html": _renumber_html(cont.get("html"), new_id)}
+            elements.append(el)
+        usage = resp.get("usage") or {}
+        pages += int(usage.get("pages") or 0)
+
+    content: Dict[str, str] = {}
+    for fmt in ("html", "markdown", "text"):
+        vals = [
+            el["content"].get(fmt)
+            for el in elements
+            if isinstance(el.get("content"), dict) and isinstance(el["content"].get(fmt), str)
+        ]
+        if any(vals):
+            content[fmt] = "\n".join(v for v in vals if v)
+        else:
+            content[fmt] = ""
+    merged["content"] = content
+    merged["elements"] = elements
+    merged["usage"] = {"pages": pages}
+    return merged
+
+
+def parse_sharded(
+    input_file: str,
+    output_file: str,
+    *,
+    pages_per_shard: int,
+    workers: int | None = None,
+    client=None,
+    verbose: bool = False,
+    blob_store: Any = "default",
+    **opts: Any,
+) -> Dict[str, Any]:
+    """
+    PDF를 pages_per_shard 페이지씩 나눠 workers개 동시 파싱 → 병합 결과를 output_file로 저장.
+    - 각 shard는 DocParseClient(재시도/커넥션 풀)로 호출 → 느린 구간 하나가 전체 타임아웃을 유발하지 않음
+    - opts: ocr/coordinates/chart_recognition/output_formats/base64_encoding/model
+    - blob_store: 병합 결과의 base64 이미지를 분리 저장 (lm_docparse.blobs)
+    """
+    from .blobs import offload_base64
+    from .batch import DocParseClient
+
+    workers = max(1, workers or SHARD_WORKERS)
+    t0 = time.perf_counter()
+    with tempfile.TemporaryDirectory(prefix="lm_shard_") as tmp:
+        shards = split_pdf(input_file, pages_per_shard, tmp)
+        if verbose:
+            print(f"→ Shard  {input_file}: {len(shards)} × ≤{pages_per_shard}p, workers={workers}")
+
+        own = client is None
+        client = client or DocParseClient(pool_size=workers, timeout=opts.pop("timeout", 120))
+        opts.pop("timeout", None)
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as ex:
+                futs = [(first, ex.submit(client.parse, str(sp), **opts)) for sp, first in shards]
+                parts = [(first, f.result()) for first, f in futs]
+        finally:
+            if own:
+                client.close()
+
+    result, _ = offload_base64(merge_results(parts), blob_store, inplace=True)
+    out_path = Path(output_file)
+    artifact.save(out_path, result)
+    if verbose:
+        print(f"✓ Merged {out_path}  ({len(result['elements'])} elements, {(time.perf_counter() - t0)*1000:.0f} ms)")
+    return result
@@ -0,0 +1,199 @@
+# packages/lm-docparse/lm_docparse/spatial.py
+from __future__ import annotations
+
+from bisect import bisect_left
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .furniture import bbox
+
+# ===== element 공간 인덱스 =====
+# Upstage elements는 쪽(page)과 상대 좌표(0~1, 좌상단 원점)를 갖지만 다운스트림은 평평한 리스트를
+# 선형으로 훑는다(예: llm_profile._closest_title이 표 앞 element를 하나씩 거슬러 올라감).
+# ElementIndex는 쪽별로 bbox를 GRID×GRID 균일 격자 칸에 등록해 두고
+#  - region(): 영역과 겹치는(또는 포함되는) element
+#  - above(): 이 element 바로 위(세로로 가장 가까운) element — 표 제목/캡션 찾기
+#  - same_row(): 세로 구간이 충분히 겹치는 같은 줄 element (왼→오)
+# 를 칸 몇 개만 보고 답한다. 좌표가 없는 element는 문서 순서 기반으로 폴백한다.
+GRID = 8
+TITLE_CATEGORIES = ("caption", "heading1", "heading2", "heading3", "heading4", "heading5", "heading6", "paragraph")
+
+BBox = Tuple[float, float, float, float]
+
+
+def _clamp_cell(v: float) -> int:
+    return min(GRID - 1, max(0, int(v * GRID)))
+
+
+def _h_overlap(a: BBox, b: BBox) -> float:
+    return max(0.0, min(a[2], b[2]) - max(a[0], b[0]))
+
+
+def _v_overlap(a: BBox, b: BBox) -> float:
+    return max(0.0, min(a[3], b[3]) - max(a[1], b[1]))
+
+
+class ElementIndex:
+    """elements(Upstage 응답 리스트) 위의 쪽별 격자 인덱스. 반환값은 모두 elements 인덱스."""
+
+    __slots__ = ("elements", "_bbox", "_page", "_pages", "_grid", "_text")
+
+    def __init__(self, elements: Sequence[Dict[str, Any]]):
+        self.elements = elements
+        self._bbox: List[Optional[BBox]] = []
+        self._page: List[Any] = []
+        self._pages: Dict[Any, List[int]] = {}                     # 쪽 → 문서 순서 인덱스
+        self._grid: Dict[Any, Dict[Tuple[int, int], List[int]]] = {}
+        self._text: Dict[int, str] = {}
+        for i, el in enumerate(elements):
+            el = el if isinstance(el, dict) else {}
+            bb = bbox(el)
+            page = el.get("page")
+            self._bbox.append(bb)
+            self._page.append(page)
+            self._pages.setdefault(page, []).append(i)
+            if bb is None:
+                continue
+            cells = self._grid.setdefault(page, {})
+            for cx in range(_clamp_cell(bb[0]), _clamp_cell(bb[2]) + 1):
+                for cy in range(_clamp_cell(bb[1]), _clamp_cell(bb[3]) + 1):
+                    cells.setdefault((cx, cy), []).append(i)
+
+    # ----- element 속성 -----
+    def bbox(self, i: int) -> Optional[BBox]:
+        return self._bbox[i]
+
+    def page(self, i: int) -> Any:
+        return self._page[i]
+
+    def category(self, i: int) -> str:
+        el = self.elements[i]
+        return str((el.get("category") if isinstance(el, dict) else "") or "")
+
+    def text(self, i: int) -> str:
+        """정규화 텍스트 (content.text가 비면 markdown → html 순으로 폴백, 캐시)."""
+        t = self._text.get(i)
+        if t is None:
+            from .chunker import normalize_text
+
+            el = self.elements[i]
+            t = self._text[i] = normalize_text(el.get("content", {}) if isinstance(el, dict) else "")
+        return t
+
+    def on_page(self, page: Any) -> List[int]:
+        return self._pages.get(page, [])
+
+    # ----- 질의 -----
+    def _candidates(self, page: Any, box: BBox) -> Iterable[int]:
+        cells = self._grid.get(page)
+        if not cells:
+            return ()
+        seen: set = set()
+        for cx in range(_clamp_cell(box[0]), _clamp_cell(box[2]) + 1):
+            for cy in range(_clamp_cell(box[1]), _clamp_cell(box[3]) + 1):
+                seen.update(cells.get((cx, cy), ()))
+        return seen
+
+    def region(
+        self,
+        page: Any,
+        x0: float,
+        y0: float,
+        x1: float,
+        y1: float,
+        *,
+        contain: bool = False,
+        categories: Optional[Iterable[str]] = None,
+    ) -> List[int]:
+        """쪽 page의 (x0,y0)-(x1,y1) 영역과 겹치는(contain=True면 완전히 포함되는) element, 문서 순서."""
+        box = (x0, y0, x1, y1)
+        cats = set(categories) if categories is not None else None
+        out = []
+        for i in self._candidates(page, box):
+            bb = self._bbox[i]
+            if contain:
+                ok = bb[0] >= x0 and bb[1] >= y0 and bb[2] <= x1 and bb[3] <= y1
+            else:
+                ok = bb[0] < x1 and bb[2] > x0 and bb[1] < y1 and bb[3] > y0
+            if ok and (cats is None or self.category(i) in cats):
+                out.append(i)
+        out.sort()
+        return out
+
+    def above(
+        self,
+        i: int,
+        *,
+        categories: Optional[Iterable[str]] = None,
+        tolerance: float = 0.005,
+        with_text: bool = True,
+    ) -> Optional[int]:
+        """
+        같은 쪽에서 i 위에 있는 가장 가까운 element (아래 변 ≤ i의 위 변 + tolerance).
+        가로로 겹치는 것을 먼저, 없으면 겹치지 않는 것까지. with_text=True면 텍스트가 빈 것은 건너뜀.
+        """
+        bb = self._bbox[i]
+        if bb is None:
+            return None
+        cats = set(categories) if categories is not None else None
+        top = bb[1] + tolerance
+        cells = self._grid.get(self._page[i], {})
+        best_ov: Tuple[float, int] | None = None
+        best_any: Tuple[float, int] | None = None
+        seen = {i}
+        # 격자 행을 위 변부터 위쪽으로 훑다가, 더 위 행에서는 더 가까운 후보가 나올 수 없으면 멈춤
+        for cy in range(_clamp_cell(top), -1, -1):
+            for cx in range(GRID):
+                for j in cells.get((cx, cy), ()):
+                    if j in seen:
+                        continue
+                    seen.add(j)
+                    bj = self._bbox[j]
+                    if bj[3] > top or (cats is not None and self.category(j) not in cats):
+                        continue
+                    if with_text and not self.text(j):
+                        continue
+                    key = (top - bj[3], j)             # 세로 간격이 작을수록, 같으면 문서 순서 앞쪽
+                    if _h_overlap(bb, bj) > 0 and (best_ov is None or key < best_ov):
+                        best_ov = key
+                    if best_any is None or key < best_any:
+                        best_any = key
+            if best_ov is not None and top - best_ov[0] >= cy / GRID:
+                break
+        best = best_ov or best_any
+        return best[1] if best else None
+
+    def same_row(self, i: int, *, min_overlap: float = 0.5, categories: Optional[Iterable[str]] = None) -> List[int]:
+        """i와 세로 구간이 (둘 중 낮은 높이 기준) min_overlap 이상 겹치는 같은 쪽 element, 왼쪽부터."""
+        bb = self._bbox[i]
+        if bb is None:
+            return []
+        cats = set(categories) if categories is not None else None
+        out = []
+        for j in self._candidates(self._page[i], (0.0, bb[1], 1.0, bb[3])):
+            if j == i:
+                continue
+            bj = self._bbox[j]
+            h = min(bb[3] - bb[1], bj[3] - bj[1])
+            if h <= 0 or _v_overlap(bb, bj) / h < min_overlap:
+                continue
+            if cats is None or self.category(j) in cats:
+                out.append(j)
+        out.sort(key=lambda j: (self._bbox[j][0], j))
+        return out
+
+    def title_above(self, i: int, categories: Sequence[str] = TITLE_CATEGORIES) -> str:
+        """
+        표 제목 후보: 같은 쪽에서 바로 위의 캡션/제목/문단 텍스트.
+        좌표가 없으면 같은 쪽의 문서 순서상 앞 element를 거슬러 올라간다(예전 방식).
+        """
+        j = self.above(i, categories=categories)
+        if j is not None:
+            return self.text(j)
+        if self._bbox[i] is not None:
+            return ""
+        cats = set(categories)
+        page_items = self._pages.get(self._page[i], [])
+        for j in reversed(page_items[: bisect_left(page_items, i)]):
+            if self.category(j) in cats and self.text(j):
+                return self.text(j)
+        return ""
@@ -0,0 +1,268 @@
+# packages/lm-docparse/lm_docparse/stream.py
+from __future__ import annotations
+
+import json
+import os
+import re
+import uuid
+from collections.abc import Mapping
+from pathlib import Path
+from typing import IO, Any, Dict, Iterator, List, Tuple
+
+# ===== 스트리밍 업/다운로드 보조 =====
+# - MultipartStream : 파일을 메모리에 올리지 않고 multipart/form-data 본문을 read()로 흘려보냄
+#                     (__len__ 제공 → requests가 Content-Length를 붙이고 블록 단위로 전송)
+# - LazyJSONFile    : 디스크에 저장된 응답 JSON을 첫 접근 시에만 로드하는 Mapping
+# - iter_json_items : 저장된 응답의 최상위 배열(elements)을 항목 하나씩 읽어 내보냄
+#                     (ijson이 있으면 사용, 없으면 표준 json.raw_decode 기반 증분 리더)
+
+
+class MultipartStream:
+    """
+    fields(문자열 폼 필드) + 파일 1개로 구성된 multipart 본문.
+    본문 전체 크기는 미리 계산하고, 파일 내용은 read(n) 요청 시점에 조금씩 읽는다.
+    """
+
+    def __init__(self, fields: Dict[str, str], file_field: str, file_path: str, filename: str | None = None,
+                 content_type: str = "application/octet-stream"):
+        self.boundary = uuid.uuid4().hex
+        b = self.boundary.encode("ascii")
+        head = bytearray()
+        for k, v in fields.items():
+            head += b"--" + b + b"\r\n"
+            head += f'Content-Disposition: form-data; name="{k}"\r\n\r\n'.encode("utf-8")
+            head += str(v).encode("utf-8") + b"\r\n"
+        fname = (filename or os.path.basename(file_path)).replace('"', "%22")
+        head += b"--" + b + b"\r\n"
+        head += f'Content-Disposition: form-data; name="{file_field}"; filename="{fname}"\r\n'.encode("utf-8")
+        head += f"Content-Type: {content_type}\r\n\r\n".encode("ascii")
+        self._parts: List[Tuple[str, Any]] = [("bytes", bytes(head)), ("file", file_path),
+                                              ("bytes", b"\r\n--" + b + b"--\r\n")]
+        self._len = len(head) + os.path.getsize(file_path) + len(self._parts[2][1])
+        self._idx = 0
+        self._buf = b""
+        self._fh = None
+
+    @property
+    def content_type(self) -> str:
+        return f"multipart/form-data; boundary={self.boundary}"
+
+    def __len__(self) -> int:
+        return self._len
+
+    def read(self, n: int = -1) -> bytes:
+        if n is None or n < 0:
+            n = self._len
+        out = bytearray()
+        while len(out) < n and self._idx < len(self._parts):
+            kind, val = self._parts[self._idx]
+            if kind == "bytes":
+                if not self._buf and val is not None:
+                    self._buf = val
+                    self._parts[self._idx] = ("bytes", None)
+                take = self._buf[: n - len(out)]
+                self._buf = self._buf[len(take):]
+                out += take
+                if not self._buf:
+                    self._idx += 1
+            else:
+                if self._fh is None:
+                    self._fh = open(val, "rb")
+                chunk = self._fh.read(n - len(out))
+                if chunk:
+                    out += chunk
+                else:
+                    self._fh.close()
+                    self._idx += 1
+        return bytes(out)
+
+    def close(self) -> None:
+        if self._fh is not None and not self._fh.closed:
+            self._fh.close()
+
+
+class LazyJSONFile(Mapping):
+    """저장된 JSON(객체) 파일을 첫 키 접근 시 로드. 로드 전에는 경로만 보유."""
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self._data: Dict[str, Any] | None = None
+
+    def _load(self) -> Dict[str, Any]:
+        if self._data is None:
+            from .artifact import load
+
+            self._data = load(self.path)
+        return self._data
+
+    @property
+    def loaded(self) -> bool:
+        return self._data is not None
+
+    def __getitem__(self, k: str) -> Any:
+        return self._load()[k]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._load())
+
+    def __len__(self) -> int:
+        return len(self._load())
+
+    def __repr__(self) -> str:
+        return f"LazyJSONFile({str(self.path)!r}, loaded={self.loaded})"
+
+
+# ----- 증분 JSON 리더 -----
+_READ_CHUNK = 1 << 16
+_WS = " \t\r\n"
+_STR_BODY_RE = re.compile(r'[^"\\]*(?:\\.[^"\\]*)*', re.S)   # 문자열 본문 (닫는 따옴표/잘린 이스케이프 직전까지)
+_STRUCT_RE = re.compile(r'["\[\]{}]')
+
+
+class _Buf:
+    """텍스트 파일 위에서 앞으로만 움직이는 버퍼 (소비한 앞부분은 버림)."""
+
+    def __init__(self, fp: IO[str], chunk: int):
+        self.fp = fp
+        self.chunk = chunk
+        self.s = ""
+        self.i = 0
+        self.eof = False
+
+    def fill(self) -> bool:
+        if self.eof:
+            return False
+        data = self.fp.read(self.chunk)
+        if not data:
+            self.eof = True
+            return False
+        self.s = self.s[self.i:] + data
+        self.i = 0
+        return True
+
+    def peek(self) -> str:
+        """공백을 건너뛴 다음 문자 ('' = EOF)."""
+        while True:
+            while self.i < len(self.s) and self.s[self.i] in _WS:
+                self.i += 1
+            if self.i < len(self.s) or not self.fill():
+                return self.s[self.i:self.i + 1]
+
+    def expect(self, ch: str) -> None:
+        got = self.peek()
+        if got != ch:
+            raise ValueError(f"expected {ch!r}, got {got!r}")
+        self.i += 1
+
+    def decode(self, dec: json.JSONDecoder) -> Any:
+        """현재 위치의 값 하나를 디코딩 (값이 버퍼 끝에서 잘렸으면 더 읽고 재시도)."""
+        self.peek()
+        while True:
+            try:
+                obj, end = dec.raw_decode(self.s, self.i)
+            except json.JSONDecodeError:
+                if self.fill():
+                    continue
+                raise
+            # 숫자/리터럴은 잘린 채로도 디코딩되므로("2." → 2) 뒤에 구분자가 보일 때까지 더 읽음
+            if (
+                self.s[self.i] not in "\"[{"
+                and (end == len(self.s) or self.s[end] not in ",]}" + _WS)
+                and self.fill()
+            ):
+                continue
+            self.i = end
+            return obj
+
+    def skip(self) -> None:
+        """현재 위치의 값을 메모리에 올리지 않고 건너뜀 (문자열/중첩 구조 포함)."""
+        ch = self.peek()
+        if ch not in "\"[{":
+            self._skip_scalar()
+            return
+        depth = 0
+        while True:
+            m = _STRUCT_RE.search(self.s, self.i)
+            if m is None:
+                self.i = len(self.s)
+                if not self.fill():
+                    raise ValueError("unexpected EOF while skipping value")
+                continue
+            self.i = m.end()
+            c = m.group()
+            if c == '"':
+                self._skip_string_tail()
+            elif c in "[{":
+                depth += 1
+            else:
+                depth -= 1
+            if depth == 0:
+                return
+
+    def _skip_string_tail(self) -> None:
+        while True:
+            self.i = _STR_BODY_RE.match(self.s, self.i).end()
+            if self.i < len(self.s) and self.s[self.i] == '"':
+                self.i += 1
+                return
+            # 버퍼 끝(또는 잘린 '\\') → 더 읽고 이어서
+            if not self.fill():
+                raise ValueError("unterminated string")
+
+    def _skip_scalar(self) -> None:
+        while True:
+            j = self.i
+            while j < len(self.s) and self.s[j] not in ",]}" + _WS:
+                j += 1
+            if j < len(self.s) or not self.fill():
+                self.i = j
+                return
+
+
+def _iter_items_stdlib(fp: IO[str], key: str, chunk: int) -> Iterator[Any]:
+    buf = _Buf(fp, chunk)
+    dec = json.JSONDecoder()
+    buf.expect("{")
+    if buf.peek() == "}":
+        return
+    while True:
+        k = buf.decode(dec)
+        buf.expect(":")
+        if k == key and buf.peek() == "[":
+            buf.expect("[")
+            if buf.peek() == "]":
+                return
+            while True:
+                yield buf.decode(dec)
+                if buf.peek() == ",":
+                    buf.i += 1
+                    continue
+                buf.expect("]")
+                return
+        buf.skip()
+        if buf.peek() == ",":
+            buf.i += 1
+            continue
+        return
+
+
+def iter_json_items(path: str | Path, key: str = "elements", chunk: int = _READ_CHUNK) -> Iterator[Any]:
+    """
+    최상위 객체의 key 배열 항목을 하나씩 yield. 메모리는 항목 하나 + 읽기 버퍼 크기.
+    - 앞쪽의 큰 값(content.html 등)은 디코딩하지 않고 건너뜀
+    - key가 없거나 배열이 아니면 아무것도 내보내지 않음
+    """
+    try:
+        import ijson  # type: ignore
+    except ImportError:
+        ijson = None
+
+    from .artifact import open_binary, open_text
+
+    # 압축 산출물(zstd/gzip)은 스트림으로 풀면서 읽음
+    if ijson is not None:
+        with open_binary(path) as f:
+            yield from ijson.items(f, f"{key}.item", use_float=True)
+        return
+    with open_text(path) as f:
+        yield from _iter_items_stdlib(f, key, chunk)
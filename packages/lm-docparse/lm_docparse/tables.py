@@ -1,47 +1,221 @@
 from __future__ import annotations
-from bs4 import BeautifulSoup
+import re
+from collections import Counter
+from typing import Any, Dict, List, Optional, Sequence
+
+from lm_core_schema.models import Table
+
+# ===== HTML 표 추출 =====
+# 백엔드: lxml(있으면, libxml2 파서) → 없으면 BeautifulSoup(html.parser)
+# - 결과 Table(lm_core_schema.models, dict처럼 읽힘) 형태/값은 백엔드와 무관하게 동일 (bs4 html.parser 기준 의미를 그대로 따름)
+# - extract_tables_by_element(): 문서의 element html들을 한 번에 파싱해 element별 표 목록 반환
+# - spans의 r/c는 rows 기준 좌표(r행의 c번째 셀) → grid.TableGrid가 조밀 격자로 펼침
+# - 표 태그의 열고 닫음이 맞지 않는 html은 파서마다 복구 방식이 달라 bs4로 처리 (기존 결과 유지)
+try:
+    from lxml import etree as _etree
+except ImportError:  # pragma: no cover
+    _etree = None
+
+BACKEND = "lxml" if _etree is not None else "bs4"
+_CELL_TAGS = ("th", "td")
+_SKIP_TEXT = ("script", "style")   # bs4 get_text()도 이 안의 문자열은 제외
+_WRAP_ATTR = "data-lm-el"
+_TABLE_TAG_RE = re.compile(r"<(/?)(table|thead|tbody|tfoot|tr|td|th|caption)\b", re.I)
+
+
+def _span(v: Any) -> int:
+    try:
+        return max(1, int(v or 1))
+    except (TypeError, ValueError):
+        return 1
+
+
+def _table_dict(idx, caption, rows, header_rows, spans) -> Table:
+    return Table(
+        id=f"table-{idx}",
+        caption=caption,
+        rows=rows,
+        header_rows=header_rows,
+        spans=spans or None,
+    )
+
+
+# ----- lxml -----
+def _lx_text(el) -> str:
+    # bs4 get_text(" ", strip=True): 하위 문자열을 strip 후 빈 것 제외하고 " "로 연결 (주석 제외)
+    parts: List[str] = []
+
+    def walk(node) -> None:
+        if isinstance(node.tag, str) and node.tag not in _SKIP_TEXT:
+            t = node.text
+            if t and (t := t.strip()):
+                parts.append(t)
+            for ch in node:
+                walk(ch)
+                t = ch.tail
+                if t and (t := t.strip()):
+                    parts.append(t)
+
+    walk(el)
+    return " ".join(parts)
+
+
+def _lx_first(tbl, tag: str):
+    return next(tbl.iter(tag), None) if tbl is not None else None
+
+
+def _lx_cells(tr) -> List[Any]:
+    return [c for c in tr if c.tag in _CELL_TAGS]
+
+
+def _lx_table(idx: int, tbl) -> Table:
+    cap = _lx_first(tbl, "caption")
+    caption = _lx_text(cap) if cap is not None else None
+
+    rows: List[List[str]] = []
+    spans: List[Dict[str, int]] = []
+    header_rows = 0
+
+    def read(trs) -> None:
+        # 행 하나를 한 번 훑으며 셀 텍스트와 span을 함께 기록 (r/c = rows 기준 좌표)
+        for tr in trs:
+            cells = _lx_cells(tr)
+            r = len(rows)
+            for c, cell in enumerate(cells):
+                rs = _span(cell.get("rowspan"))
+                cs = _span(cell.get("colspan"))
+                if rs > 1 or cs > 1:
+                    spans.append({"r": r, "c": c, "rowspan": rs, "colspan": cs})
+            rows.append([_lx_text(cell) for cell in cells])
+
+    thead = _lx_first(tbl, "thead")
+    if thead is not None:
+        read(thead.iter("tr"))
+        header_rows = len(rows)
+    tbody = _lx_first(tbl, "tbody")
+    if tbody is not None:
+        read(tbody.iter("tr"))
+    if not rows:  # thead/tbody 없을 때
+        read(tr for tr in tbl if tr.tag == "tr")
+    return _table_dict(idx, caption, rows, header_rows, spans)
+
+
+def _lx_root(html_str: str):
+    if not html_str:
+        return None
+    return _etree.HTML(html_str)
+
+
+def _lx_extract(root) -> List[Table]:
+    if root is None:
+        return []
+    return [_lx_table(i, t) for i, t in enumerate(root.iter("table"))]
+
+
+# ----- bs4 (폴백) -----
+def _bs_extract(html_str: str) -> List[Table]:
+    from bs4 import BeautifulSoup
 
-def extract_tables_from_html(html_str: str):
     soup = BeautifulSoup(html_str or "", "html.parser")
     out = []
     for idx, tbl in enumerate(soup.find_all("table")):
         caption_tag = tbl.find("caption")
         caption = caption_tag.get_text(" ", strip=True) if caption_tag else None
 
-        rows, header_rows = [], 0
-        def _read(section, is_header=False):
-            nonlocal header_rows
-            if not section: return
-            for tr in section.find_all("tr"):
-                row = [cell.get_text(" ", strip=True) for cell in tr.find_all(["th","td"], recursive=False)]
-                rows.append(row)
-                if is_header: header_rows += 1
-
-        _read(tbl.find("thead"), is_header=True)
-        _read(tbl.find("tbody"), is_header=False)
+        rows, spans = [], []
+
+        def read(trs) -> None:
+            for tr in trs:
+                cells = tr.find_all(_CELL_TAGS, recursive=False)
+                r = len(rows)
+                for c, cell in enumerate(cells):
+                    rs = _span(cell.get("rowspan"))
+                    cs = _span(cell.get("colspan"))
+                    if rs > 1 or cs > 1:
+                        spans.append({"r": r, "c": c, "rowspan": rs, "colspan": cs})
+                rows.append([cell.get_text(" ", strip=True) for cell in cells])
+
+        thead = tbl.find("thead")
+        if thead:
+            read(thead.find_all("tr"))
+        header_rows = len(rows)
+        tbody = tbl.find("tbody")
+        if tbody:
+            read(tbody.find_all("tr"))
         if not rows:  # thead/tbody 없을 때
-            for tr in tbl.find_all("tr", recursive=False):
-                rows.append([cell.get_text(" ", strip=True) for cell in tr.find_all(["th","td"], recursive=False)])
-
-        spans = []
-        for r, tr in enumerate(tbl.find_all("tr", recursive=False)):
-            for c, cell in enumerate(tr.find_all(["th","td"], recursive=False)):
-                rs = int(cell.get("rowspan") or 1)
-                cs = int(cell.get("colspan") or 1)
-                if rs > 1 or cs > 1:
-                    spans.append({"r": r, "c": c, "rowspan": rs, "colspan": cs})
+            read(tbl.find_all("tr", recursive=False))
 
-        out.append({
-            "id": f"table-{idx}",
-            "caption": caption,
-            "rows": rows,
-            "header_rows": header_rows,
-            "row_count": len(rows),
-            "col_count": max((len(r) for r in rows), default=0),
-            "spans": spans or None,
-            "source": "html",
-        })
+        out.append(_table_dict(idx, caption, rows, header_rows, spans))
     return out
 
+
+# ----- public -----
+def _well_formed(html_str: str) -> bool:
+    """표 관련 태그마다 여는 수 == 닫는 수"""
+    cnt = Counter((m.group(2).lower(), bool(m.group(1))) for m in _TABLE_TAG_RE.finditer(html_str))
+    return all(cnt[(tag, False)] == cnt[(tag, True)] for tag, closing in cnt if not closing)
+
+
+def extract_tables_from_html(html_str: str):
+    if _etree is not None and _well_formed(html_str or ""):
+        return _lx_extract(_lx_root(html_str))
+    return _bs_extract(html_str)
+
+
+def extract_tables_by_element(htmls: Sequence[Optional[str]]) -> List[List[Table]]:
+    """
+    element html 목록 → element별 표 목록 (extract_tables_from_html을 각각 부른 것과 같은 결과).
+    lxml이면 <div data-lm-el=i>로 감싸 문서 전체를 한 번만 파싱한다.
+    닫히지 않은 태그 등으로 래퍼 경계가 깨지면 해당 문서는 element별 파싱으로 돌아간다.
+    """
+    out: List[List[Table]] = [[] for _ in htmls]
+    idx = [i for i, h in enumerate(htmls) if h and "<table" in h.lower()]
+    if not idx:
+        return out
+    if _etree is not None:
+        slow = [i for i in idx if not _well_formed(htmls[i])]
+        if slow:
+            skip = set(slow)
+            idx = [i for i in idx if i not in skip]
+    else:
+        slow, idx = idx, []
+    for i in slow:
+        out[i] = _bs_extract(htmls[i])
+    if len(idx) <= 1:
+        for i in idx:
+            out[i] = _lx_extract(_lx_root(htmls[i]))
+        return out
+
+    doc = "".join(f'<div {_WRAP_ATTR}="{i}">{htmls[i]}</div>' for i in idx)
+    root = _etree.HTML(doc)
+    body = root.find("body") if root is not None else None
+    wraps = list(body) if body is not None else []
+    ok = (
+        len(wraps) == len(idx)
+        and all(w.tag == "div" and w.get(_WRAP_ATTR) == str(i) and not (w.tail or "").strip()
+                for w, i in zip(wraps, idx))
+        and not (body.text or "").strip()
+    )
+    if not ok:
+        for i in idx:
+            out[i] = _lx_extract(_lx_root(htmls[i]))
+        return out
+    for w, i in zip(wraps, idx):
+        out[i] = _lx_extract(w)
+    return out
+
+
+def extract_grids_from_html(html_str: str):
+    """extract_tables_from_html() + span 펼치기 → [TableGrid]"""
+    from .grid import grids_from_tables
+
+    return grids_from_tables(extract_tables_from_html(html_str))
+
+
 def table_to_text(rows):
+    """rows(행 리스트) 또는 TableGrid → 탭/개행 텍스트"""
+    from .grid import TableGrid
+
+    if isinstance(rows, TableGrid):
+        return rows.to_text()
     return "\n".join("\t".join(c or "" for c in row) for row in rows)
@@ -0,0 +1,286 @@
+# packages/lm-docparse/lm_docparse/textlayer.py
+from __future__ import annotations
+
+import html
+import os
+import re
+import statistics
+import tempfile
+import time
+import unicodedata
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+from . import artifact
+
+# ===== 로컬 텍스트 레이어 경로 =====
+# 디지털 원본 PDF(규정집 등)는 텍스트 레이어가 있으므로 원격 OCR 없이 로컬에서
+# 문단/제목/표를 뽑아 Upstage와 같은 elements 스키마로 만든다.
+# 텍스트가 거의 없는(스캔 이미지) 페이지만 모아 원격 파서로 보낸다.
+# - pypdf 필요 (pip install "lm-docparse[pdf]")
+TEXT_LAYER = os.getenv("PARSE_TEXT_LAYER", "").strip().lower() in ("1", "true", "yes", "on")
+MIN_PAGE_CHARS = int(os.getenv("PARSE_TEXT_MIN_CHARS", "40"))   # 이보다 글자가 적으면 이미지 페이지로 간주
+
+# 규정 문서 제목 패턴: 제1편/제1장/제1절 (→ heading1/2/3), "1. 예산내역 요약" (4), "가. 세입내역" (5)
+_PART_RE = re.compile(r"^\s*제\s*\d+\s*([편장절])")
+_PART_LEVEL = {"편": 1, "장": 2, "절": 3}
+_NUM_RE = re.compile(r"^\s*(?:([0-9]{1,2})|[가-하])\.\s+\S")
+# 번호 붙은 줄이 문장/조건절로 끝나면 제목이 아니라 호·목 (예: "1. 총장이 필요하다고 인정하는 경우")
+_CLAUSE_END_RE = re.compile(r"(?:다|음|함|임|것|경우|때|[.,;:])\s*$")
+_ARTICLE_RE = re.compile(r"^\s*제\s*\d+\s*조(\s*의\s*\d+)?\s*[\(（]")
+_BAD_CHARS_RE = re.compile(r"[�\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+
+# ----- 페이지 → 라인 -----
+def _text_width(t: str, size: float) -> float:
+    """run 폭 추정(pt): 전각(한글/한자/전각 기호) 1em, 그 밖 0.6em. pypdf visitor는 run 폭을 주지 않는다."""
+    wide = sum(1 for ch in t if unicodedata.east_asian_width(ch) in ("W", "F"))
+    return (wide + (len(t) - wide) * 0.6) * size
+
+
+def _page_lines(page) -> Tuple[List[Dict[str, Any]], float, float]:
+    """텍스트 run을 y 기준으로 라인 단위로 묶음. 반환: (lines, width, height)"""
+    box = page.mediabox
+    W, H = float(box.width), float(box.height)
+    runs: List[Tuple[float, float, float, str]] = []
+
+    def visit(text, cm, tm, font_dict, font_size):
+        if not text or not text.strip():
+            return
+        x = tm[4] * cm[0] + tm[5] * cm[2] + cm[4]
+        y = tm[4] * cm[1] + tm[5] * cm[3] + cm[5]
+        size = abs(float(font_size) * (tm[3] or 1.0) * (cm[3] or 1.0)) or 10.0
+        runs.append((float(x), float(y), size, text.replace("\n", " ")))
+
+    page.extract_text(visitor_text=visit)
+
+    lines: List[Dict[str, Any]] = []
+    for x, y, size, t in runs:
+        cur = lines[-1] if lines else None
+        if cur is not None and abs(cur["y"] - y) <= max(cur["size"], size) * 0.5:
+            cur["runs"].append((x, t, size))
+            cur["size"] = max(cur["size"], size)
+        else:
+            lines.append({"y": y, "size": size, "runs": [(x, t, size)]})
+
+    for ln in lines:
+        ln["runs"].sort(key=lambda r: r[0])
+        ln["x0"] = ln["runs"][0][0]
+        last_x, last_t, last_size = ln["runs"][-1]
+        ln["x1"] = min(W, last_x + _text_width(last_t, last_size))
+        ln["text"] = " ".join(t.strip() for _, t, _ in ln["runs"] if t.strip())
+        # run 사이 간격이 글자 2개 이상이면 열 구분으로 봄 → 표 후보
+        cells, buf, prev_end = [], [], None
+        for x, t, s in ln["runs"]:
+            if prev_end is not None and x - prev_end > 2 * s and buf:
+                cells.append(" ".join(buf))
+                buf = []
+            buf.append(t.strip())
+            prev_end = x + _text_width(t, s)
+        if buf:
+            cells.append(" ".join(buf))
+        ln["cells"] = [c for c in cells if c]
+    lines.sort(key=lambda ln: (-round(ln["y"], 0), ln["x0"]))
+    return lines, W, H
+
+
+def page_has_text_layer(text: str, min_chars: int = MIN_PAGE_CHARS) -> bool:
+    s = re.sub(r"\s+", "", text or "")
+    if len(s) < min_chars:
+        return False
+    return len(_BAD_CHARS_RE.findall(s)) / len(s) < 0.05
+
+
+# ----- 라인 → elements -----
+def _heading_level(text: str, size: float, body: float) -> int:
+    """
+    제목 레벨 (0 = 제목 아님). 번호 깊이가 있으면 그것(편 1 > 장 2 > 절 3 > "1." 4 > "가." 5),
+    없으면 본문 대비 글자 크기 (×1.8 이상 1, ×1.5 이상 2, ×1.2 이상 3).
+    """
+    if len(text) > 60:
+        return 0
+    big = size >= body * 1.2
+    m = _PART_RE.match(text)
+    if m:
+        return _PART_LEVEL[m.group(1)]
+    m = _NUM_RE.match(text)
+    if m and (big or (len(text) <= 30 and not _CLAUSE_END_RE.search(text))):
+        return 4 if m.group(1) else 5
+    if big:
+        return 1 if size >= body * 1.8 else 2 if size >= body * 1.5 else 3
+    return 0
+
+
+
+def _coords(x0: float, x1: float, y_top: float, y_bot: float, W: float, H: float) -> List[Dict[str, float]]:
+    # Upstage 좌표: 페이지 대비 0~1, 좌상단 원점, [좌상, 우상, 우하, 좌하]
+    def r(v: float) -> float:
+        return round(min(1.0, max(0.0, v)), 4)
+
+    top, bot = r(1 - y_top / H), r(1 - y_bot / H)
+    return [
+        {"x": r(x0 / W), "y": top},
+        {"x": r(x1 / W), "y": top},
+        {"x": r(x1 / W), "y": bot},
+        {"x": r(x0 / W), "y": bot},
+    ]
+
+
+def _el(category: str, lines: List[Dict[str, Any]], page_no: int, W: float, H: float, html_body: str, text: str) -> Dict[str, Any]:
+    size = max(ln["size"] for ln in lines)
+    return {
+        "category": category,
+        "content": {"html": html_body.replace("{style}", f"font-size:{int(round(size))}px"), "markdown": "", "text": text},
+        "coordinates": _coords(
+            min(ln["x0"] for ln in lines),
+            max(ln["x1"] for ln in lines),
+            max(ln["y"] for ln in lines) + size,
+            min(ln["y"] for ln in lines),
+            W,
+            H,
+        ),
+        "id": -1,            # 병합 시 재부여
+        "page": page_no,
+        "source": "text_layer",
+    }
+
+
+def page_elements(page, page_no: int) -> List[Dict[str, Any]]:
+    """한 페이지의 텍스트 레이어 → elements (heading1~5 / paragraph / table)."""
+    lines, W, H = _page_lines(page)
+    if not lines:
+        return []
+    weights = [ln["size"] for ln in lines for _ in range(max(1, len(ln["text"]) // 10))]
+    body = statistics.median(weights) if weights else 10.0
+
+    out: List[Dict[str, Any]] = []
+    para: List[Dict[str, Any]] = []
+    table: List[Dict[str, Any]] = []
+
+    def flush_para():
+        if para:
+            t = "\n".join(ln["text"] for ln in para)
+            h = "<br>".join(html.escape(ln["text"]) for ln in para)
+            out.append(_el("paragraph", para, page_no, W, H, f"<p id='0' data-category='paragraph' style='{{style}}'>{h}</p>", t))
+            para.clear()
+
+    def flush_table():
+        if len(table) >= 2:
+            rows = "".join(
+                "<tr>" + "".join(f"<td>{html.escape(c)}</td>" for c in ln["cells"]) + "</tr>" for ln in table
+            )
+            t = "\n".join(" | ".join(ln["cells"]) for ln in table)
+            out.append(_el("table", table, page_no, W, H, f"<table id='0' style='{{style}}'><tbody>{rows}</tbody></table>", t))
+        else:
+            para.extend(table)
+        table.clear()
+
+    prev = None
+    for ln in lines:
+        text = ln["text"]
+        level = _heading_level(text, ln["size"], body)
+        is_row = len(ln["cells"]) >= 3
+        gap = (prev["y"] - ln["y"]) if prev else 0.0
+
+        if is_row:
+            flush_para()
+            table.append(ln)
+        else:
+            flush_table()
+            if level:
+                flush_para()
+                tag = f"h{min(level, 6)}"
+                out.append(_el(f"heading{level}", [ln], page_no, W, H,
+                               f"<{tag} id='0' style='{{style}}'>{html.escape(text)}</{tag}>", text))
+            else:
+                # 새 조문(제N조(...)) 또는 큰 세로 간격이면 문단 분리
+                if para and (_ARTICLE_RE.match(text) or gap > ln["size"] * 1.8):
+                    flush_para()
+                para.append(ln)
+        prev = ln
+    flush_table()
+    flush_para()
+    return out
+
+
+# ----- 하이브리드 파싱 -----
+def split_pages(input_file: str | Path, min_chars: int = MIN_PAGE_CHARS) -> Tuple[Dict[int, List[Dict[str, Any]]], List[int]]:
+    """(로컬 처리된 페이지 → elements, 원격으로 보낼 이미지 페이지 번호 목록). 페이지 번호 1-base."""
+    from pypdf import PdfReader
+
+    reader = PdfReader(str(input_file))
+    local: Dict[int, List[Dict[str, Any]]] = {}
+    remote: List[int] = []
+    for i, page in enumerate(reader.pages, 1):
+        try:
+            ok = page_has_text_layer(page.extract_text() or "", min_chars)
+        except Exception:
+            ok = False
+        els = page_elements(page, i) if ok else []
+        if els:
+            local[i] = els
+        else:
+            remote.append(i)
+    return local, remote
+
+
+def _subset_pdf(input_file: str | Path, pages: List[int], out_path: Path) -> None:
+    from pypdf import PdfReader, PdfWriter
+
+    reader = PdfReader(str(input_file))
+    w = PdfWriter()
+    for p in pages:
+        w.add_page(reader.pages[p - 1])
+    with out_path.open("wb") as f:
+        w.write(f)
+
+
+def parse_with_text_layer(
+    input_file: str,
+    output_file: str,
+    *,
+    remote_parse=None,
+    min_chars: int = MIN_PAGE_CHARS,
+    blob_store: Any = "default",
+    verbose: bool = False,
+) -> Dict[str, Any]:
+    """
+    텍스트 레이어가 있는 페이지는 로컬 추출, 나머지 페이지만 remote_parse(sub_pdf, out_json) → dict 로 원격 파싱.
+    결과는 페이지 순서대로 합쳐 id/html id/content를 재구성(shard.merge_results)해 output_file로 저장.
+    """
+    from .blobs import offload_base64
+    from .shard import merge_results
+
+    t0 = time.perf_counter()
+    local, remote = split_pages(input_file, min_chars)
+    if verbose:
+        print(f"→ Text layer: local {len(local)}p, remote {len(remote)}p ({input_file})")
+
+    remote_resp: Dict[str, Any] = {}
+    by_page: Dict[int, List[Dict[str, Any]]] = dict(local)
+    if remote:
+        if remote_parse is None:
+            raise RuntimeError("image-only pages need a remote parser")
+        with tempfile.TemporaryDirectory(prefix="lm_textlayer_") as tmp:
+            sub = Path(tmp) / f"{Path(input_file).stem}.remote.pdf"
+            _subset_pdf(input_file, remote, sub)
+            remote_resp = dict(remote_parse(str(sub), str(Path(tmp) / "remote.json")))
+        for el in remote_resp.get("elements") or []:
+            p = el.get("page")
+            orig = remote[p - 1] if isinstance(p, int) and 0 < p <= len(remote) else (remote[0] if remote else 1)
+            by_page.setdefault(orig, []).append({**el, "page": orig})
+
+    elements = [el for p in sorted(by_page) for el in by_page[p]]
+    base = {k: v for k, v in remote_resp.items() if k not in ("elements", "content", "usage")}
+    base.setdefault("api", "2.0")
+    base.setdefault("model", "text-layer")
+    merged = merge_results([(1, {**base, "elements": elements, "usage": {"pages": len(local) + len(remote)}})])
+    merged["usage"]["local_pages"] = len(local)
+    merged["usage"]["remote_pages"] = len(remote)
+    merged, _ = offload_base64(merged, blob_store, inplace=True)   # remote_parse가 인라인으로 돌려준 경우
+
+    out_path = Path(output_file)
+    artifact.save(out_path, merged)
+    if verbose:
+        print(f"✓ Saved  {out_path}  ({len(elements)} elements, {(time.perf_counter() - t0)*1000:.0f} ms)")
+    return merged
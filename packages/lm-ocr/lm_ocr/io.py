@@ -1,6 +1,7 @@
 from __future__ import annotations
-import os, json
+import os
 from typing import Dict, Any
+from lm_docparse import artifact
 from .schema import OcrBundle
 
 def ensure_dir(path: str) -> None:
@@ -11,9 +12,7 @@ def save_bundle(bundle: OcrBundle, out_dir: str, basename: str) -> dict[str, str
     ocr_path = os.path.join(out_dir, f"{basename}.ocr.json")
     raw_path = os.path.join(out_dir, f"{basename}.raw.json")
 
-    with open(ocr_path, "w", encoding="utf-8") as f:
-        json.dump(bundle.result.model_dump(), f, ensure_ascii=False, indent=2)
-    with open(raw_path, "w", encoding="utf-8") as f:
-        json.dump(bundle.raw, f, ensure_ascii=False, indent=2)
+    artifact.save(ocr_path, bundle.result.model_dump(mode="json"))
+    artifact.save(raw_path, bundle.raw)
 
     return {"ocr": ocr_path, "raw": raw_path}
@@ -0,0 +1,79 @@
+# packages/lm-rag/lm_rag/embeddings_local.py
+from __future__ import annotations
+
+import os
+import zlib
+from typing import List, Tuple, Union
+
+import numpy as np
+
+# ===== 로컬(오프라인) 결정적 임베딩 =====
+# 문자 n-gram을 해싱해 고정 차원 벡터로 투영(feature hashing).
+# - 네트워크/키 불필요, 같은 입력 → 항상 같은 벡터 (테스트/벤치마크/폐쇄망용)
+# - 출력 형태는 Upstage 백엔드와 동일 (List[List[float]] 또는 (ndarray, index))
+LOCAL_DIM = int(os.getenv("RAG_LOCAL_EMB_DIM", "4096"))
+LOCAL_NGRAMS = (1, 2, 3)
+
+
+def _hash_features(s: str, dim: int, ngrams: Tuple[int, ...] = LOCAL_NGRAMS) -> Tuple[np.ndarray, np.ndarray]:
+    """텍스트 → (bucket 인덱스, ±1 부호) 배열. crc32 기반이라 프로세스/플랫폼 무관하게 결정적."""
+    s = " ".join(s.lower().split())
+    grams: List[bytes] = []
+    for n in ngrams:
+        if len(s) < n:
+            continue
+        grams.extend(s[i : i + n].encode("utf-8") for i in range(len(s) - n + 1))
+    if not grams:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+    h = np.fromiter((zlib.crc32(g) for g in grams), dtype=np.uint32, count=len(grams))
+    idx = (h % dim).astype(np.int64)
+    sign = np.where(h >> 31, -1.0, 1.0).astype(np.float32)
+    return idx, sign
+
+
+def encode_local(texts: List[str], dim: int | None = None) -> np.ndarray:
+    """정제된 텍스트 리스트 → (n, dim) float32, 행별 L2 정규화."""
+    dim = dim or LOCAL_DIM
+    out = np.zeros((len(texts), dim), dtype=np.float32)
+    for r, s in enumerate(texts):
+        idx, sign = _hash_features(s, dim)
+        if idx.size == 0:
+            continue
+        row = out[r]
+        np.add.at(row, idx, sign)
+        # 빈도 과대 반영 완화(sublinear tf)
+        np.copysign(np.log1p(np.abs(row)), row, out=row)
+        norm = float(np.linalg.norm(row))
+        if norm > 0:
+            row /= norm
+    return out
+
+
+def embed_texts_local(
+    texts: List[str],
+    batch_size: int = 128,
+    as_array: bool = False,
+    dim: int | None = None,
+) -> Union[List[List[float]], Tuple[np.ndarray, np.ndarray]]:
+    """
+    embed_texts()와 같은 계약의 로컬 버전.
+    - 입력 정제/스킵 규칙은 Upstage 백엔드와 동일(_sanitize_indexed)
+    - as_array=True: (emb, index)
+    """
+    from .embeddings_upstage import _sanitize_indexed
+
+    pairs = _sanitize_indexed(texts)
+    dim = dim or LOCAL_DIM
+    if not pairs:
+        if as_array:
+            return np.empty((0, 0), dtype=np.float32), np.empty((0,), dtype=np.int64)
+        return []
+
+    buf = np.empty((len(pairs), dim), dtype=np.float32)
+    for i in range(0, len(pairs), batch_size):
+        batch = pairs[i : i + batch_size]
+        buf[i : i + len(batch)] = encode_local([s for _, s in batch], dim=dim)
+
+    if as_array:
+        return buf, np.asarray([j for j, _ in pairs], dtype=np.int64)
+    return buf.tolist()
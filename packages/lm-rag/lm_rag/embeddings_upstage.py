@@ -1,14 +1,24 @@
 # packages/lm-rag/lm_rag/embeddings_upstage.py
 from __future__ import annotations
 
+import base64
+import functools
 import os
 import re
-from typing import List
+import tempfile
+from pathlib import Path
+from typing import Any, List, Tuple, Union
+
+import numpy as np
 from openai import OpenAI
 
+from lm_core_schema.vector import to_pgvector  # noqa: F401  (예전 import 경로 유지: lm_rag.embeddings_upstage.to_pgvector)
+
 # ===== Upstage Embedding 기본값 =====
 DEFAULT_BASE_URL = os.getenv("UPSTAGE_BASE_URL", "https://api.upstage.ai/v1")
 DEFAULT_MODEL = os.getenv("UPSTAGE_EMBEDDING_MODEL", "solar-embedding-1-large-passage")
+# 임베딩 백엔드: "upstage"(기본, 원격 API) | "local"(오프라인 결정적 해싱 인코더, embeddings_local.py)
+EMBED_BACKEND = os.getenv("LM_EMBED_BACKEND", "upstage").strip().lower()
 
 # ===== 입력 텍스트 클린업 =====
 # ASCII 제어문자 제거 (탭/개행 허용)
@@ -26,66 +36,141 @@ def _clean_one(s: str, max_chars: int = 3500) -> str:
 
 
 def _sanitize_texts(texts: List[str]) -> List[str]:
+    return [s for _, s in _sanitize_indexed(texts)]
+
+
+def _sanitize_indexed(texts: List[str]) -> List[Tuple[int, str]]:
+    """(원본 인덱스, 정제 텍스트) 쌍. 빈 문자열/비문자열은 제외."""
     cleaned = []
-    for t in texts or []:
+    for i, t in enumerate(texts or []):
         if isinstance(t, (str, int, float)):
             s = _clean_one(t)
             if s:
-                cleaned.append(s)
+                cleaned.append((i, s))
         # dict/list 등은 스킵
     return cleaned
 
 
+def _decode_embedding(e: Any) -> np.ndarray:
+    """encoding_format=base64 응답(str) / float 리스트 응답 모두 float32 벡터로."""
+    if isinstance(e, str):
+        return np.frombuffer(base64.b64decode(e), dtype="<f4")
+    return np.asarray(e, dtype=np.float32)
+
+
 def embed_texts(
     texts: List[str],
     api_key: str | None = None,
     base_url: str | None = None,
     model: str | None = None,
     batch_size: int = 128,
-) -> List[List[float]]:
+    as_array: bool = False,
+) -> Union[List[List[float]], Tuple[np.ndarray, np.ndarray]]:
     """
     Upstage(OpenAI SDK 호환) Embeddings 배치 호출.
     - 실패 배치 이분 탐색 분할(safe_call)로 문제 항목만 스킵.
+    - as_array=True: (emb, index) 반환
+        emb   : (m, dim) C-contiguous float32 ndarray (응답을 base64로 받아 바로 버퍼에 기록)
+        index : (m,) int64, emb[k]가 texts[index[k]]의 임베딩 (빈 텍스트/실패 항목은 빠짐)
+    - LM_EMBED_BACKEND=local 이면 네트워크 없이 로컬 인코더 사용(같은 반환 형태)
     """
+    if EMBED_BACKEND == "local":
+        from .embeddings_local import embed_texts_local
+
+        return embed_texts_local(texts, batch_size=batch_size, as_array=as_array)
+
     client = OpenAI(
         api_key=api_key or os.getenv("UPSTAGE_API_KEY"),
         base_url=base_url or DEFAULT_BASE_URL,
     )
     use_model = model or DEFAULT_MODEL
 
-    items = _sanitize_texts(texts)
-    if not items:
-        return []
+    pairs = _sanitize_indexed(texts)
+    if not as_array:
+        items = [s for _, s in pairs]
+        if not items:
+            return []
+
+        out: List[List[float]] = []
+
+        def call_batch(batch: List[str]) -> List[List[float]]:
+            resp = client.embeddings.create(model=use_model, input=batch)
+            return [d.embedding for d in resp.data]
+
+        def safe_call(batch: List[str]) -> List[List[float]]:
+            try:
+                return call_batch(batch)
+            except Exception:
+                if len(batch) == 1:
+                    print(f"[WARN] skip invalid text (len={len(batch[0])}): {batch[0][:80]!r}")
+                    return []
+                mid = len(batch) // 2
+                left = safe_call(batch[:mid])
+                right = safe_call(batch[mid:])
+                return left + right
+
+        for i in range(0, len(items), batch_size):
+            batch = items[i : i + batch_size]
+            out.extend(safe_call(batch))
+
+        return out
+
+    # ── ndarray 모드: 입력 순서대로 미리 잡은 버퍼에 행 단위로 기록
+    if not pairs:
+        return np.empty((0, 0), dtype=np.float32), np.empty((0,), dtype=np.int64)
 
-    out: List[List[float]] = []
+    buf: np.ndarray | None = None
+    filled = 0
+    kept: List[int] = []
 
-    def call_batch(batch: List[str]) -> List[List[float]]:
-        resp = client.embeddings.create(model=use_model, input=batch)
-        return [d.embedding for d in resp.data]
+    def write_rows(src_idx: List[int], vecs: List[Any]) -> None:
+        nonlocal buf, filled
+        for j, e in zip(src_idx, vecs):
+            v = _decode_embedding(e)
+            if buf is None:
+                buf = np.empty((len(pairs), v.shape[0]), dtype=np.float32)
+            n = min(v.shape[0], buf.shape[1])
+            buf[filled, :n] = v[:n]
+            if n < buf.shape[1]:
+                buf[filled, n:] = 0.0
+            kept.append(j)
+            filled += 1
 
-    def safe_call(batch: List[str]) -> List[List[float]]:
+    def safe_call_arr(batch: List[Tuple[int, str]]) -> None:
         try:
-            return call_batch(batch)
+            resp = client.embeddings.create(
+                model=use_model, input=[s for _, s in batch], encoding_format="base64"
+            )
         except Exception:
             if len(batch) == 1:
-                print(f"[WARN] skip invalid text (len={len(batch[0])}): {batch[0][:80]!r}")
-                return []
+                print(f"[WARN] skip invalid text (len={len(batch[0][1])}): {batch[0][1][:80]!r}")
+                return
             mid = len(batch) // 2
-            left = safe_call(batch[:mid])
-            right = safe_call(batch[mid:])
-            return left + right
+            safe_call_arr(batch[:mid])
+            safe_call_arr(batch[mid:])
+            return
+        write_rows([j for j, _ in batch], [d.embedding for d in resp.data])
 
-    for i in range(0, len(items), batch_size):
-        batch = items[i : i + batch_size]
-        out.extend(safe_call(batch))
+    for i in range(0, len(pairs), batch_size):
+        safe_call_arr(pairs[i : i + batch_size])
 
-    return out
+    if buf is None:
+        return np.empty((0, 0), dtype=np.float32), np.empty((0,), dtype=np.int64)
+    # 스킵된 행이 있으면 앞쪽만 잘라 쓴다(슬라이스 → 여전히 C-contiguous)
+    return buf[:filled], np.asarray(kept, dtype=np.int64)
 
 
 # ===============================
 # 4096 → 2000 축소 (JL Random Projection)
 # ===============================
-import numpy as np
+
+# 투영행렬 디스크 캐시 위치 (dims/seed 별 .npy 1개씩)
+PROJ_CACHE_DIR = Path(
+    os.getenv("RAG_PROJ_CACHE_DIR") or Path.home() / ".cache" / "ledgermate" / "projection"
+).expanduser()
+
+# 한 번에 투영할 행 수 (피크 메모리 = chunk × dim_in × 4B)
+REDUCE_CHUNK_ROWS = int(os.getenv("RAG_REDUCE_CHUNK_ROWS", "1024"))
 
 
 def _make_projection_matrix(dim_in: int, dim_out: int, seed: int = 20251004) -> np.ndarray:
@@ -99,47 +184,97 @@ def _make_projection_matrix(dim_in: int, dim_out: int, seed: int = 20251004) ->
     return P
 
 
+@functools.lru_cache(maxsize=8)
+def _load_projection_matrix(dim_in: int, dim_out: int, seed: int = 20251004) -> np.ndarray:
+    """
+    (dim_in, dim_out, seed)별 투영행렬을 1회만 생성해 .npy로 캐시하고 memory-map으로 연다.
+    - 프로세스 내: lru_cache로 재사용
+    - 프로세스 간: 같은 .npy를 mmap → 페이지 캐시 공유, RNG 재생성 없음
+    - 캐시 디렉터리에 쓸 수 없으면 메모리에서 생성한 행렬을 그대로 사용
+    """
+    path = PROJ_CACHE_DIR / f"jl_{dim_in}x{dim_out}_s{seed}.npy"
+    if not path.exists():
+        P = _make_projection_matrix(dim_in, dim_out, seed=seed)
+        tmp_path: Path | None = None
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # 동시 실행 대비: 임시파일에 쓰고 원자적 rename (실패하면 임시파일 정리)
+            try:
+                with tempfile.NamedTemporaryFile(dir=path.parent, suffix=".npy.tmp", delete=False) as tmp:
+                    tmp_path = Path(tmp.name)
+                    np.save(tmp, P)
+                os.replace(tmp_path, path)
+                tmp_path = None
+            finally:
+                if tmp_path is not None:
+                    tmp_path.unlink(missing_ok=True)
+        except OSError:
+            return P
+    return np.load(path, mmap_mode="r")
+
+
 def reduce_embeddings(
-    embs: List[List[float]],
+    embs: np.ndarray | List[List[float]],
     dim_out: int = 2000,
     assume_dim_in: int | None = None,
     seed: int = 20251004,
     l2_normalize: bool = True,
-) -> List[List[float]]:
+    chunk_rows: int | None = None,
+) -> np.ndarray:
     """
     4096차원 임베딩을 2000차원으로 축소(또는 패딩).
-    - dim_in > dim_out: 랜덤 투영
+    - dim_in > dim_out: 랜덤 투영 (캐시된 mmap 행렬, chunk_rows 단위로 나눠 곱함)
     - dim_in < dim_out: zero-pad
     - dim_in = dim_out: 그대로 통과
+    반환: (n, dim_out) float32 ndarray
     """
-    if not embs:
-        return []
+    if embs is None or len(embs) == 0:
+        return np.empty((0, dim_out), dtype=np.float32)
 
-    dim_in = assume_dim_in or len(embs[0])
+    if isinstance(embs, np.ndarray):
+        arr = embs if embs.dtype == np.float32 else embs.astype(np.float32)
+        dim_in = assume_dim_in or arr.shape[-1]
+    else:
+        dim_in = assume_dim_in or len(embs[0])
+        try:
+            arr = np.asarray(embs, dtype=np.float32)
+        except ValueError:
+            arr = None  # ragged 리스트
+        if arr is None or arr.ndim != 2 or arr.shape[1] != dim_in:
+            # ragged 방어: 잘린/패딩으로 맞춤
+            fixed = np.zeros((len(embs), dim_in), dtype=np.float32)
+            for i, v in enumerate(embs):
+                n = min(len(v), dim_in)
+                fixed[i, :n] = v[:n]
+            arr = fixed
 
-    arr = np.asarray(embs, dtype=np.float32)
     if arr.ndim != 2:
         raise ValueError("embs must be a 2D list/array")
-
     if arr.shape[1] != dim_in:
-        # ragged 방어: 잘린/패딩으로 맞춤
         fixed = np.zeros((arr.shape[0], dim_in), dtype=np.float32)
-        for i, v in enumerate(embs):
-            n = min(len(v), dim_in)
-            fixed[i, :n] = v[:n]
+        n = min(arr.shape[1], dim_in)
+        fixed[:, :n] = arr[:, :n]
         arr = fixed
 
+    n_rows = arr.shape[0]
+    step = max(1, chunk_rows or REDUCE_CHUNK_ROWS)
+
     if dim_in > dim_out:
-        P = _make_projection_matrix(dim_in, dim_out, seed=seed)
-        reduced = arr @ P
+        P = _load_projection_matrix(dim_in, dim_out, seed=seed)
+        reduced = np.empty((n_rows, dim_out), dtype=np.float32)
+        for i in range(0, n_rows, step):
+            np.matmul(arr[i : i + step], P, out=reduced[i : i + step])
     elif dim_in < dim_out:
-        reduced = np.zeros((arr.shape[0], dim_out), dtype=np.float32)
+        reduced = np.zeros((n_rows, dim_out), dtype=np.float32)
         reduced[:, :dim_in] = arr
     else:
-        reduced = arr
+        reduced = np.array(arr, dtype=np.float32, copy=True)
 
     if l2_normalize:
-        norms = np.linalg.norm(reduced, axis=1, keepdims=True) + 1e-12
-        reduced = reduced / norms
+        for i in range(0, n_rows, step):
+            block = reduced[i : i + step]
+            norms = np.linalg.norm(block, axis=1, keepdims=True)
+            norms += 1e-12
+            block /= norms
 
-    return reduced.tolist()
+    return reduced
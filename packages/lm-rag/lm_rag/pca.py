@@ -0,0 +1,302 @@
+# packages/lm-rag/lm_rag/pca.py
+from __future__ import annotations
+
+import io
+import json
+import os
+import re
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+# ===== 학습형 차원 축소 (PCA) =====
+# - 조직(org)/모델별로 저장된 4096 벡터에서 학습 → 버전 붙은 .npz 아티팩트로 저장
+# - 적재/질의 양쪽에서 같은 아티팩트를 적용해야 함 (reducer_tag로 구분)
+# - JL(reduce_embeddings)보다 작은 차원(256~768)에서도 재현율 유지가 목적
+REDUCER_DIR = Path(
+    os.getenv("RAG_REDUCER_DIR") or Path.home() / ".cache" / "ledgermate" / "reducers"
+).expanduser()
+
+# RAG_REDUCER=pca 일 때만 적재/검색에 사용 (기본: 사용 안 함 → 기존 JL 2000 경로)
+REDUCER_KIND = os.getenv("RAG_REDUCER", "").strip().lower()
+REDUCED_DIM = int(os.getenv("RAG_REDUCED_DIM", "512"))  # embedding_r 컬럼 차원과 일치해야 함
+
+# ===== 활성 버전 고정 =====
+# 새 버전을 fit해도 적재/검색은 바로 바뀌지 않는다: 저장된 행의 embedding_r은 이전 태그라
+# 검색 필터(reducer_tag = 현재 태그)에서 통째로 빠지기 때문. 쓸 버전은 rag_reducer_active에 고정하고,
+# 전환은 bin/fit_reducer.py --activate (기존 행을 embedding(4096)에서 재투영한 뒤 같은 트랜잭션에서 고정 변경).
+# DB 고정이 없으면 RAG_REDUCER_VERSION, 그것도 없으면 축소본을 쓰지 않는다 (기존 JL 2000 경로).
+PINNED_VERSION = int(os.getenv("RAG_REDUCER_VERSION") or 0) or None
+
+PIN_DDL = """
+CREATE TABLE IF NOT EXISTS rag_reducer_active (
+  org_key     TEXT NOT NULL,                  -- org_id 또는 '_all'(공용 아티팩트)
+  model       TEXT NOT NULL,
+  dim         INT  NOT NULL,
+  version     INT  NOT NULL,
+  tag         TEXT NOT NULL,
+  updated_at  TIMESTAMPTZ NOT NULL DEFAULT now(),
+  PRIMARY KEY (org_key, model, dim)
+);
+"""
+
+_SLUG_RE = re.compile(r"[^0-9A-Za-z._-]+")
+
+
+def _slug(s: str | None) -> str:
+    return _SLUG_RE.sub("-", s or "_all").strip("-") or "_all"
+
+
+@dataclass
+class PcaReducer:
+    org_id: str | None
+    model: str | None
+    dim_in: int
+    dim_out: int
+    version: int
+    mean: np.ndarray          # (dim_in,) float32
+    components: np.ndarray    # (dim_in, dim_out) float32
+    explained: np.ndarray     # (dim_out,) 설명 분산 비율
+    n_fit: int = 0
+
+    @property
+    def tag(self) -> str:
+        """DB reducer_tag 값. 아티팩트 파일명과 동일한 규칙."""
+        return f"pca_{_slug(self.org_id)}_{_slug(self.model)}_{self.dim_out}_v{self.version}"
+
+    def transform(self, embs: np.ndarray, l2_normalize: bool = True, chunk_rows: int = 1024) -> np.ndarray:
+        """(n, dim_in) → (n, dim_out) float32. reduce_embeddings와 같은 chunk 단위 처리."""
+        arr = np.asarray(embs, dtype=np.float32)
+        if arr.ndim == 1:
+            arr = arr[None, :]
+        if arr.shape[1] != self.dim_in:
+            fixed = np.zeros((arr.shape[0], self.dim_in), dtype=np.float32)
+            n = min(arr.shape[1], self.dim_in)
+            fixed[:, :n] = arr[:, :n]
+            arr = fixed
+
+        out = np.empty((arr.shape[0], self.dim_out), dtype=np.float32)
+        step = max(1, chunk_rows)
+        for i in range(0, arr.shape[0], step):
+            np.matmul(arr[i : i + step] - self.mean, self.components, out=out[i : i + step])
+            if l2_normalize:
+                block = out[i : i + step]
+                block /= np.linalg.norm(block, axis=1, keepdims=True) + 1e-12
+        return out
+
+    # ----- 직렬화 -----
+    def to_bytes(self) -> bytes:
+        meta = {
+            "kind": "pca",
+            "org_id": self.org_id,
+            "model": self.model,
+            "dim_in": self.dim_in,
+            "dim_out": self.dim_out,
+            "version": self.version,
+            "n_fit": self.n_fit,
+        }
+        bio = io.BytesIO()
+        np.savez(
+            bio,
+            meta=np.frombuffer(json.dumps(meta).encode("utf-8"), dtype=np.uint8),
+            mean=self.mean,
+            components=self.components,
+            explained=self.explained,
+        )
+        return bio.getvalue()
+
+    def save(self, out_dir: Path | None = None) -> Path:
+        out_dir = Path(out_dir or REDUCER_DIR)
+        out_dir.mkdir(parents=True, exist_ok=True)
+        path = out_dir / f"{self.tag}.npz"
+        with tempfile.NamedTemporaryFile(dir=out_dir, suffix=".npz.tmp", delete=False) as tmp:
+            tmp.write(self.to_bytes())
+        os.replace(tmp.name, path)
+        return path
+
+    @classmethod
+    def load(cls, path: Path | str) -> "PcaReducer":
+        with np.load(path) as z:
+            meta = json.loads(z["meta"].tobytes().decode("utf-8"))
+            return cls(
+                org_id=meta.get("org_id"),
+                model=meta.get("model"),
+                dim_in=int(meta["dim_in"]),
+                dim_out=int(meta["dim_out"]),
+                version=int(meta["version"]),
+                mean=z["mean"].astype(np.float32),
+                components=np.ascontiguousarray(z["components"], dtype=np.float32),
+                explained=z["explained"],
+                n_fit=int(meta.get("n_fit", 0)),
+            )
+
+
+def artifact_path(org_id: str | None, model: str | None, dim_out: int, version: int, base: Path | None = None) -> Path:
+    """(org, model, dim, version) 아티팩트 파일 경로 (PcaReducer.save와 같은 이름 규칙)."""
+    return Path(base or REDUCER_DIR) / f"pca_{_slug(org_id)}_{_slug(model)}_{dim_out}_v{version}.npz"
+
+
+def _versions(org_id: str | None, model: str | None, dim_out: int, base: Path) -> List[int]:
+    prefix = f"pca_{_slug(org_id)}_{_slug(model)}_{dim_out}_v"
+    found = []
+    for p in base.glob(prefix + "*.npz"):
+        v = p.stem[len(prefix):]
+        if v.isdigit():
+            found.append(int(v))
+    return sorted(found)
+
+
+def fit_pca(
+    embs: np.ndarray,
+    dim_out: int,
+    org_id: str | None = None,
+    model: str | None = None,
+    chunk_rows: int = 4096,
+    out_dir: Path | None = None,
+    version: int | None = None,
+) -> PcaReducer:
+    """
+    공분산(dim_in × dim_in)을 chunk 단위로 누적 → 고유분해로 상위 dim_out 성분.
+    - 메모리: 행 수와 무관하게 dim_in² × 8B (4096 → 약 128MB)
+    - 성분 부호는 절댓값 최대 원소가 양수가 되도록 고정 (재학습해도 결정적)
+    - version 미지정 시 같은 (org, model, dim) 아티팩트 중 최대값 + 1
+    """
+    arr = np.asarray(embs, dtype=np.float32)
+    if arr.ndim != 2 or arr.shape[0] < 2:
+        raise ValueError("fit_pca: need a 2D array with at least 2 rows")
+    n, dim_in = arr.shape
+    if not 0 < dim_out <= dim_in:
+        raise ValueError(f"fit_pca: dim_out must be in (0, {dim_in}]")
+
+    mean = arr.mean(axis=0, dtype=np.float64)
+    cov = np.zeros((dim_in, dim_in), dtype=np.float64)
+    for i in range(0, n, chunk_rows):
+        block = arr[i : i + chunk_rows].astype(np.float64) - mean
+        cov += block.T @ block
+    cov /= max(1, n - 1)
+
+    w, v = np.linalg.eigh(cov)            # 오름차순
+    order = np.argsort(w)[::-1][:dim_out]
+    w, v = w[order], v[:, order]
+    flip = np.sign(v[np.abs(v).argmax(axis=0), np.arange(v.shape[1])])
+    flip[flip == 0] = 1.0
+    v *= flip
+
+    total = float(max(np.trace(cov), 1e-12))   # 전체 분산 = 고유값 합
+    if version is None:
+        base = Path(out_dir or REDUCER_DIR)
+        prev = _versions(org_id, model, dim_out, base) if base.exists() else []
+        version = (prev[-1] + 1) if prev else 1
+    return PcaReducer(
+        org_id=org_id,
+        model=model,
+        dim_in=dim_in,
+        dim_out=dim_out,
+        version=version,
+        mean=mean.astype(np.float32),
+        components=np.ascontiguousarray(v, dtype=np.float32),
+        explained=(np.clip(w, 0, None) / total).astype(np.float32),
+        n_fit=n,
+    )
+
+
+# 로드한 아티팩트 캐시: (경로, mtime) 키 → 새 버전 fit/같은 경로 덮어쓰기는 다음 호출에 바로 반영.
+# 어떤 버전을 쓸지는 매번 디렉터리에서 다시 고른다 (None = 아티팩트 없음은 캐시하지 않음)
+_LOADED: Dict[Tuple[str, int], PcaReducer] = {}
+_LOADED_MAX = 16
+
+
+def _load_cached(path: Path) -> PcaReducer:
+    key = (str(path), path.stat().st_mtime_ns)
+    r = _LOADED.get(key)
+    if r is None:
+        if len(_LOADED) >= _LOADED_MAX:
+            _LOADED.clear()
+        r = _LOADED[key] = PcaReducer.load(path)
+    return r
+
+
+def load_reducer(
+    org_id: str | None = None,
+    model: str | None = None,
+    dim_out: int | None = None,
+    version: int | None = None,
+) -> PcaReducer | None:
+    """
+    (org, model, dim) 아티팩트 중 지정 버전(없으면 최신) 로드.
+    org 전용 아티팩트가 없으면 전체 공용(_all)으로 폴백. 없으면 None.
+    """
+    dim_out = dim_out or REDUCED_DIM
+    if not REDUCER_DIR.exists():
+        return None
+    for org in ((org_id, None) if org_id else (None,)):
+        vs = _versions(org, model, dim_out, REDUCER_DIR)
+        if not vs:
+            continue
+        v = version if version in vs else (None if version else vs[-1])
+        if v is None:
+            continue
+        return _load_cached(artifact_path(org, model, dim_out, v))
+    return None
+
+
+def _row(r: Any) -> Tuple[Any, ...]:
+    # psycopg2(튜플) / psycopg3 dict_row 모두
+    return tuple(r.values()) if isinstance(r, dict) else tuple(r)
+
+
+def pinned_reducer(conn, org_id: str | None, model: str | None, dim: int) -> Optional[Tuple[str | None, int]]:
+    """rag_reducer_active의 (아티팩트 org, version). org 고정이 없으면 공용(_all). 표/고정이 없으면 None."""
+    with conn.cursor() as cur:
+        cur.execute("SELECT to_regclass('public.rag_reducer_active')")
+        if _row(cur.fetchone())[0] is None:
+            return None
+        keys = [org_id, "_all"] if org_id else ["_all"]
+        cur.execute(
+            "SELECT org_key, version FROM rag_reducer_active WHERE org_key = ANY(%s) AND model=%s AND dim=%s",
+            (keys, model or "", int(dim)),
+        )
+        pins = dict(_row(r) for r in cur.fetchall())
+    for k in keys:
+        if k in pins:
+            return (None if k == "_all" else k), int(pins[k])
+    return None
+
+
+def set_active_reducer(conn, reducer: PcaReducer) -> None:
+    """고정 버전 UPSERT (커밋은 호출자가 — 재투영과 같은 트랜잭션에서)."""
+    with conn.cursor() as cur:
+        cur.execute(PIN_DDL)
+        cur.execute(
+            """
+            INSERT INTO rag_reducer_active (org_key, model, dim, version, tag)
+            VALUES (%s,%s,%s,%s,%s)
+            ON CONFLICT (org_key, model, dim) DO UPDATE
+               SET version=EXCLUDED.version, tag=EXCLUDED.tag, updated_at=now()
+            """,
+            (reducer.org_id or "_all", reducer.model or "", reducer.dim_out, reducer.version, reducer.tag),
+        )
+
+
+def active_reducer(org_id: str | None = None, model: str | None = None, conn=None) -> PcaReducer | None:
+    """
+    RAG_REDUCER=pca 일 때 고정된 버전의 아티팩트 (conn이 있으면 rag_reducer_active, 없으면 RAG_REDUCER_VERSION).
+    고정이 없거나 아티팩트가 없으면 None → 적재/검색 코드는 기존 경로 유지. 최신 버전을 자동으로 고르지 않는다.
+    """
+    if REDUCER_KIND != "pca":
+        return None
+    if model is None:
+        from .embeddings_upstage import DEFAULT_MODEL
+
+        model = DEFAULT_MODEL
+    pin = pinned_reducer(conn, org_id, model, REDUCED_DIM) if conn is not None else None
+    if pin is not None:
+        org, version = pin
+        path = artifact_path(org, model, REDUCED_DIM, version)
+        return _load_cached(path) if path.exists() else None
+    if PINNED_VERSION:
+        return load_reducer(org_id, model, REDUCED_DIM, version=PINNED_VERSION)
+    return None
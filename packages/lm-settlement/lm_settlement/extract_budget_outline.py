@@ -1,6 +1,9 @@
 from __future__ import annotations
 import os, re, json, sys
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, List, Optional, Tuple
+
+from lm_docparse import artifact
+from lm_docparse.grid import TableGrid
 
 def _strip(s: Any) -> str:
     return re.sub(r"\s+", " ", str(s)).strip()
@@ -39,9 +42,11 @@ def extract_outline_from_budget_json(sections: List[Dict[str, Any]]) -> List[Dic
             rows = tbl.get("rows") or []
             if not rows or len(rows) < 2:
                 continue
+            # rowspan/colspan을 펼친 격자로 읽어야 병합 셀 아래 행(예: 512 인쇄비)도 앞 열이 채워짐
+            grid = TableGrid.from_table(tbl, header_rows=1)
             # 헤더 다음부터 데이터
-            for r in rows[1:]:
-                if not isinstance(r, list) or len(r) < 4:
+            for r in grid.rows(body=True):
+                if len(r) < 4:
                     continue
                 # 표 형식 가정:
                 # [세부코드, 세부이름, 비목코드, 비목이름, ...]
@@ -122,8 +127,7 @@ def main():
     org_id  = sys.argv[2]
     out_dir = sys.argv[3] if len(sys.argv) >= 4 else os.path.join("data", org_id)
 
-    with open(in_path, "r", encoding="utf-8") as f:
-        sections = json.load(f)
+    sections = artifact.load(in_path)
 
     outline = extract_outline_from_budget_json(sections)
     os.makedirs(out_dir, exist_ok=True)
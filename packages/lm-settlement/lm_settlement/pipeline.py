@@ -1,8 +1,10 @@
 # packages/lm-settlement/lm_settlement/pipeline.py
 from __future__ import annotations
-import os, json,re
-from typing import Dict, Any
+import os, re
+from typing import Dict, Any, Mapping
 from openai import OpenAI
+from lm_core_schema import serde
+from lm_core_schema.models import Receipt, SettlementRow, to_plain
 from lm_rag.retriever import RAG
 from .prompts import SYSTEM, USER_TMPL
 from .extract_budget_outline import load_budget_outline, outline_text, find_code_by_path
@@ -27,7 +29,7 @@ def build_profile_mapping(profile: Dict[str,Any]) -> Dict[str,Any]:
         }
     }
 
-def settle(receipt: Dict[str, Any],
+def settle(receipt: Mapping[str, Any],
            profile: Dict[str, Any],
            org_id: str, fiscal_period: str,
            api_key: str | None = None) -> Dict[str, Any]:
@@ -43,14 +45,9 @@ def settle(receipt: Dict[str, Any],
     )
 
     # ── RAG: 영수증 전체 텍스트 기반 질의
+    receipt = Receipt.coerce(receipt)
     rag = RAG(org_id=org_id)
-    query_parts = [
-        receipt.get("merchant","") or "",
-        receipt.get("memo","") or "",
-        " ".join(i.get("name","") for i in receipt.get("items",[]) if i.get("name")) or "",
-        receipt.get("raw_text","") or ""
-    ]
-    query = " ".join(p for p in query_parts if p).strip() or "일반 지출"
+    query = receipt.search_text()
 
     policies = rag.search_rules(query_text=query)[:3]
     budgets  = rag.search_budget_lines(query_text=query)[:3]
@@ -62,10 +59,10 @@ def settle(receipt: Dict[str, Any],
         fiscal_period=fiscal_period,
         extra_guidance=extra_guidance,
         budget_outline_text=budget_outline_txt,
-        receipt=json.dumps(receipt, ensure_ascii=False, indent=2),
-        policies=json.dumps(policies, ensure_ascii=False, indent=2),
-        budgets=json.dumps(budgets, ensure_ascii=False, indent=2),
-        profile_mapping=json.dumps(build_profile_mapping(profile), ensure_ascii=False, indent=2),
+        receipt=serde.dumps_str(receipt, indent=True),
+        policies=serde.dumps_str(policies, indent=True),
+        budgets=serde.dumps_str(budgets, indent=True),
+        profile_mapping=serde.dumps_str(build_profile_mapping(profile), indent=True),
     )
     resp = client.chat.completions.create(
         model=os.getenv("UPSTAGE_LLM_MODEL","solar-pro2"),
@@ -75,7 +72,7 @@ def settle(receipt: Dict[str, Any],
         reasoning_effort="high",
         response_format={"type":"json_object"},
     )
-    data = json.loads(resp.choices[0].message.content)
+    data = serde.loads(resp.choices[0].message.content)
 
     # ── 안전 보정
     data.setdefault("receipt", receipt)
@@ -87,12 +84,14 @@ def settle(receipt: Dict[str, Any],
                 if c and re.match(r'^\d{3}(?:-\d{3}(?:-\d{3})?)?$', c):
                     sr["account_code"] = c
                     break
-        sr.setdefault("date", receipt.get("date"))
-        sr.setdefault("amount", receipt.get("amount_total"))
-        sr.setdefault("vat", receipt.get("vat"))
-        sr.setdefault("payment_method", receipt.get("payment_method"))
+        sr.setdefault("date", receipt.date)
+        sr.setdefault("amount", receipt.amount_total)
+        sr.setdefault("vat", receipt.vat)
+        sr.setdefault("payment_method", receipt.payment_method)
         if (not sr.get("account_code")) and sr.get("account_name"):
             code = find_code_by_path(outline, sr["account_name"])
             if code:
                 sr["account_code"] = code
-    return data
+        data["settlement_row"] = SettlementRow.coerce(sr)
+    # 공개 반환값은 순수 dict (호출자가 표준 json.dumps로 바로 직렬화)
+    return to_plain(data)
@@ -1,7 +1,10 @@
 # packages/lm-settlement/lm_settlement/run_settlement.py
 from __future__ import annotations
-import os, json, glob, pathlib, re
+import os, glob, pathlib, re
 from typing import Dict, Any, List, Tuple
+from lm_core_schema import serde
+from lm_core_schema.models import Receipt
+from lm_docparse import artifact
 from lm_settlement.pipeline import settle
 
 BILLS_DIR = "out/bills"
@@ -62,8 +65,7 @@ def _to_number(v):
     return None
 
 def _load_json(path: str) -> Dict[str, Any]:
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
+    return artifact.load(path)   # OCR 번들: 압축/평문 모두
 
 def _pick_bill_pair() -> List[Tuple[str, str | None]]:
     paths = glob.glob(os.path.join(BILLS_DIR, "*.ocr.json")) + \
@@ -144,7 +146,7 @@ def _parse_items(text: str) -> List[Dict[str, Any]]:
     if not items:
         items = _parse_items_two_line(text)
     return items
-def _normalize_receipt(doc: Dict[str, Any]) -> Dict[str, Any]:
+def _normalize_receipt(doc: Dict[str, Any]) -> Receipt:
     raw = _extract_text(doc)
 
     def pick(d: Dict[str, Any], *keys, default=None):
@@ -169,19 +171,19 @@ def _normalize_receipt(doc: Dict[str, Any]) -> Dict[str, Any]:
     merchant_guess = pick(doc, "merchant", "store", "vendor", "상호명", default="") or _guess_merchant(raw)
     payment_guess  = pick(doc, "payment_method", "method", "card_type", default=None) or _guess_payment(raw)
 
-    receipt = {
-        "merchant": merchant_guess,             # ← 추정값 사용
-        "date":     date,
-        "amount_total": amount_total,
-        "vat":      vat,
-        "payment_method": payment_guess,        # ← 추정값 사용
-        "memo":     pick(doc, "memo", "note", "비고", default=""),
-        "items":    items,
-        "raw_text": pick(doc, "raw_text", "full_text", default=raw)  # 원문 보존
-    }
-    if receipt["amount_total"] is None and items:
+    receipt = Receipt(
+        merchant=merchant_guess,                # ← 추정값 사용
+        date=date,
+        amount_total=amount_total,
+        vat=vat,
+        payment_method=payment_guess,           # ← 추정값 사용
+        memo=pick(doc, "memo", "note", "비고", default=""),
+        items=items,
+        raw_text=pick(doc, "raw_text", "full_text", default=raw)  # 원문 보존
+    )
+    if receipt.amount_total is None and items:
         s = sum(_to_number(it.get("total")) or 0 for it in items)
-        receipt["amount_total"] = s if s > 0 else None
+        receipt.amount_total = s if s > 0 else None
     return receipt
 
 def main():
@@ -206,7 +208,7 @@ def main():
         result = settle(receipt, profile, org_id=ORG_ID, fiscal_period=FISCAL_PERIOD)
         out_path = os.path.join(OUT_DIR, f"{base}.settle.json")
         with open(out_path, "w", encoding="utf-8") as f:
-            json.dump(result, f, ensure_ascii=False, indent=2)
+            f.write(serde.dumps_str(result, indent=True))
         print(f"✅ {base}: {out_path}")
 
 if __name__ == "__main__":
@@ -1,13 +1,23 @@
 from __future__ import annotations
 import os, datetime
+from typing import Any
 from pymongo import MongoClient
 
 def get_mongo():
     cli = MongoClient(os.getenv("MONGO_URI"))
     return cli[os.getenv("MONGO_DB", "ledgermate")]
 
-def save_raw_policy(org_id: str, version: str, source_name: str, raw_json: dict) -> str:
+def save_raw_policy(org_id: str, version: str, source_name: str, raw_json: dict, blob_store: Any = None) -> str:
+    """
+    document_raw에 원 응답 저장. 기본은 base64 이미지까지 인라인 그대로 (문서만으로 복원 가능).
+    blob_store를 주면 이미지를 그 저장소로 떼고 참조만 저장 — 여러 호스트가 읽는 저장소여야 함
+    (예: lm_docparse.blobs.ArtifactBlobStore(conn, org_id); 호스트 로컬 LocalBlobStore는 부적합)
+    """
     db = get_mongo()
+    if blob_store is not None:
+        from lm_docparse.blobs import offload_base64
+
+        raw_json, _ = offload_base64(raw_json, blob_store)
     doc = {
         "type": "policy_parse",
         "org_id": org_id,
@@ -2,15 +2,19 @@
 from __future__ import annotations
 
 import hashlib
-import json
 import mimetypes
 import os
 import pathlib
-from typing import Iterable, Dict, Any, Optional, Mapping
+import re
+import shutil
+from typing import Callable, Iterable, Dict, Any, Optional, Mapping, Sequence
 
 import psycopg
 from psycopg.rows import dict_row
 from dotenv import load_dotenv
+from lm_core_schema import serde
+from lm_core_schema.models import Chunk
+from lm_core_schema.vector import to_pgvector
 
 load_dotenv()
 
@@ -25,6 +29,9 @@ else:
 
 STORAGE_DIR = pathlib.Path(os.getenv("STORAGE_DIR", "storage")).resolve()
 
+# 동적 컬럼명(임베딩 컬럼 등)은 SQL에 직접 들어가므로 화이트리스트 검사
+_IDENT_RE = re.compile(r"^[a-z_][a-z0-9_]{0,62}$")
+
 
 # --- Low-level helpers ---
 def _sha256_bytes(b: bytes) -> str:
@@ -39,9 +46,21 @@ def sha256_bytes(b: bytes) -> str:
 
 
 def sha256_json(obj: Any) -> str:
-    # Upstage 파서 RAW JSON도 중복 체크 가능
-    b = json.dumps(obj, ensure_ascii=False, sort_keys=True).encode("utf-8")
-    return _sha256_bytes(b)
+    # Upstage 파서 RAW JSON도 중복 체크 가능 (정규 바이트는 예전 json.dumps(sort_keys=True)와 동일 → 기존 해시 유지)
+    return _sha256_bytes(serde.canonical_bytes(obj))
+
+
+def chunk_content_sha(text: Optional[str], path: Optional[str]) -> str:
+    """
+    청크 내용 해시 = sha256(공백 정규화 text + \x1f + path).
+    같은 조항이 새 버전에서도 그대로면 같은 값 → 임베딩/행 재사용 (bin/ingest_policies.py)
+    """
+    norm = " ".join((text or "").split())
+    return _sha256_bytes(f"{norm}\x1f{path or ''}".encode("utf-8"))
+
+
+# pgvector 텍스트 리터럴 (구현은 lm_core_schema.vector 하나, 예전 이름 유지)
+vector_literal = to_pgvector
 
 
 def connect() -> psycopg.Connection:
@@ -79,11 +98,46 @@ def register_artifact(
     파일을 로컬 디스크에 저장하고 artifact 레코드 생성/재사용.
     동일 (org_id, sha256, kind)면 기존 레코드 재사용.
     """
-    STORAGE_DIR.mkdir(parents=True, exist_ok=True)
-    sha = _sha256_bytes(content)
     mime = mime or (mimetypes.guess_type(filename)[0] or "application/octet-stream")
-    size = len(content)
+    return _register(conn, org_id, kind, filename, mime, _sha256_bytes(content), len(content),
+                     lambda dst: dst.write_bytes(content))
+
+
+def register_artifact_file(
+    conn: psycopg.Connection,
+    *,
+    org_id: str,
+    kind: str,
+    path: str | pathlib.Path,
+    filename: Optional[str] = None,
+    mime: Optional[str] = None,
+) -> str:
+    """
+    register_artifact의 파일 버전: 해시는 블록 단위로 읽어 계산하고 저장은 파일 복사
+    → 큰 산출물(파싱 JSON 등)을 메모리에 통째로 올리지 않는다.
+    """
+    src = pathlib.Path(path)
+    filename = filename or src.name
+    h = hashlib.sha256()
+    with src.open("rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    mime = mime or (mimetypes.guess_type(filename)[0] or "application/octet-stream")
+    return _register(conn, org_id, kind, filename, mime, h.hexdigest(), src.stat().st_size,
+                     lambda dst: shutil.copyfile(src, dst))
 
+
+def _register(
+    conn: psycopg.Connection,
+    org_id: str,
+    kind: str,
+    filename: str,
+    mime: str,
+    sha: str,
+    size: int,
+    write: Callable[[pathlib.Path], Any],
+) -> str:
+    STORAGE_DIR.mkdir(parents=True, exist_ok=True)
     with conn.cursor() as cur:
         # 이미 있으면 재사용
         cur.execute(
@@ -113,7 +167,7 @@ def register_artifact(
         rel = pathlib.Path(org_id) / "artifacts" / f"{art_id}{ext}"
         abs_path = STORAGE_DIR / rel
         abs_path.parent.mkdir(parents=True, exist_ok=True)
-        abs_path.write_bytes(content)
+        write(abs_path)
 
         # 경로 업데이트
         cur.execute("UPDATE artifact SET storage_path=%s WHERE id=%s", (str(rel), art_id))
@@ -163,39 +217,79 @@ def bulk_insert_chunks(
     conn: psycopg.Connection,
     policy_id: str,
     org_id: str,
-    chunks: Iterable[Dict[str, Any]],
+    chunks: Iterable[Mapping[str, Any]],
+    *,
+    embeddings: Any = None,
+    embeddings_i2000: Any = None,
+    emb_index: Optional[Sequence[int]] = None,
+    extra_embeddings: Optional[Mapping[str, Any]] = None,
 ) -> int:
     """
-    rule_chunk에 텍스트 청크(메타만) 일괄 삽입. 임베딩은 별도 파이프라인에서.
+    rule_chunk에 텍스트 청크 일괄 삽입. chunks: Chunk(chunk_records 출력) 또는 같은 키의 dict(to_chunks 출력)
+    - embeddings/embeddings_i2000: (m, dim) float32 ndarray 버퍼를 그대로 받는다(선택).
+      emb_index[k] = 버퍼 k행이 대응하는 chunks 위치 (embed_texts(as_array=True)의 index).
+      emb_index가 없으면 chunks 순서와 1:1로 간주. 대응 행이 없는 청크는 NULL.
+    - extra_embeddings: {컬럼명: 버퍼} — 활성/마이그레이션 중인 임베딩 컬럼
+      (lm_rag.migrate.embedding_targets) dual-write용. 버퍼 행 순서는 emb_index와 같아야 한다.
+    - 벡터 리터럴은 executemany가 행을 소비할 때 생성되므로 파이썬 float 리스트를 쌓지 않는다.
     """
-    rows = []
-    for ch in chunks:
-        rows.append(
-            (
+    extra = dict(extra_embeddings or {})
+    for col in extra:
+        if not _IDENT_RE.match(col):
+            raise ValueError(f"invalid column: {col!r}")
+    with_emb = embeddings is not None or embeddings_i2000 is not None or bool(extra)
+    pos: Dict[int, int] = {}
+    if with_emb:
+        bufs = [b for b in (embeddings, embeddings_i2000, *extra.values()) if b is not None]
+        n = len(bufs[0])
+        idx = emb_index if emb_index is not None else range(n)
+        pos = {int(ci): k for k, ci in enumerate(idx)}
+
+    def _vec(buf: Any, i: int) -> Optional[str]:
+        k = pos.get(i)
+        if buf is None or k is None:
+            return None
+        return vector_literal(buf[k])
+
+    count = 0
+
+    def _rows():
+        nonlocal count
+        for i, ch in enumerate(chunks):
+            c = Chunk.coerce(ch)
+            row = (
                 policy_id,
                 org_id,
-                int(ch.get("order", 0)),
-                ch.get("code"),
-                ch.get("title"),
-                ch.get("path"),
-                ch.get("text") or "",
-                ch.get("context_text"),
-                json.dumps(ch.get("tables"), ensure_ascii=False) if "tables" in ch else None,
+                *c.db_row(int(c.order or 0)),
+                chunk_content_sha(c.text, c.path),
             )
-        )
-
-    if not rows:
-        return 0
-
-    sql = """
-    INSERT INTO rule_chunk
-      (policy_id, org_id, ord, code, title, path, text, context_text, tables_json)
-    VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s)
-    """
+            if with_emb:
+                row += (_vec(embeddings, i), _vec(embeddings_i2000, i))
+                row += tuple(_vec(b, i) for b in extra.values())
+            count += 1
+            yield row
+
+    if with_emb:
+        extra_cols = "".join(f", {col}" for col in extra)
+        extra_vals = ",%s::vector" * len(extra)
+        sql = f"""
+        INSERT INTO rule_chunk
+          (policy_id, org_id, ord, code, title, path, text, context_text, tables_json, content_sha,
+           embedding, embedding_i2000{extra_cols})
+        VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s::vector,%s::vector{extra_vals})
+        """
+    else:
+        sql = """
+        INSERT INTO rule_chunk
+          (policy_id, org_id, ord, code, title, path, text, context_text, tables_json, content_sha)
+        VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s,%s)
+        """
     with conn.cursor() as cur:
-        cur.executemany(sql, rows)
+        cur.executemany(sql, _rows())
+    if not count:
+        return 0
     conn.commit()
-    return len(rows)
+    return count
 
 
 # --- Budget ---
@@ -242,56 +336,42 @@ def insert_budget_chunks(
     org_id: str,
     policy_id: Optional[str],
     chunks: Iterable[Mapping],
+    batch_size: int = 500,
 ) -> int:
     """
-    chunks 예시 키:
-      order, title, text, path, code, context_text, tables_json, page, section_path, bbox ...
+    chunks: Chunk(to_chunks_iter 출력) 또는 dict — 예시 키:
+      order, title, text, path, code, context_text, tables(예전 dict는 tables_json), page, section_path, bbox ...
+    Chunk 필드가 아닌 키(page, section_path, ...)는 meta jsonb로.
+    chunks는 제너레이터여도 됨(to_chunks_iter) — batch_size 행씩 끊어 INSERT, 커밋은 마지막에 한 번.
     """
-    rows = []
-    for i, c in enumerate(chunks):
-        text = (c.get("text") or "").strip()
-        if not text:
-            continue
-        rows.append(
-            (
-                budget_doc_id,
-                policy_id,
-                org_id,
-                int(c.get("order") or i),
-                c.get("code"),
-                c.get("title"),
-                c.get("path"),
-                text,
-                c.get("context_text"),
-                json.dumps(c.get("tables_json")) if c.get("tables_json") is not None else None,
-                json.dumps(
-                    {
-                        k: v
-                        for k, v in c.items()
-                        if k
-                        not in ("order", "code", "title", "path", "text", "context_text", "tables_json")
-                    }
-                ),
-            )
-        )
-
-    if not rows:
-        return 0
-
-    with conn.cursor() as cur:
-        cur.executemany(
-            """
+    sql = """
             INSERT INTO budget_chunk (
               budget_doc_id, policy_id, org_id, ord, code, title, path, text,
               context_text, tables_json, meta
             )
             VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s,
                     %s::jsonb, %s::jsonb)
-            """,
-            rows,
-        )
-    conn.commit()
-    return len(rows)
+            """
+    rows = []
+    n = 0
+    with conn.cursor() as cur:
+        for i, ch in enumerate(chunks):
+            c = Chunk.coerce(ch)
+            text = (c.text or "").strip()
+            if not text:
+                continue
+            rows.append((budget_doc_id, policy_id, org_id, *c.db_row(int(c.order or i), text), c.meta_json()))
+            if len(rows) >= batch_size:
+                cur.executemany(sql, rows)
+                n += len(rows)
+                rows.clear()
+        if rows:
+            cur.executemany(sql, rows)
+            n += len(rows)
+
+    if n:
+        conn.commit()
+    return n
 
 
 # --- Templates ---
@@ -319,7 +399,7 @@ def save_template_to_db(schema: dict, pdf_path: str):
                     schema_json = EXCLUDED.schema_json,
                     updated_at = now()
                 """,
-                (tpl_id, pdf_path, json.dumps(schema, ensure_ascii=False)),
+                (tpl_id, pdf_path, serde.dumps_str(schema)),
             )
         conn.commit()
     finally:
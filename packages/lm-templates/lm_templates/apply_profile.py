@@ -5,10 +5,11 @@ apply_profile: 템플릿 HTML + 매핑 프로필을 받아 공통 Virtual View
 - 반환: {"rows":[{...}], "confidence": float, "meta": {...}}
 """
 from __future__ import annotations
-from bs4 import BeautifulSoup
 from dataclasses import dataclass
 from typing import Dict, Any, List, Optional
-import re
+
+from lm_docparse.grid import TableGrid
+from lm_docparse.tables import extract_grids_from_html
 
 def _coerce_int(x) -> Optional[int]:
     try:
@@ -26,54 +27,42 @@ def _coerce_int(x) -> Optional[int]:
 def _norm(s: str | None) -> str:
     return (s or "").strip()
 
-def _headers_of(table) -> List[str]:
-    first = table.find_all("tr")
-    if not first:
-        return []
-    hrow = first[0]
-    hdrs = [th.get_text(strip=True) for th in hrow.find_all(["th", "td"])]
-    return [h.replace(" ", "") for h in hdrs]
+def _headers_of(grid: TableGrid) -> List[str]:
+    # 병합 셀을 펼친 헤더 (열 위치와 1:1)
+    return [h.replace(" ", "") for h in grid.headers]
 
-def _find_best_table(soup: BeautifulSoup, mapping: Dict[str, str]) -> Optional[Any]:
-    """매핑에 있는 '원본 헤더명'이 가장 많이 겹치는 <table> 선택."""
+def _find_best_table(grids: List[TableGrid], mapping: Dict[str, str]) -> Optional[TableGrid]:
+    """매핑에 있는 '원본 헤더명'이 가장 많이 겹치는 표 선택."""
     targets = set([_norm(v).replace(" ", "") for v in (mapping or {}).values() if v])
     best = None
     best_score = -1
-    for t in soup.find_all("table"):
-        hdrs = _headers_of(t)
-        if not hdrs:
+    for g in grids:
+        if not any(g.headers):
             continue
-        score = sum(1 for v in targets if v in hdrs)
+        score = sum(1 for v in targets if g.index(v) is not None)
         if score > best_score:
-            best, best_score = t, score
+            best, best_score = g, score
     return best
 
-def _index_map(table, mapping: Dict[str, str]) -> Dict[str, int]:
-    """표준키→열 인덱스. 매핑에서 '원본 헤더명'으로 인덱스를 찾음."""
-    hdrs = _headers_of(table)
+def _index_map(grid: TableGrid, mapping: Dict[str, str]) -> Dict[str, int]:
+    """표준키→열 인덱스. 헤더명→열 dict 조회 (공백 무시, 없으면 괄호까지 무시)."""
     idx = {}
     for std_key, raw_name in (mapping or {}).items():
         if not raw_name:
             continue
-        raw_norm = raw_name.replace(" ", "")
-        try:
-            i = hdrs.index(raw_norm)
-            idx[std_key] = i
-        except ValueError:
-            # 간단 유연성: 괄호/원문 공백 제거 버전도 시도
-            raw_norm2 = re.sub(r"[()\s]", "", raw_name)
-            for j, h in enumerate(hdrs):
-                if re.sub(r"[()\s]", "", h) == raw_norm2:
-                    idx[std_key] = j
-                    break
+        j = grid.index(raw_name)
+        if j is not None:
+            idx[std_key] = j
     return idx
 
 def apply_profile(raw_html: str, profile: dict, mode: str = "settlement") -> dict:
     """
     입력: Raw HTML(Upstage), 매핑 Profile(JSON/YAML 파싱), mode
     출력: {"rows":[{"category":..., "amount":..., "amount_type":..., ...}, ...], "confidence": 0.8}
+    표는 rowspan/colspan을 펼친 TableGrid로 읽는다 → 병합 셀이 있어도 열 위치가 어긋나지 않음.
+    병합된 금액 셀은 첫 행에만 반영 (라벨 열은 덮인 행마다 같은 값).
     """
-    soup = BeautifulSoup(raw_html or "", "html.parser")
+    grids = extract_grids_from_html(raw_html or "")
     rows_out: List[Dict[str, Any]] = []
 
     sections = (profile or {}).get("sections") or {}
@@ -81,19 +70,20 @@ def apply_profile(raw_html: str, profile: dict, mode: str = "settlement") -> dic
 
     for section_name, section in sections.items():
         mapping: Dict[str, str] = section.get("mapping") or section  # 호환: 단순 dict도 허용
-        table = _find_best_table(soup, mapping)
-        if not table:
+        grid = _find_best_table(grids, mapping)
+        if not grid:
             continue
 
-        idx = _index_map(table, mapping)
-        tr_list = table.find_all("tr")[1:]  # 헤더 다음부터
-        for r_idx, tr in enumerate(tr_list):
-            cells = [td.get_text(strip=True) for td in tr.find_all("td")]
+        idx = _index_map(grid, mapping)
+        for r_idx, cells in enumerate(grid.rows(body=True)):  # 헤더 다음부터
             def get(std_key: str) -> Optional[str]:
                 j = idx.get(std_key)
-                return cells[j] if (j is not None and j < len(cells)) else None
+                return cells[j] if j is not None else None
 
-            amt = _coerce_int(get(amount_key))
+            # 금액은 병합 셀의 원래 행에서만 (rowspan 금액이 덮인 행마다 복제되면 합계가 부풀려짐)
+            # category/code 등 라벨 열은 펼친 값 그대로 → 덮인 행도 자기 분류를 가짐
+            j_amt = idx.get(amount_key)
+            amt = _coerce_int(grid.amount(r_idx, j_amt, dedupe=True)) if j_amt is not None else None
             row = {
                 "category": _norm(get("item")) or _norm(get("category")),
                 "budget_code": _norm(get("budget_code")),
@@ -6,6 +6,8 @@ from pathlib import Path
 from typing import Any, Dict, List, Tuple
 
 from openai import OpenAI  # pip install openai==1.81.0
+from lm_docparse import artifact
+from lm_docparse.spatial import ElementIndex, TITLE_CATEGORIES
 
 # ---------- LLM 클라이언트 ----------
 def make_upstage_client(api_key: str | None = None) -> OpenAI:
@@ -46,31 +48,24 @@ def _extract_table_headers_from_html(html: str) -> List[str]:
         cleaned.append(txt)
     return cleaned
 
-def _closest_title(elements: List[Dict[str, Any]], table_index: int) -> str:
-    table_el = elements[table_index]
-    page = table_el.get("page")
-    # 같은 페이지에서 테이블 앞쪽의 가장 최근 heading/paragraph 텍스트
-    for j in range(table_index - 1, -1, -1):
-        prev = elements[j]
-        if prev.get("page") != page:
-            break
-        if prev.get("category") in ("heading1", "heading2", "paragraph"):
-            txt = ((prev.get("content") or {}).get("text") or "").strip()
-            if txt:
-                return txt
-    return ""
+def _closest_title(elements: List[Dict[str, Any]], table_index: int, index: ElementIndex | None = None) -> str:
+    # 같은 페이지에서 테이블 바로 위(좌표 기준)의 캡션/heading/paragraph 텍스트
+    # 좌표가 없으면 문서 순서상 앞쪽의 가장 최근 것 (index는 문서당 한 번 만들어 재사용)
+    index = index or ElementIndex(elements)
+    return index.title_above(table_index, TITLE_CATEGORIES)
 
 def summarize_template_for_llm(template_json: Dict[str, Any]) -> Dict[str, Any]:
     elements = template_json.get("elements", [])
     pages = int((template_json.get("usage") or {}).get("pages") or 0)
 
+    index = ElementIndex(elements)
     sketches: List[Dict[str, Any]] = []
     for i, el in enumerate(elements):
         if el.get("category") != "table":
             continue
         html = ((el.get("content") or {}).get("html") or "")
         headers = _extract_table_headers_from_html(html)
-        title = _closest_title(elements, i)
+        title = _closest_title(elements, i, index)
         sketches.append({
             "table_id": el.get("id"),
             "page": el.get("page"),
@@ -174,7 +169,7 @@ def infer_profile_with_llm(
     """
     Upstage Solar Pro에게 템플릿 구조 해석을 맡겨 '프로필+PerReceiptOutputSpec'을 생성.
     """
-    raw = json.loads(Path(template_raw_json_path).read_text(encoding="utf-8"))
+    raw = artifact.load(template_raw_json_path)
     summary = summarize_template_for_llm(raw)
 
     name = profile_name_hint or Path(template_raw_json_path).stem